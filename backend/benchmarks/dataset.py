@@ -0,0 +1,265 @@
+"""
+Deterministic synthetic tenants in the /api/import/json format.
+
+The same --users, --seed and --as-of always produce the same file. The shape follows
+what real exports look like rather than uniform noise:
+
+- a handful of AWS accounts, GCP projects and Azure subscriptions that grow with the
+  tenant, with grants concentrated on the first few (Zipf) and each user mostly in one
+- users in weighted departments, about 8% service accounts with narrow, long-lived grants
+- grants per user log-normal (most users have a few, a long tail has hundreds)
+- each user working mainly in one cloud, some in a second, most humans also in Okta
+- service popularity and access types skewed towards reads
+- last_used mostly recent, a stale tail past the 90-day unused-privilege window, and
+  grants that were never used
+
+Usage (from the backend directory):
+    python benchmarks/dataset.py generate /tmp/tenant-100k.json --users 100000 --seed 42
+"""
+import itertools
+import json
+import math
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import typer
+
+MIN_USERS = 1_000
+MAX_USERS = 500_000
+
+PROVIDER_WEIGHTS = {"aws": 0.45, "azure": 0.25, "gcp": 0.20, "okta": 0.10}
+OKTA_HUMAN_SHARE = 0.8
+SECOND_CLOUD_SHARE = 0.35
+SERVICE_ACCOUNT_SHARE = 0.08
+
+# Service -> resource type, most used first
+PROVIDER_SERVICES = {
+    "aws": {"S3": "bucket", "EC2": "instance", "IAM": "role", "Lambda": "function", "RDS": "database",
+            "DynamoDB": "table", "CloudWatch": "log_group", "SQS": "queue", "KMS": "key", "ECS": "cluster"},
+    "gcp": {"Cloud Storage": "bucket", "Compute Engine": "instance", "BigQuery": "dataset", "Cloud IAM": "role",
+            "Cloud Functions": "function", "Pub/Sub": "topic", "Cloud SQL": "database", "GKE": "cluster"},
+    "azure": {"Storage": "storage", "Virtual Machines": "instance", "Active Directory": "group",
+              "SQL Database": "database", "App Service": "application", "Key Vault": "vault",
+              "AKS": "cluster", "Monitor": "workspace"},
+    "okta": {"Slack": "application", "Google Workspace": "application", "Jira": "application",
+             "Salesforce": "application", "GitHub": "application", "AWS SSO": "application",
+             "Workday": "application", "Admin": "application"}
+}
+ACCESS_TYPE_WEIGHTS = {
+    "read": 0.38, "list": 0.12, "write": 0.15, "user": 0.10, "execute": 0.06, "update": 0.05,
+    "create": 0.04, "delete": 0.03, "admin": 0.05, "owner": 0.02
+}
+PRIVILEGED_ACCESS_TYPES = {"admin", "owner"}
+READ_ACCESS_TYPES = {"read", "list", "user"}
+PRIVILEGED_SERVICES = {"IAM", "Cloud IAM", "Active Directory", "Key Vault", "KMS", "Admin", "AWS SSO"}
+DEPARTMENT_WEIGHTS = {
+    "Engineering": 0.32, "Sales": 0.14, "Data": 0.10, "Operations": 0.10, "Finance": 0.08, "Marketing": 0.08,
+    "Security": 0.05, "Customer Success": 0.05, "HR": 0.04, "Legal": 0.02, "Executive": 0.02
+}
+JOB_TITLES = ["Engineer", "Senior Engineer", "Analyst", "Manager", "Specialist", "Lead", "Director"]
+REGIONS = {
+    "aws": ["us-east-1", "us-west-2", "eu-west-1", "ap-southeast-2"],
+    "gcp": ["us-central1", "europe-west1", "asia-east1"],
+    "azure": ["eastus", "westeurope", "southeastasia"],
+    "okta": [None]
+}
+NAME_WORDS = ["prod", "production", "staging", "dev", "backup", "finance", "hr", "security", "data", "web",
+              "api", "logs", "analytics", "customer", "payments", "billing", "ml", "reporting", "admin", "shared"]
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn",
+               "Priya", "Wei", "Fatima", "Mateo", "Yuki", "Olu", "Ingrid", "Ravi", "Lena", "Tomas"]
+LAST_NAMES = ["Smith", "Garcia", "Chen", "Patel", "Kim", "Nguyen", "Okafor", "Silva", "Novak", "Müller",
+              "Rossi", "Haddad", "Sato", "Kowalski", "Johansson", "Singh", "Brown", "Lopez", "Ivanova", "Cohen"]
+
+# Grants per user: log-normal with a median of about 9, clipped to [1, 400]
+GRANTS_MEDIAN = 9
+GRANTS_SIGMA = 0.9
+MAX_GRANTS = 400
+HOME_ACCOUNT_SHARE = 0.9
+NEVER_USED_SHARE = 0.15
+STALE_SHARE = 0.12  # Last used 90-400 days ago
+RECENT_MEAN_DAYS = 14
+
+app = typer.Typer(help="Deterministic synthetic tenants in the /api/import/json format.", add_completion=False)
+
+
+def zipf_cum_weights(count: int, exponent: float = 1.1) -> List[float]:
+    return list(itertools.accumulate(1 / (rank + 1) ** exponent for rank in range(count)))
+
+
+SERVICE_CUM_WEIGHTS = {provider: zipf_cum_weights(len(services)) for provider, services in PROVIDER_SERVICES.items()}
+ACCESS_TYPES = list(ACCESS_TYPE_WEIGHTS)
+ACCESS_TYPE_CUM_WEIGHTS = list(itertools.accumulate(ACCESS_TYPE_WEIGHTS.values()))
+
+
+def build_tenant(rng: random.Random, users: int) -> Dict[str, tuple]:
+    """Accounts (AWS), projects (GCP), subscriptions (Azure) and the Okta org, scaled to the tenant,
+    each with the cumulative weights grants are spread over them with"""
+    scale = max(3, round(math.sqrt(users / 50)))
+    accounts = {
+        "aws": [f"{rng.randrange(10 ** 11, 10 ** 12)}" for _ in range(scale)],
+        "gcp": [f"{rng.choice(NAME_WORDS)}-project-{rng.randrange(100000, 999999)}" for _ in range(scale)],
+        "azure": [str(uuid.UUID(int=rng.getrandbits(128), version=4)) for _ in range(max(2, scale // 2))],
+        "okta": [f"org-{rng.randrange(10 ** 7, 10 ** 8)}"]
+    }
+    return {provider: (ids, zipf_cum_weights(len(ids), 1.4)) for provider, ids in accounts.items()}
+
+
+def weighted(rng: random.Random, weights: Dict[str, float]) -> str:
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def last_used(rng: random.Random, as_of: datetime, service_account: bool) -> Optional[str]:
+    roll = rng.random()
+    if roll < NEVER_USED_SHARE:
+        return None
+    if roll < NEVER_USED_SHARE + STALE_SHARE:
+        days = rng.uniform(90.5, 400)
+    else:
+        # Service accounts run on a schedule, people drift
+        days = rng.uniform(0, 1) if service_account else min(rng.expovariate(1 / RECENT_MEAN_DAYS), 89.5)
+    return (as_of - timedelta(days=days)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def pick_account(rng: random.Random, tenant: Dict[str, tuple], provider: str) -> str:
+    accounts, account_cum_weights = tenant[provider]
+    return rng.choices(accounts, cum_weights=account_cum_weights)[0]
+
+
+def build_grant(rng: random.Random, provider: str, tenant: Dict[str, tuple], home_accounts: Dict[str, str],
+                as_of: datetime, service_account: bool) -> dict:
+    service = rng.choices(list(PROVIDER_SERVICES[provider]), cum_weights=SERVICE_CUM_WEIGHTS[provider])[0]
+    access_type = rng.choices(ACCESS_TYPES, cum_weights=ACCESS_TYPE_CUM_WEIGHTS)[0]
+    if rng.random() < HOME_ACCOUNT_SHARE:
+        account_id = home_accounts[provider]
+    else:
+        account_id = pick_account(rng, tenant, provider)
+    resource_name = f"{rng.choice(NAME_WORDS)}-{rng.choice(NAME_WORDS)}-{rng.randrange(1, 1000)}"
+    if provider == "okta":
+        resource_name = service
+    grant = {
+        "provider": provider,
+        "service": service,
+        "resource_type": PROVIDER_SERVICES[provider][service],
+        "resource_name": resource_name,
+        "access_type": access_type,
+        "region": rng.choice(REGIONS[provider]),
+        "account_id": account_id,
+        "is_privileged": access_type in PRIVILEGED_ACCESS_TYPES or (
+            service in PRIVILEGED_SERVICES and access_type not in READ_ACCESS_TYPES
+        ),
+        "last_used": last_used(rng, as_of, service_account),
+        "mfa_required": not service_account and rng.random() < 0.7
+    }
+    if provider == "aws":
+        grant["resource_arn"] = f"arn:aws:{service.lower()}:::{account_id}/{resource_name}"
+    return grant
+
+
+def build_user(rng: random.Random, index: int, tenant: Dict[str, tuple], as_of: datetime) -> dict:
+    service_account = rng.random() < SERVICE_ACCOUNT_SHARE
+    department = weighted(rng, DEPARTMENT_WEIGHTS)
+    if service_account:
+        name = f"{rng.choice(NAME_WORDS)}-{rng.choice(NAME_WORDS)}-svc"
+        email = f"{name}-{index}@svc.example.com"
+        grant_count = rng.randint(1, 12)
+        providers = [weighted(rng, {p: w for p, w in PROVIDER_WEIGHTS.items() if p != "okta"})]
+    else:
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        email = f"{name.lower().replace(' ', '.')}.{index}@example.com"
+        grant_count = min(MAX_GRANTS, max(1, round(rng.lognormvariate(math.log(GRANTS_MEDIAN), GRANTS_SIGMA))))
+        providers = [weighted(rng, PROVIDER_WEIGHTS)]
+        if rng.random() < SECOND_CLOUD_SHARE:
+            providers.append(weighted(rng, {p: w for p, w in PROVIDER_WEIGHTS.items() if p not in providers}))
+        if "okta" not in providers and rng.random() < OKTA_HUMAN_SHARE:
+            providers.append("okta")
+
+    # The first provider is where the user works; the others get a smaller share.
+    # Within a provider most grants are in the user's home account.
+    provider_weights = [3.0] + [1.0] * (len(providers) - 1)
+    home_accounts = {provider: pick_account(rng, tenant, provider) for provider in providers}
+    resources = [
+        build_grant(rng, rng.choices(providers, weights=provider_weights)[0], tenant, home_accounts, as_of,
+                    service_account)
+        for _ in range(grant_count)
+    ]
+    return {
+        "user_email": email,
+        "user_name": name,
+        "user_id": f"u{index:07d}",
+        "department": "Platform" if service_account else department,
+        "job_title": "Service Account" if service_account else f"{department} {rng.choice(JOB_TITLES)}",
+        "is_service_account": service_account,
+        "groups": [department.lower().replace(" ", "-")] + ([f"{p}-users" for p in sorted(set(providers))]),
+        "resources": resources
+    }
+
+
+def generate_users(users: int, seed: int, as_of: datetime) -> Iterator[dict]:
+    """Yield the users of a synthetic tenant; deterministic for the same arguments"""
+    rng = random.Random(seed)
+    tenant = build_tenant(rng, users)
+    for index in range(users):
+        yield build_user(rng, index, tenant, as_of)
+
+
+def write_dataset(output: Path, users: int, seed: int, as_of: datetime) -> Dict[str, int]:
+    """Stream a tenant to output as an import file; returns grant counts per provider"""
+    metadata = {
+        "source": "synthetic",
+        "description": f"Synthetic tenant of {users} users (seed {seed})",
+        "generator": {"users": users, "seed": seed, "as_of": as_of.strftime("%Y-%m-%d")},
+        "version": "1.0"
+    }
+    grants = {provider: 0 for provider in PROVIDER_WEIGHTS}
+    with open(output, "w", encoding="utf-8") as f:
+        f.write('{"metadata": ' + json.dumps(metadata) + ', "users": [\n')
+        for index, user in enumerate(generate_users(users, seed, as_of)):
+            if index:
+                f.write(",\n")
+            f.write(json.dumps(user, ensure_ascii=False))
+            for resource in user["resources"]:
+                grants[resource["provider"]] += 1
+        f.write("\n]}\n")
+    return grants
+
+
+def default_as_of() -> datetime:
+    return datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+@app.command()
+def generate(
+    output: Path = typer.Argument(..., help="Import file to write"),
+    users: int = typer.Option(10_000, min=MIN_USERS, max=MAX_USERS, help="Users in the tenant"),
+    seed: int = typer.Option(42, help="Random seed"),
+    as_of: Optional[datetime] = typer.Option(
+        None, formats=["%Y-%m-%d"], help="Date last_used values are relative to (default: today, UTC)"
+    )
+):
+    """Write a synthetic tenant as a JSON import file"""
+    as_of = as_of or default_as_of()
+    grants = write_dataset(output, users, seed, as_of)
+    typer.echo(f"{users:,} users, {sum(grants.values()):,} grants as of {as_of:%Y-%m-%d} -> {output} "
+               f"({output.stat().st_size / 1e6:.1f} MB)")
+    for provider, count in grants.items():
+        typer.echo(f"  {provider:<6} {count:>10,} grants")
+
+
+@app.command()
+def sample(
+    users: int = typer.Option(3, min=1, help="Users to print"),
+    seed: int = typer.Option(42, help="Random seed"),
+    as_of: Optional[datetime] = typer.Option(None, formats=["%Y-%m-%d"])
+):
+    """Print the first users of a tenant"""
+    for user in generate_users(users, seed, as_of or default_as_of()):
+        json.dump(user, sys.stdout, indent=2, ensure_ascii=False)
+        typer.echo()
+
+
+if __name__ == "__main__":
+    app()
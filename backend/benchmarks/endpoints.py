@@ -0,0 +1,450 @@
+"""
+Drive every /api endpoint against a local mongod and record what each one costs.
+
+Starts uvicorn on a scratch database (MONGO_URL, DB_NAME + "_bench", dropped first),
+imports a synthetic tenant from benchmarks/dataset.py through the streaming import,
+then sends --requests requests (--heavy-requests for the admin rebuilds and exports)
+to each endpoint, --concurrency at a time. Per endpoint it reports:
+
+- latency percentiles (p50/p90/p95/p99), errors and response bytes
+- peak RSS of the server process while the endpoint ran (VmHWM, reset before each
+  endpoint where the kernel allows it; import worker processes are not included)
+- MongoDB operations from serverStatus: opcounters, documents returned and the index
+  keys / documents scanned. These are server-wide, so run against an otherwise idle mongod.
+
+State-changing endpoints run on data they create (signups, app users) or last
+(DELETE /api/users/access). Results are written as JSON; --compare prints the change
+in p50/p95 and peak RSS against an earlier results file.
+
+With --url it drives an already running server instead (its database is not reset and
+RSS is only reported with --server-pid).
+
+Usage (from the backend directory):
+    python benchmarks/endpoints.py --users 100000 --output /tmp/bench-100k.json
+    python benchmarks/endpoints.py --dataset /tmp/tenant-100k.json --compare /tmp/bench-100k.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "cloud_access_visualizer")
+
+import requests  # noqa: E402
+from pymongo import MongoClient  # noqa: E402
+
+from dataset import default_as_of, write_dataset  # noqa: E402
+from login_latency import percentile  # noqa: E402
+
+ADMIN_EMAIL = "adminn@iamsharan.com"
+ADMIN_PASSWORD = "Testing@123"
+OPCOUNTERS = ("insert", "query", "update", "delete", "getmore", "command")
+IMPORT_POLL_INTERVAL = 0.5
+SERVER_START_TIMEOUT = 120
+
+
+class Endpoint:
+    """One route and how to build its i-th request: request(i) -> (method, path, request kwargs)"""
+
+    def __init__(self, route: str, request: Callable[[int], tuple], heavy: bool = False):
+        self.route = route
+        self.request = request
+        self.heavy = heavy
+
+
+def build_endpoints(context: Dict[str, Any]) -> List[Endpoint]:
+    """Every /api route, in the order they run; context holds tenant emails, resources and ids"""
+    emails = context["emails"]
+    provider = context["provider"]
+    created_ids = context["created_user_ids"]
+    run = context["run_id"]
+
+    def email(i: int) -> str:
+        return emails[i % len(emails)]
+
+    def get(path: str, **kwargs) -> Callable[[int], tuple]:
+        return lambda i: ("GET", path.format(email=email(i), **context), kwargs)
+
+    return [
+        Endpoint("GET /api/", get("/api/")),
+        Endpoint("POST /api/auth/login", lambda i: (
+            "POST", "/api/auth/login", {"json": {"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD}, "auth": False}
+        )),
+        Endpoint("GET /api/auth/me", get("/api/auth/me")),
+        Endpoint("POST /api/auth/signup", lambda i: (
+            "POST", "/api/auth/signup",
+            {"json": {"email": f"bench-signup-{run}-{i}@example.com", "password": "bench-password",
+                      "full_name": f"Bench Signup {i}"}, "auth": False}
+        )),
+        Endpoint("POST /api/users", lambda i: (
+            "POST", "/api/users",
+            {"json": {"email": f"bench-user-{run}-{i}@example.com", "password": "bench-password"},
+             "collect": created_ids}
+        )),
+        Endpoint("GET /api/users/all", get("/api/users/all")),
+        Endpoint("PUT /api/users/{user_id}", lambda i: (
+            "PUT", f"/api/users/{created_ids[i % len(created_ids)]}", {"json": {"is_active": True}}
+        )),
+        Endpoint("DELETE /api/users/{user_id}", lambda i: ("DELETE", f"/api/users/{created_ids[i]}", {})),
+        Endpoint("PUT /api/auth/update-profile", lambda i: ("PUT", "/api/auth/update-profile", {"json": {}})),
+        Endpoint("GET /api/providers/samples", get("/api/providers/samples")),
+        Endpoint("GET /api/providers/samples/{provider}", get("/api/providers/samples/{provider}")),
+        Endpoint("GET /api/providers", get("/api/providers")),
+        Endpoint("GET /api/search/{user_email}", get("/api/search/{email}")),
+        Endpoint("GET /api/search/{user_email}/delta", lambda i: (
+            "GET", f"/api/search/{email(i)}/delta", {"params": {"since": '"0"'}}
+        )),
+        Endpoint("GET /api/search/resource/{resource_name}", get("/api/search/resource/{resource_name}")),
+        Endpoint("GET /api/users/{user_email}/resources", get("/api/users/{email}/resources")),
+        Endpoint("GET /api/risk-analysis/{user_email}", get("/api/risk-analysis/{email}")),
+        Endpoint("GET /api/users/paginated", lambda i: (
+            "GET", "/api/users/paginated", {"params": {"page": i % 5 + 1, "page_size": 50}}
+        )),
+        Endpoint("GET /api/users/paginated?provider", get("/api/users/paginated", params={"provider": provider})),
+        Endpoint("GET /api/users", get("/api/users"), heavy=True),
+        Endpoint("GET /api/analytics", get("/api/analytics")),
+        Endpoint("GET /api/analytics/provider/{provider}", get("/api/analytics/provider/{provider}")),
+        Endpoint("GET /api/analytics/dashboard/{provider}", get("/api/analytics/dashboard/{provider}")),
+        Endpoint("GET /api/analytics/risk-scan", get("/api/analytics/risk-scan"), heavy=True),
+        Endpoint("GET /api/graph/organization", get("/api/graph/organization")),
+        Endpoint("GET /api/graph/organization?level=service", get("/api/graph/organization", params={"level": "service"})),
+        Endpoint("GET /api/export/{format}?csv", get("/api/export/csv"), heavy=True),
+        Endpoint("GET /api/export/{format}?json", get("/api/export/json"), heavy=True),
+        Endpoint("GET /api/export/{format}?ndjson", get("/api/export/ndjson"), heavy=True),
+        Endpoint("GET /api/export/{format}?xlsx", get("/api/export/xlsx"), heavy=True),
+        Endpoint("GET /api/audit-logs", get("/api/audit-logs")),
+        Endpoint("GET /api/admin/principal-cache", get("/api/admin/principal-cache")),
+        Endpoint("GET /api/admin/graph-cache", get("/api/admin/graph-cache")),
+        Endpoint("GET /api/metrics", get("/api/metrics")),
+        Endpoint("GET /api/import/jobs/{job_id}", get("/api/import/jobs/{import_job_id}")),
+        Endpoint("POST /api/admin/analytics/rebuild", lambda i: ("POST", "/api/admin/analytics/rebuild", {}), heavy=True),
+        Endpoint("POST /api/admin/resource-index/rebuild", lambda i: ("POST", "/api/admin/resource-index/rebuild", {}), heavy=True),
+        Endpoint("POST /api/admin/rescore", lambda i: ("POST", "/api/admin/rescore", {}), heavy=True),
+        # Last: removes users from the tenant, from the end of the list the others don't reach
+        Endpoint("DELETE /api/users/access/{user_email}", lambda i: ("DELETE", f"/api/users/access/{emails[-1 - i]}", {}))
+    ]
+
+
+def route_key(route: str) -> str:
+    """"GET /api/export/{format}?csv" -> "GET /api/export/{format}" """
+    return route.split("?")[0]
+
+
+def uncovered_routes(endpoints: List[Endpoint]) -> List[str]:
+    """/api routes of the app that no endpoint drives"""
+    from fastapi.routing import APIRoute
+    from server import app
+
+    covered = {route_key(endpoint.route) for endpoint in endpoints} | {"POST /api/import/json"}
+    routes = {
+        f"{method} {route.path}"
+        for route in app.routes if isinstance(route, APIRoute) and route.path.startswith("/api")
+        for method in route.methods
+    }
+    return sorted(routes - covered)
+
+
+class ServerProcess:
+    """The server under test: a uvicorn subprocess, or a running server given by URL"""
+
+    def __init__(self, url: str, process: Optional[subprocess.Popen] = None, pid: Optional[int] = None):
+        self.url = url.rstrip("/")
+        self.process = process
+        self.pid = process.pid if process else pid
+
+    @classmethod
+    def start(cls, port: int, env: Dict[str, str]) -> "ServerProcess":
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "server:app", "--port", str(port), "--log-level", "warning"],
+            cwd=BACKEND_DIR, env=env
+        )
+        server = cls(f"http://127.0.0.1:{port}", process)
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                sys.exit(f"server exited with {process.returncode}")
+            try:
+                if requests.get(f"{server.url}/api/", timeout=1).ok:
+                    return server
+            except requests.ConnectionError:
+                pass
+            time.sleep(0.5)
+        server.stop()
+        sys.exit("server did not start")
+
+    def stop(self):
+        if self.process:
+            self.process.terminate()
+            self.process.wait(timeout=30)
+
+    def reset_peak_rss(self):
+        if self.pid:
+            try:
+                # Resets VmHWM to the current RSS (Linux)
+                Path(f"/proc/{self.pid}/clear_refs").write_text("5")
+            except OSError:
+                pass
+
+    def memory(self) -> Dict[str, Optional[int]]:
+        """Current and peak RSS in bytes"""
+        memory = {"rss_bytes": None, "peak_rss_bytes": None}
+        if self.pid:
+            try:
+                for line in Path(f"/proc/{self.pid}/status").read_text().splitlines():
+                    if line.startswith("VmRSS:"):
+                        memory["rss_bytes"] = int(line.split()[1]) * 1024
+                    elif line.startswith("VmHWM:"):
+                        memory["peak_rss_bytes"] = int(line.split()[1]) * 1024
+            except OSError:
+                pass
+        return memory
+
+
+def mongo_counters(mongo: MongoClient) -> Dict[str, int]:
+    status = mongo.admin.command("serverStatus")
+    metrics = status.get("metrics", {})
+    counters = {op: status["opcounters"].get(op, 0) for op in OPCOUNTERS}
+    counters["docs_returned"] = metrics.get("document", {}).get("returned", 0)
+    counters["keys_scanned"] = metrics.get("queryExecutor", {}).get("scanned", 0)
+    counters["docs_scanned"] = metrics.get("queryExecutor", {}).get("scannedObjects", 0)
+    return counters
+
+
+class Driver:
+    """Sends requests to the server with one session per thread"""
+
+    def __init__(self, url: str, token: Optional[str] = None):
+        self.url = url
+        self.token = token
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def session(self) -> requests.Session:
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def send(self, method: str, path: str, options: Dict[str, Any]) -> tuple[float, requests.Response]:
+        options = dict(options)
+        headers = {"Accept-Encoding": "gzip, br"}
+        if options.pop("auth", True) and self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        collect = options.pop("collect", None)
+        start = time.perf_counter()
+        response = self.session().request(method, f"{self.url}{path}", headers=headers, **options)
+        elapsed = time.perf_counter() - start
+        if collect is not None and response.ok:
+            with self._lock:
+                collect.append(response.json()["id"])
+        return elapsed, response
+
+
+def run_endpoint(driver: Driver, server: ServerProcess, mongo: Optional[MongoClient], endpoint: Endpoint,
+                 count: int, concurrency: int) -> Dict[str, Any]:
+    server.reset_peak_rss()
+    before = mongo_counters(mongo) if mongo else None
+    results = []
+
+    def send(i: int):
+        method, path, options = endpoint.request(i)
+        results.append(driver.send(method, path, options))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(send, range(count)))
+    wall_time = time.perf_counter() - start
+
+    latencies = [elapsed for elapsed, _ in results]
+    errors = [response for _, response in results if response.status_code >= 400]
+    result = {
+        "route": endpoint.route,
+        "requests": count,
+        "errors": len(errors),
+        "status_codes": sorted({response.status_code for _, response in results}),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p90_ms": percentile(latencies, 90) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies) * 1000,
+        "throughput_rps": count / wall_time,
+        "response_bytes": sum(len(response.content) for _, response in results) // count,
+        **server.memory()
+    }
+    if mongo:
+        after = mongo_counters(mongo)
+        # The serverStatus call taking the first snapshot counts as a command
+        after["command"] -= 1
+        result["mongo_ops"] = {field: after[field] - before[field] for field in after}
+    if errors:
+        result["first_error"] = f"{errors[0].status_code}: {errors[0].text[:200]}"
+    return result
+
+
+def import_dataset(driver: Driver, server: ServerProcess, dataset: Path) -> Dict[str, Any]:
+    """Load the tenant through the streaming import and wait for its job"""
+    server.reset_peak_rss()
+    start = time.perf_counter()
+    with open(dataset, "rb") as f:
+        _, response = driver.send("POST", "/api/import/json", {
+            "params": {"streaming": "true"}, "files": {"file": (dataset.name, f, "application/json")}
+        })
+    response.raise_for_status()
+    job_id = response.json()["job_id"]
+    while True:
+        _, response = driver.send("GET", f"/api/import/jobs/{job_id}", {})
+        job = response.json()
+        if job["status"] in ("completed", "failed"):
+            break
+        time.sleep(IMPORT_POLL_INTERVAL)
+    if job["status"] == "failed":
+        sys.exit(f"import failed: {job.get('errors')}")
+    return {
+        "route": "POST /api/import/json",
+        "job_id": job_id,
+        "imported_users": job.get("processed_users"),
+        "seconds": time.perf_counter() - start,
+        **server.memory()
+    }
+
+
+def login(url: str) -> str:
+    response = requests.post(f"{url}/api/auth/login", json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def tenant_context(dataset: Path, sample_size: int) -> Dict[str, Any]:
+    """Emails and a resource name to aim the per-user endpoints at, read from the import file"""
+    import ijson
+
+    emails, resource_name = [], None
+    with open(dataset, "rb") as f:
+        for user in ijson.items(f, "users.item"):
+            emails.append(user["user_email"])
+            resource_name = resource_name or user["resources"][0]["resource_name"]
+            if len(emails) >= sample_size:
+                break
+    return {"emails": emails, "resource_name": resource_name}
+
+
+def print_results(results: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    previous = {row["route"]: row for row in (baseline or {}).get("endpoints", [])}
+    print(f"{'route':<48} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'err':>4} {'peak MB':>8} "
+          f"{'queries':>8} {'scanned':>9}")
+    for row in results["endpoints"]:
+        ops = row.get("mongo_ops", {})
+        peak = row["peak_rss_bytes"] / 1e6 if row["peak_rss_bytes"] else float("nan")
+        line = (f"{row['route']:<48} {row['p50_ms']:9.1f} {row['p95_ms']:9.1f} {row['p99_ms']:9.1f} "
+                f"{row['errors']:>4} {peak:8.0f} {ops.get('query', 0) + ops.get('getmore', 0):>8} "
+                f"{ops.get('docs_scanned', 0):>9}")
+        if row["route"] in previous:
+            before = previous[row["route"]]
+            line += f"   p50 {row['p50_ms'] / max(before['p50_ms'], 1e-9):.2f}x  p95 {row['p95_ms'] / max(before['p95_ms'], 1e-9):.2f}x"
+            if row["peak_rss_bytes"] and before.get("peak_rss_bytes"):
+                line += f"  peak {(row['peak_rss_bytes'] - before['peak_rss_bytes']) / 1e6:+.0f} MB"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", type=Path, help="Import file from benchmarks/dataset.py (default: generate one)")
+    parser.add_argument("--users", type=int, default=10_000, help="Users to generate without --dataset")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=50, help="Requests per endpoint")
+    parser.add_argument("--heavy-requests", type=int, default=3, help="Requests per full-scan/admin endpoint")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--url", help="Drive a running server instead of starting one")
+    parser.add_argument("--server-pid", type=int, help="PID of the server given by --url, for RSS")
+    parser.add_argument("--no-mongo-stats", action="store_true", help="Skip serverStatus (e.g. without the privilege)")
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    parser.add_argument("--compare", type=Path, help="Earlier results JSON to compare with")
+    args = parser.parse_args()
+
+    dataset_meta = {"path": str(args.dataset) if args.dataset else None}
+    dataset = args.dataset
+    if dataset is None:
+        as_of = default_as_of()
+        dataset = Path(tempfile.mkdtemp(prefix="bench-")) / f"tenant-{args.users}.json"
+        print(f"generating {args.users:,} users -> {dataset}")
+        write_dataset(dataset, args.users, args.seed, as_of)
+        dataset_meta = {"path": None, "users": args.users, "seed": args.seed, "as_of": as_of.strftime("%Y-%m-%d")}
+
+    mongo = None if args.no_mongo_stats else MongoClient(os.environ["MONGO_URL"])
+    if args.url:
+        server = ServerProcess(args.url, pid=args.server_pid)
+    else:
+        db_name = f"{os.environ['DB_NAME']}_bench"
+        MongoClient(os.environ["MONGO_URL"]).drop_database(db_name)
+        server = ServerProcess.start(args.port, {**os.environ, "DB_NAME": db_name})
+
+    try:
+        driver = Driver(server.url, login(server.url))
+        imported = import_dataset(driver, server, dataset)
+        print(f"imported {imported['imported_users']:,} users in {imported['seconds']:.1f} s")
+
+        context = tenant_context(dataset, max(args.requests, args.heavy_requests) * 2)
+        context.update({
+            "provider": "aws",
+            "created_user_ids": [],
+            "run_id": int(time.time()),
+            "import_job_id": imported["job_id"]
+        })
+        endpoints = build_endpoints(context)
+        missing = uncovered_routes(endpoints)
+        if missing:
+            print(f"not driven: {', '.join(missing)}")
+
+        rows = []
+        for endpoint in endpoints:
+            count = args.heavy_requests if endpoint.heavy else args.requests
+            if endpoint.route == "DELETE /api/users/{user_id}":
+                count = len(context["created_user_ids"])
+            rows.append(run_endpoint(driver, server, mongo, endpoint, count, args.concurrency))
+    finally:
+        if not args.url:
+            server.stop()
+
+    results = {
+        "run": {
+            "started_at": datetime.utcnow().isoformat(),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "requests": args.requests,
+            "heavy_requests": args.heavy_requests,
+            "concurrency": args.concurrency,
+            "dataset": dataset_meta
+        },
+        "import": imported,
+        "endpoints": rows
+    }
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print_results(results, baseline)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2))
+        print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Login latency under concurrent load, before and after moving bcrypt off the event loop.
+
+In-process mode (default) runs a burst of concurrent logins on one event loop twice:
+"inline" verifies passwords on the loop as login used to, "pool" awaits
+verify_password_async. A heartbeat coroutine measures how long other requests
+would have been stalled meanwhile.
+
+With --url it instead fires concurrent POST /api/auth/login requests at a running
+server, so the same numbers can be taken against two deployments.
+
+Usage (from the backend directory):
+    python benchmarks/login_latency.py --logins 64 --concurrency 16
+    python benchmarks/login_latency.py --url http://localhost:8001 --email adminn@iamsharan.com --password Testing@123
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "cloud_access_visualizer")
+
+from server import (  # noqa: E402
+    BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, hash_password, verify_password, verify_password_async
+)
+
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def report(label: str, samples: list):
+    print(f"{label:<18} p50 {percentile(samples, 50) * 1000:8.1f} ms   "
+          f"p95 {percentile(samples, 95) * 1000:8.1f} ms   p99 {percentile(samples, 99) * 1000:8.1f} ms")
+
+
+async def run_in_process(mode: str, logins: int, concurrency: int, hashed: str) -> tuple[list, list]:
+    latencies, stalls = [], []
+    semaphore = asyncio.Semaphore(concurrency)
+    done = asyncio.Event()
+
+    async def login():
+        start = time.perf_counter()  # Includes queueing behind the other logins
+        async with semaphore:
+            await asyncio.sleep(0)  # Stands in for the users lookup
+            if mode == "inline":
+                verify_password("benchmark-password", hashed)
+            else:
+                await verify_password_async("benchmark-password", hashed)
+            latencies.append(time.perf_counter() - start)
+
+    async def heartbeat():
+        # Any other request on this worker waits at least as long as the loop is blocked
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.005)
+            stalls.append(time.perf_counter() - start - 0.005)
+
+    heartbeat_task = asyncio.create_task(heartbeat())
+    await asyncio.gather(*[login() for _ in range(logins)])
+    done.set()
+    await heartbeat_task
+    return latencies, stalls
+
+
+def run_against_server(url: str, email: str, password: str, logins: int, concurrency: int) -> list:
+    import requests
+
+    def login(_):
+        start = time.perf_counter()
+        response = requests.post(f"{url.rstrip('/')}/api/auth/login", json={"email": email, "password": password})
+        response.raise_for_status()
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(login, range(logins)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--url", help="Benchmark a running server instead of the in-process simulation")
+    parser.add_argument("--email")
+    parser.add_argument("--password")
+    args = parser.parse_args()
+
+    if args.url:
+        latencies = run_against_server(args.url, args.email, args.password, args.logins, args.concurrency)
+        print(f"{args.logins} logins against {args.url}, {args.concurrency} concurrent")
+        report("login", latencies)
+        return
+
+    hashed = hash_password("benchmark-password")
+    print(f"{args.logins} logins, {args.concurrency} concurrent, bcrypt cost {BCRYPT_ROUNDS}, "
+          f"{PASSWORD_HASH_WORKERS} hash workers")
+    for mode in ("inline", "pool"):
+        latencies, stalls = asyncio.run(run_in_process(mode, args.logins, args.concurrency, hashed))
+        report(f"{mode} login", latencies)
+        report(f"{mode} loop stall", stalls)
+
+
+if __name__ == "__main__":
+    main()
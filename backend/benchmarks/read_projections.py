@@ -0,0 +1,109 @@
+"""
+Bytes read and latency of each user_access read path, full documents vs projected.
+
+Seeds a scratch database (dropped afterwards) on the MongoDB at MONGO_URL with analyzed
+synthetic users, then runs the query behind each endpoint twice: fetching whole
+documents, as the endpoints used to, and with the read path's projection from
+USER_ACCESS_READ_FIELDS. Bytes are the BSON sizes MongoDB returns; latency is the
+best of --repeat runs including decoding in Motor.
+
+- /analytics rebuild:        analytics_summary over every user
+- /analytics/provider/{p}:   provider_analytics for --provider
+- /analytics/dashboard/{p}:  provider_dashboard for --provider
+- /users/paginated:          paginated_users, one --page-size page sorted by provider risk
+
+Usage (from the backend directory):
+    python benchmarks/read_projections.py --users 10000 --provider aws
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "cloud_access_visualizer")
+
+from bson.codec_options import CodecOptions  # noqa: E402
+from bson.raw_bson import RawBSONDocument  # noqa: E402
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+
+from risk_engine import build_synthetic_docs  # noqa: E402
+from server import UserAccess, analyze_user_access, user_access_projection  # noqa: E402
+
+
+def read_paths(provider: str, page_size: int) -> dict:
+    """Endpoint -> (read path, query filter, provider, sort, limit) as the endpoint issues it"""
+    sort_field = f"provider_risk.{provider}.risk_score"
+    return {
+        "/analytics rebuild": ("analytics_summary", {}, None, None, 0),
+        f"/analytics/provider/{provider}": ("provider_analytics", {"providers": provider}, provider, None, 1000),
+        f"/analytics/dashboard/{provider}": ("provider_dashboard", {"providers": provider}, provider, None, 1000),
+        "/users/paginated": (
+            "paginated_users", {"providers": provider}, provider,
+            [(sort_field, -1), ("user_email", -1)], page_size + 1
+        )
+    }
+
+
+async def fetch(collection, query_filter: dict, projection: dict, sort, limit: int) -> list:
+    cursor = collection.find(query_filter, projection)
+    if sort:
+        cursor = cursor.sort(sort)
+    return await cursor.to_list(limit or None)
+
+
+async def best_time(repeat: int, *args) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fetch(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def run(args):
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+    database = client[f"{os.environ['DB_NAME']}_read_projections_bench"]
+    collection = database.user_access
+    raw_collection = database.get_collection("user_access", codec_options=CodecOptions(document_class=RawBSONDocument))
+    try:
+        await collection.drop()
+        docs = [analyze_user_access(UserAccess(**doc)).model_dump() for doc in build_synthetic_docs(args.users, args.seed)]
+        for batch_start in range(0, len(docs), 1000):
+            await collection.insert_many(docs[batch_start:batch_start + 1000])
+        await collection.create_index("user_email", unique=True)
+        await collection.create_index([("providers", 1), (f"provider_risk.{args.provider}.risk_score", -1), ("user_email", -1)])
+
+        print(f"{args.users:,} users, best of {args.repeat}")
+        for endpoint, (read_path, query_filter, provider, sort, limit) in read_paths(args.provider, args.page_size).items():
+            full, projected = {"_id": 0}, user_access_projection(read_path, provider)
+            full_bytes = sum(len(doc.raw) for doc in await fetch(raw_collection, query_filter, full, sort, limit))
+            projected_bytes = sum(len(doc.raw) for doc in await fetch(raw_collection, query_filter, projected, sort, limit))
+            full_time = await best_time(args.repeat, collection, query_filter, full, sort, limit)
+            projected_time = await best_time(args.repeat, collection, query_filter, projected, sort, limit)
+
+            print(endpoint)
+            print(f"  full:       {full_time * 1000:8.1f} ms  {full_bytes:>12,} bytes")
+            print(f"  projected:  {projected_time * 1000:8.1f} ms  {projected_bytes:>12,} bytes  "
+                  f"({full_bytes / max(projected_bytes, 1):.1f}x fewer bytes, {full_time / projected_time:.1f}x faster)")
+    finally:
+        await client.drop_database(database.name)
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--provider", default="aws")
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
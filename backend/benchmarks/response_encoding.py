@@ -0,0 +1,102 @@
+"""
+Serialization time and bytes on the wire for the heavy JSON endpoints.
+
+Builds a /users payload (analyzed synthetic users) and an /analytics payload with a
+full list of escalation paths, then encodes each the way FastAPI does for a
+response_model (validate, serialize, json.dumps) and with ORJSONModelResponse,
+checking both decode to the same JSON. Each body is then compressed with gzip and
+brotli at the configured levels, as CompressionMiddleware would.
+
+Usage (from the backend directory):
+    python benchmarks/response_encoding.py --users 1000 --repeat 5
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "cloud_access_visualizer")
+
+import brotli  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+from risk_engine import build_synthetic_docs  # noqa: E402
+from server import (  # noqa: E402
+    ANALYTICS_MAX_ESCALATION_RISKS, BROTLI_QUALITY, GZIP_LEVEL, AccessAnalytics, ORJSONModelResponse,
+    UserAccess, analyze_user_access
+)
+
+
+def build_payloads(user_count: int, seed: int) -> dict:
+    users = [analyze_user_access(UserAccess(**doc)) for doc in build_synthetic_docs(user_count, seed)]
+    paths = [path for user in users for path in user.privilege_escalation_paths]
+    paths = (paths * (ANALYTICS_MAX_ESCALATION_RISKS // max(len(paths), 1) + 1))[:ANALYTICS_MAX_ESCALATION_RISKS]
+    analytics = AccessAnalytics(
+        total_users=len(users),
+        total_resources=sum(len(user.resources) for user in users),
+        risk_distribution={"low": 0, "medium": 0, "high": 0, "critical": 0},
+        top_privileged_users=[{"user_email": user.user_email, "privileged_count": 1} for user in users[:10]],
+        unused_privileges_count=0,
+        cross_provider_admins=0,
+        privilege_escalation_risks=paths,
+        provider_stats={}
+    )
+    return {
+        "/users": (List[UserAccess], users),
+        "/analytics": (AccessAnalytics, analytics)
+    }
+
+
+def default_encode(field, content) -> bytes:
+    """FastAPI's path for a handler returning models under a response_model"""
+    serialized = asyncio.run(serialize_response(field=field, response_content=content))
+    return JSONResponse(serialized).body
+
+
+def best_time(func, repeat: int) -> tuple[float, bytes]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    for endpoint, (response_type, content) in build_payloads(args.users, args.seed).items():
+        field = create_response_field(name=f"Response{endpoint.replace('/', '_')}", type_=response_type)
+        default_time, default_body = best_time(lambda: default_encode(field, content), args.repeat)
+        orjson_time, orjson_body = best_time(lambda: ORJSONModelResponse(content).body, args.repeat)
+        if json.loads(default_body) != json.loads(orjson_body):
+            sys.exit(f"{endpoint}: ORJSONModelResponse output differs from FastAPI's")
+
+        gzip_time, gzip_body = best_time(lambda: gzip.compress(orjson_body, GZIP_LEVEL), args.repeat)
+        brotli_time, brotli_body = best_time(lambda: brotli.compress(orjson_body, quality=BROTLI_QUALITY), args.repeat)
+
+        print(endpoint)
+        print(f"  fastapi json:  {default_time * 1000:8.1f} ms  {len(default_body):>10,} bytes")
+        print(f"  orjson:        {orjson_time * 1000:8.1f} ms  {len(orjson_body):>10,} bytes  "
+              f"({default_time / orjson_time:.1f}x faster)")
+        print(f"  + gzip -{GZIP_LEVEL}:     {gzip_time * 1000:8.1f} ms  {len(gzip_body):>10,} bytes  "
+              f"({len(orjson_body) / len(gzip_body):.1f}x smaller)")
+        print(f"  + brotli q{BROTLI_QUALITY}:   {brotli_time * 1000:8.1f} ms  {len(brotli_body):>10,} bytes  "
+              f"({len(orjson_body) / len(brotli_body):.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Benchmark and equivalence check for the vectorized risk engine.
+
+First scores every user in sample-data/ with both the per-user functions and
+score_risk_columns, overall and per provider, and fails on any difference. Then
+times the engine on a synthetic tenant against the per-user path on a subset.
+
+Usage (from the backend directory):
+    python benchmarks/risk_engine.py --users 100000 --baseline-users 5000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "cloud_access_visualizer")
+
+from server import (  # noqa: E402
+    SENSITIVE_RESOURCES, AccessType, UserAccess, build_user_access, build_risk_columns,
+    calculate_comprehensive_risk_score, calculate_provider_risk, find_unused_privileges,
+    score_risk_columns
+)
+
+SAMPLE_DATA_DIR = Path(__file__).resolve().parent.parent.parent / "sample-data"
+COMPARED_FIELDS = ("risk_score", "risk_level", "confidence_score", "cross_provider_admin",
+                   "privilege_escalation_count", "unused_privileges_count", "resource_count")
+
+
+def reference_scores(user_access: UserAccess) -> dict:
+    """Score one user with the per-user functions"""
+    scored_user = user_access.model_copy(update={"cross_provider_admin": False, "privilege_escalation_paths": []})
+    result = calculate_comprehensive_risk_score(scored_user)
+    return {
+        "risk_score": result.overall_score,
+        "risk_level": result.risk_level,
+        "confidence_score": result.confidence_score,
+        "cross_provider_admin": scored_user.cross_provider_admin,
+        "privilege_escalation_count": len(scored_user.privilege_escalation_paths),
+        "unused_privileges_count": len(find_unused_privileges(user_access.resources)),
+        "resource_count": len(user_access.resources)
+    }
+
+
+def engine_scores(scores: dict, index: int) -> dict:
+    return {field: scores[field][index].item() for field in COMPARED_FIELDS}
+
+
+def load_sample_users() -> list:
+    users = []
+    for sample_file in sorted(SAMPLE_DATA_DIR.glob("*.json")):
+        with open(sample_file) as f:
+            for user_data in json.load(f).get("users", []):
+                try:
+                    users.append(build_user_access(user_data))
+                except Exception:
+                    continue  # Not a user_access record (e.g. the unified sample)
+    return users
+
+
+def check_equivalence(users: list, now: datetime) -> int:
+    docs = [user.model_dump() for user in users]
+    columns = build_risk_columns(docs)
+    mismatches = 0
+
+    scores = score_risk_columns(columns, now=now)
+    for index, user in enumerate(users):
+        expected = reference_scores(user)
+        if engine_scores(scores, index) != expected:
+            mismatches += 1
+            print(f"mismatch for {user.user_email}: {engine_scores(scores, index)} != {expected}")
+
+    for provider in sorted({resource.provider.value for user in users for resource in user.resources}):
+        scores = score_risk_columns(columns, provider=provider, now=now)
+        for index, user in enumerate(users):
+            if not any(resource.provider == provider for resource in user.resources):
+                continue
+            expected = calculate_provider_risk(user, provider)
+            actual = engine_scores(scores, index)
+            if any(actual[field] != expected[field] for field in COMPARED_FIELDS):
+                mismatches += 1
+                print(f"{provider} mismatch for {user.user_email}: {actual} != {expected}")
+    return mismatches
+
+
+def build_synthetic_docs(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    services = {provider: [rule.service for rule in rules] + ["Compute", "Logging"]
+                for provider, rules in SENSITIVE_RESOURCES.items()}
+    words = ["prod", "dev", "backup", "finance", "web", "data", "admin", "logs", "customer", "master"]
+    access_types = [access.value for access in AccessType]
+    # Keep last_used half a day off the 90-day boundary so both paths agree despite timing
+    now = datetime.utcnow() - timedelta(hours=12)
+    docs = []
+    for i in range(count):
+        resources = []
+        for _ in range(rng.randint(1, 20)):
+            provider = rng.choice(list(services))
+            resources.append({
+                "provider": provider,
+                "service": rng.choice(services[provider]),
+                "resource_type": "resource",
+                "resource_name": f"{rng.choice(words)}-{rng.choice(words)}-{rng.randint(1, 500)}",
+                "access_type": rng.choice(access_types),
+                "account_id": f"acct-{rng.randint(1, 6)}" if rng.random() < 0.7 else None,
+                "last_used": now - timedelta(days=rng.randint(0, 400)) if rng.random() < 0.6 else None,
+                "is_privileged": rng.random() < 0.2
+            })
+        docs.append({
+            "user_email": f"user{i}@example.com",
+            "user_name": f"User {i}",
+            "is_service_account": rng.random() < 0.1,
+            "resources": resources
+        })
+    return docs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--baseline-users", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    now = datetime.utcnow()
+    sample_users = load_sample_users()
+    mismatches = check_equivalence(sample_users, now)
+    if mismatches:
+        sys.exit(f"{mismatches} differences between the risk engine and the per-user functions")
+    print(f"sample data: {len(sample_users)} users match the per-user functions")
+
+    docs = build_synthetic_docs(args.users, args.seed)
+    baseline_docs = docs[:args.baseline_users]
+    baseline_users = [UserAccess(**doc) for doc in baseline_docs]
+    mismatches = check_equivalence(baseline_users, now)
+    if mismatches:
+        sys.exit(f"{mismatches} differences on synthetic users")
+
+    # The per-user path validates each stored document into UserAccess before scoring
+    start = time.perf_counter()
+    for doc in baseline_docs:
+        calculate_comprehensive_risk_score(UserAccess(**doc))
+    per_user = (time.perf_counter() - start) / len(baseline_users)
+
+    start = time.perf_counter()
+    columns = build_risk_columns(docs)
+    built = time.perf_counter()
+    score_risk_columns(columns, now=now)
+    scored = time.perf_counter()
+
+    grants = len(columns["user"])
+    print(f"users:      {len(docs)} ({grants} grants)")
+    print(f"per-user:   {per_user * 1e6:.1f} us/user, {per_user * len(docs):.2f} s extrapolated")
+    print(f"columns:    {built - start:.2f} s")
+    print(f"scoring:    {scored - built:.2f} s")
+    print(f"engine:     {(scored - start) / len(docs) * 1e6:.1f} us/user, {scored - start:.2f} s total")
+    print(f"speedup:    {per_user * len(docs) / (scored - start):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
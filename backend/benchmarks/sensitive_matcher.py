@@ -0,0 +1,101 @@
+"""
+Microbenchmark for the compiled sensitive-resource matcher.
+
+Compares is_sensitive_resource against the previous linear implementation on a
+synthetic mix of resources, and checks both return the same result for each.
+
+Usage (from the backend directory):
+    python benchmarks/sensitive_matcher.py --resources 100000 --repeat 5
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "cloud_access_visualizer")
+
+from server import (  # noqa: E402
+    SENSITIVE_RESOURCES, CloudResource, AccessType, is_sensitive_resource
+)
+
+
+def linear_is_sensitive_resource(resource: CloudResource) -> tuple[bool, str, str]:
+    """The original implementation, kept as the baseline"""
+    provider_patterns = SENSITIVE_RESOURCES.get(resource.provider, [])
+
+    for sensitive in provider_patterns:
+        if sensitive.service.lower() == resource.service.lower():
+            for pattern in sensitive.resource_patterns:
+                if pattern.lower() in resource.resource_name.lower():
+                    return True, sensitive.sensitivity_level, sensitive.description
+
+    return False, "low", "Standard resource"
+
+
+def build_resources(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    words = ["prod", "staging", "dev", "backup", "finance", "web", "data", "Admin", "logs",
+             "customer", "master", "test", "analytics", "payments", "security", "shared"]
+    services = {
+        provider: [rule.service for rule in rules] + ["EC2", "Compute Engine", "Virtual Machines", "Slack"]
+        for provider, rules in SENSITIVE_RESOURCES.items()
+    }
+    resources = []
+    for i in range(count):
+        provider = rng.choice(list(services))
+        service = rng.choice(services[provider])
+        if rng.random() < 0.3:
+            service = service.upper()
+        name = "-".join(rng.sample(words, rng.randint(1, 3))) + f"-{i}"
+        resources.append(CloudResource(
+            provider=provider,
+            service=service,
+            resource_type="resource",
+            resource_name=name,
+            access_type=rng.choice(list(AccessType)),
+        ))
+    return resources
+
+
+def time_matcher(func, resources: list, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for resource in resources:
+            func(resource)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resources", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    resources = build_resources(args.resources, args.seed)
+
+    mismatches = sum(
+        1 for resource in resources
+        if is_sensitive_resource(resource) != linear_is_sensitive_resource(resource)
+    )
+    if mismatches:
+        sys.exit(f"{mismatches} resources classified differently by the compiled matcher")
+
+    linear = time_matcher(linear_is_sensitive_resource, resources, args.repeat)
+    compiled = time_matcher(is_sensitive_resource, resources, args.repeat)
+    sensitive = sum(1 for resource in resources if is_sensitive_resource(resource)[0])
+
+    print(f"resources:  {len(resources)} ({sensitive} sensitive)")
+    print(f"linear:     {linear * 1000:.1f} ms ({linear / len(resources) * 1e9:.0f} ns/resource)")
+    print(f"compiled:   {compiled * 1000:.1f} ms ({compiled / len(resources) * 1e9:.0f} ns/resource)")
+    print(f"speedup:    {linear / compiled:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
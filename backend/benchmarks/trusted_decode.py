@@ -0,0 +1,151 @@
+"""
+Per-document decode cost of stored users and user_access documents, validated vs trusted.
+
+Documents are round-tripped through BSON so they look exactly as Motor returns them.
+
+- users: User(**doc) against trusted_user (model_construct, no EmailStr validation).
+- /users: UserAccess(**doc) and re-encoding against encoding the stored document as is.
+- /users/paginated: building the row from a validated UserAccess (the previous code)
+  against paginated_user_row on the stored document.
+
+Also reported: UserAccess.model_construct with nested CloudResource construction.
+pydantic-core validates already-typed values about as fast as Python can construct the
+objects, which is why user_access reads skip the models instead of constructing them.
+
+Usage (from the backend directory):
+    python benchmarks/trusted_decode.py --sizes 1000 100000
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "cloud_access_visualizer")
+
+import bson  # noqa: E402
+import orjson  # noqa: E402
+
+from risk_engine import build_synthetic_docs  # noqa: E402
+from server import (  # noqa: E402
+    AccessType, CloudProvider, CloudResource, RiskLevel, User, UserAccess, UserRole, analyze_user_access,
+    hash_password, orjson_default, paginated_user_row, trusted_user
+)
+
+# Analyzing users is slow; larger sizes reuse these with distinct emails
+DISTINCT_USERS = 1000
+
+
+def stored(doc: dict) -> dict:
+    """What Motor hands back for a document written from doc"""
+    return bson.decode(bson.encode(doc))
+
+
+def repeat_docs(base_docs: list, count: int, email_field: str) -> list:
+    docs = []
+    for i in range(count):
+        doc = dict(base_docs[i % len(base_docs)])
+        doc[email_field] = f"user{i}@example.com"
+        docs.append(doc)
+    return docs
+
+
+def validated_paginated_row(user_doc: dict) -> dict:
+    """The /users/paginated row as built before, from a validated UserAccess"""
+    user_access = UserAccess(**user_doc)
+    return {
+        "user_email": user_access.user_email,
+        "risk_score": user_access.overall_risk_score,
+        "risk_level": user_access.risk_level,
+        "top_risk_factors": [rf["factor_type"] for rf in user_access.risk_factors[:3]],
+        "total_resources": len(user_access.resources),
+        "admin_access_count": sum(1 for r in user_access.resources if r.access_type == AccessType.ADMIN),
+        "providers": list(set(r.provider for r in user_access.resources)),
+        "services": list(set(f"{r.provider.value}-{r.service}" for r in user_access.resources)),
+        "last_updated": user_access.last_updated
+    }
+
+
+def constructed_user_access(user_doc: dict) -> UserAccess:
+    fields = dict(user_doc)
+    fields["resources"] = [
+        CloudResource.model_construct(**{
+            **resource,
+            "provider": CloudProvider(resource["provider"]),
+            "access_type": AccessType(resource["access_type"]),
+            "risk_level": RiskLevel(resource["risk_level"])
+        })
+        for resource in user_doc["resources"]
+    ]
+    return UserAccess.model_construct(**fields)
+
+
+def plain(value) -> str:
+    return str(getattr(value, "value", value))
+
+
+def encode(content) -> bytes:
+    return orjson.dumps(content, default=orjson_default)
+
+
+def time_per_doc(func, docs: list) -> float:
+    start = time.perf_counter()
+    for doc in docs:
+        func(doc)
+    return (time.perf_counter() - start) / len(docs)
+
+
+def report(label: str, size: int, baseline_cost: float, trusted_cost: float):
+    print(f"{label:<28} {size:>8,} docs   validated {baseline_cost * 1e6:7.1f} us/doc   "
+          f"trusted {trusted_cost * 1e6:7.1f} us/doc   ({baseline_cost / trusted_cost:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    distinct = min(DISTINCT_USERS, max(args.sizes))
+    access_docs = [
+        stored(analyze_user_access(UserAccess(**doc)).model_dump())
+        for doc in build_synthetic_docs(distinct, args.seed)
+    ]
+    hashed = hash_password("benchmark-password")
+    user_docs = [
+        stored(User(email=f"user{i}@example.com", hashed_password=hashed,
+                    role=UserRole.ADMIN if i % 10 == 0 else UserRole.USER).model_dump())
+        for i in range(distinct)
+    ]
+
+    # Every trusted path must produce what the validated one does
+    for doc in access_docs:
+        raw = dict(doc)
+        raw.pop("_id", None)
+        if orjson.loads(encode(raw)) != orjson.loads(encode(UserAccess(**doc))):
+            sys.exit(f"/users: stored document differs from UserAccess for {doc['user_email']}")
+        row, expected = paginated_user_row(doc), validated_paginated_row(doc)
+        if any(sorted(map(plain, row[k])) != sorted(map(plain, v)) if isinstance(v, list) else row[k] != v
+               for k, v in expected.items()):
+            sys.exit(f"/users/paginated: row differs for {doc['user_email']}")
+    for doc in user_docs:
+        if trusted_user(doc).model_dump() != User(**doc).model_dump():
+            sys.exit(f"users: trusted decode differs for {doc['email']}")
+
+    for size in args.sizes:
+        users = repeat_docs(user_docs, size, "email")
+        report("users", size, time_per_doc(lambda d: User(**d), users), time_per_doc(trusted_user, users))
+
+        docs = repeat_docs(access_docs, size, "user_email")
+        report("/users decode+encode", size,
+               time_per_doc(lambda d: encode(UserAccess(**d)), docs), time_per_doc(encode, docs))
+        report("/users/paginated row", size,
+               time_per_doc(validated_paginated_row, docs), time_per_doc(paginated_user_row, docs))
+        report("user_access model_construct", size,
+               time_per_doc(lambda d: UserAccess(**d), docs), time_per_doc(constructed_user_access, docs))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,33 @@
-from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Query, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Query, Depends, BackgroundTasks, Request, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, PlainTextResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.routing import Match
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReplaceOne, UpdateOne, ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+import bson
 import os
 import logging
+import asyncio
+import tempfile
+import multiprocessing
+import time
+import bisect
+import contextvars
+import socket
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
 import json
 import io
+from collections import OrderedDict
+import re
+import base64
+import hashlib
+import hmac
+import zlib
 import csv
 from pathlib import Path
 from datetime import datetime, timedelta
@@ -15,9 +35,13 @@ from enum import Enum
 from pydantic import BaseModel, Field, EmailStr
 from typing import List, Dict, Any, Optional
 import pandas as pd
+import numpy as np
+import ijson
 import uuid
 import jwt
 import bcrypt
+import orjson
+import brotli
 from jose import JWTError
 
 # Import enhanced models inline
@@ -38,6 +62,7 @@ class User(BaseModel):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     created_by: Optional[str] = None  # Admin who created the user
     last_login: Optional[datetime] = None
+    token_version: int = 0  # Bumped to revoke every token issued before
 
 class UserCreate(BaseModel):
     email: EmailStr
@@ -142,12 +167,23 @@ class UserAccess(BaseModel):
     groups: List[str] = []  # Group memberships
     roles: List[str] = []   # Role assignments
     
-    # Risk analysis
+    # Risk analysis (persisted at write time by analyze_user_access)
     overall_risk_score: float = 0.0
+    risk_level: str = "low"
+    risk_factors: List[Dict[str, Any]] = []
+    risk_recommendations: List[str] = []
+    risk_confidence_score: float = 0.0
     privilege_escalation_paths: List[Dict[str, Any]] = []
     unused_privileges: List[str] = []
     cross_provider_admin: bool = False
+    provider_risk: Dict[str, Dict[str, Any]] = {}  # Risk of the resources scoped to each provider
+    risk_scored_at: Optional[datetime] = None
     
+    # Denormalized for database-side filtering and sorting
+    providers: List[str] = []
+    resource_count: int = 0
+    user_email_lower: Optional[str] = None  # Case-insensitive email search from the index keys
+
     # Metadata
     last_updated: datetime = Field(default_factory=datetime.utcnow)
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -173,7 +209,7 @@ class PrivilegeEscalationPath(BaseModel):
     user_email: str
     start_privilege: str
     end_privilege: str
-    path_steps: List[Dict[str, str]]
+    path_steps: List[Dict[str, Any]]
     risk_score: float
 
 class AccessAnalytics(BaseModel):
@@ -209,6 +245,53 @@ class SearchResponse(BaseModel):
     user: Optional[UserAccess]
     graph_data: GraphData
 
+class GraphDelta(BaseModel):
+    version: str
+    since: str
+    full: bool = False  # The client's version is unknown; graph holds the whole current graph
+    graph: Optional[GraphData] = None
+    added_nodes: List[GraphNode] = []
+    changed_nodes: List[GraphNode] = []
+    removed_node_ids: List[str] = []
+    added_edges: List[GraphEdge] = []
+    changed_edges: List[GraphEdge] = []
+    removed_edge_ids: List[str] = []
+
+class GraphLevel(str, Enum):
+    PROVIDER = "provider"
+    SERVICE = "service"
+    RESOURCE = "resource"
+
+class AggregateGraphNode(GraphNode):
+    user_count: int = 0
+    grant_count: int = 0
+    privileged_count: int = 0
+    risk_score: float = 0.0  # Highest overall risk score among the users behind the node
+
+class AggregateGraphEdge(GraphEdge):
+    weight: int = 0  # Grants behind the edge
+
+class OrganizationGraph(BaseModel):
+    level: GraphLevel
+    provider: Optional[str] = None
+    service: Optional[str] = None
+    nodes: List[AggregateGraphNode]
+    edges: List[AggregateGraphEdge]
+    total_users: int
+    shown_users: int
+    total_level_nodes: int  # Nodes at the requested level before pruning
+    truncated: bool
+
+# Trusted Decoding
+# Documents in the users collection were validated when they were written, so reads rebuild
+# User with model_construct instead of running EmailStr validation again on every request.
+def trusted_user(user_doc: Dict[str, Any]) -> User:
+    """Rebuild a stored users document without validation"""
+    fields = dict(user_doc)
+    if "role" in fields:
+        fields["role"] = UserRole(fields["role"])
+    return User.model_construct(**fields)
+
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
@@ -226,9 +309,15 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 1440  # 24 hours = 1440 minutes
 security = HTTPBearer()
 
 # Password hashing utilities
+# bcrypt is deliberately slow (~200ms at cost 12), so hashing runs in a bounded thread
+# pool instead of blocking the event loop; bcrypt releases the GIL while it works.
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', str(min(4, os.cpu_count() or 1))))
+_password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt"""
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
@@ -236,6 +325,23 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check whether a bcrypt hash ($2b$<cost>$...) was made with a different cost factor"""
+    try:
+        return int(hashed_password.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password in the bcrypt thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the bcrypt thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, verify_password, plain_password, hashed_password)
+
 # JWT utilities
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token"""
@@ -248,6 +354,111 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+# Stateless JWT mode: tokens also carry the user id, role and token version, so requests
+# are authorized without a Mongo lookup. Revoking a user's tokens bumps token_version and
+# records the minimum valid version in token_revocations (TTL = token lifetime), which
+# every worker mirrors in memory and refreshes periodically. The principal cache checks
+# the same mirror, since deactivating, deleting or changing the credentials of a user revokes its tokens.
+JWT_STATELESS_AUTH = os.environ.get('JWT_STATELESS_AUTH', 'false').lower() == 'true'
+TOKEN_REVOCATION_REFRESH_SECONDS = float(os.environ.get('TOKEN_REVOCATION_REFRESH_SECONDS', '30'))
+_token_revocations: Dict[str, int] = {}  # user id -> minimum valid token version
+_token_revocation_task: Optional[asyncio.Task] = None
+
+def build_token_claims(user: User) -> Dict[str, Any]:
+    """Claims for a user's access token"""
+    claims = {"sub": user.email}
+    if JWT_STATELESS_AUTH:
+        claims.update({"uid": user.id, "role": user.role.value, "ver": user.token_version})
+    return claims
+
+async def revoke_user_tokens(user_id: str):
+    """Invalidate every token issued to a user so far"""
+    user_doc = await db.users.find_one_and_update(
+        {"id": user_id},
+        {"$inc": {"token_version": 1}},
+        projection={"_id": 0, "token_version": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if user_doc is None:
+        return
+    
+    min_token_version = user_doc["token_version"]
+    await db.token_revocations.update_one(
+        {"user_id": user_id},
+        {"$set": {"min_token_version": min_token_version, "revoked_at": datetime.utcnow()}},
+        upsert=True
+    )
+    _token_revocations[user_id] = min_token_version
+
+def token_revoked(user_id: str, token_version: int) -> bool:
+    """Whether tokens of this version were revoked, as far as this worker's mirror knows"""
+    min_token_version = _token_revocations.get(user_id)
+    return min_token_version is not None and token_version < min_token_version
+
+async def refresh_token_revocations():
+    """Reload the in-memory revocation set from token_revocations"""
+    global _token_revocations
+    _token_revocations = {
+        revocation["user_id"]: revocation["min_token_version"]
+        async for revocation in db.token_revocations.find({}, {"_id": 0, "user_id": 1, "min_token_version": 1})
+    }
+
+async def token_revocation_refresh_loop():
+    """Pick up revocations made by other workers"""
+    while True:
+        await asyncio.sleep(TOKEN_REVOCATION_REFRESH_SECONDS)
+        # Without stateless tokens the mirror only guards cached principals, and an entry
+        # cached after this skip was loaded from Mongo after any revocation it could miss
+        if not JWT_STATELESS_AUTH and not _principal_cache:
+            continue
+        try:
+            await refresh_token_revocations()
+        except Exception as e:
+            logging.error(f"Failed to refresh token revocations: {str(e)}")
+
+# Per-process TTL+LRU cache of resolved principals, keyed by (email, token). Writes to a
+# user invalidate it in the worker that made them. Other workers drop a cached principal
+# once the revocation mirror shows its token version revoked, so a user deactivated
+# through another worker stays authorized there for at most
+# min(TOKEN_REVOCATION_REFRESH_SECONDS, PRINCIPAL_CACHE_TTL_SECONDS); the TTL bounds
+# staleness of anything else.
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.environ.get('PRINCIPAL_CACHE_TTL_SECONDS', '30'))  # 0 disables the cache
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.environ.get('PRINCIPAL_CACHE_MAX_ENTRIES', '1024'))
+_principal_cache: "OrderedDict[tuple, tuple[float, User]]" = OrderedDict()
+principal_cache_stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+def get_cached_principal(cache_key: tuple) -> Optional[User]:
+    """Return a cached principal that has not expired, marking it recently used"""
+    entry = _principal_cache.get(cache_key)
+    if entry is None or entry[0] < time.monotonic():
+        if entry is not None:
+            del _principal_cache[cache_key]
+        principal_cache_stats["misses"] += 1
+        return None
+    _principal_cache.move_to_end(cache_key)
+    principal_cache_stats["hits"] += 1
+    return entry[1]
+
+def cache_principal(cache_key: tuple, user: User):
+    """Cache a resolved principal, evicting the least recently used beyond the size limit"""
+    if PRINCIPAL_CACHE_TTL_SECONDS <= 0:
+        return
+    _principal_cache[cache_key] = (time.monotonic() + PRINCIPAL_CACHE_TTL_SECONDS, user)
+    _principal_cache.move_to_end(cache_key)
+    while len(_principal_cache) > PRINCIPAL_CACHE_MAX_ENTRIES:
+        _principal_cache.popitem(last=False)
+        principal_cache_stats["evictions"] += 1
+
+def invalidate_principal_cache(user_id: Optional[str] = None, email: Optional[str] = None):
+    """Drop every cached principal for a user, matched by id or email"""
+    stale_keys = [
+        cache_key for cache_key, (_, user) in _principal_cache.items()
+        if user.id == user_id or cache_key[0] == email
+    ]
+    for cache_key in stale_keys:
+        del _principal_cache[cache_key]
+    principal_cache_stats["invalidations"] += len(stale_keys)
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Get current authenticated user from JWT token"""
     credentials_exception = HTTPException(
@@ -266,14 +477,35 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     except JWTError:
         raise credentials_exception
     
+    # Tokens issued before stateless mode was enabled fall through to the lookup
+    if JWT_STATELESS_AUTH and "uid" in payload:
+        if token_revoked(payload["uid"], payload.get("ver", 0)):
+            raise credentials_exception
+        return User.model_construct(
+            id=payload["uid"],
+            email=email,
+            role=UserRole(payload["role"]),
+            is_active=True,
+            hashed_password="",
+            token_version=payload.get("ver", 0)
+        )
+    
+    cache_key = (token_data.email, token)
+    user = get_cached_principal(cache_key)
+    if user is not None:
+        if not token_revoked(user.id, user.token_version):
+            return user
+        invalidate_principal_cache(user_id=user.id)  # Revoked in another worker: look the user up again
+    
     user_doc = await db.users.find_one({"email": token_data.email})
     if user_doc is None:
         raise credentials_exception
     
-    user = User(**user_doc)
+    user = trusted_user(user_doc)
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     
+    cache_principal(cache_key, user)
     return user
 
 async def get_current_admin_user(current_user: User = Depends(get_current_user)):
@@ -285,6 +517,427 @@ async def get_current_admin_user(current_user: User = Depends(get_current_user))
         )
     return current_user
 
+# Response Encoding
+
+def orjson_default(obj: Any) -> Any:
+    """Serialize values orjson does not handle natively"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class ORJSONModelResponse(Response):
+    """JSON response encoded by orjson, with pydantic models dumped as they are.
+    
+    Returning one from a handler skips FastAPI's response_model re-validation and
+    jsonable_encoder pass, which dominate for large lists of nested models.
+    """
+    media_type = "application/json"
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=orjson_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))  # 0 disables compression
+GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', '6'))
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', '4'))
+COMPRESSIBLE_MEDIA_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header by q-value, preferring br on ties"""
+    qualities = {}
+    for offer in accept_encoding.split(","):
+        coding, _, params = offer.partition(";")
+        quality = 1.0
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding.strip().lower()] = quality
+    
+    best, best_quality = None, 0.0
+    for coding in ("br", "gzip"):
+        quality = qualities.get(coding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+def make_compressor(encoding: str) -> tuple:
+    """(compress, flush, finish) callables for one response body"""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        return compressor.process, compressor.flush, compressor.finish
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    return compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+class CompressionMiddleware:
+    """Compress JSON and text responses with brotli or gzip, as the client accepts.
+    
+    Whole bodies under minimum_size go out as they are; streamed bodies (exports) are
+    compressed chunk by chunk and flushed so they keep streaming.
+    """
+    
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.minimum_size <= 0:
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        
+        start_message = None
+        compressor = None
+        passthrough = False
+        
+        async def send_compressed(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message  # Held until the first body chunk shows the size
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                compressible = (
+                    headers.get("content-type", "").startswith(COMPRESSIBLE_MEDIA_TYPES)
+                    and "content-encoding" not in headers
+                )
+                if not compressible or (not more_body and len(body) < self.minimum_size):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                
+                compress, flush, finish = compressor = make_compressor(encoding)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if headers.get("etag", "").startswith('"'):
+                    headers["ETag"] = "W/" + headers["etag"]  # Same content, different bytes
+                del headers["Content-Length"]
+                if not more_body:
+                    compress_start = time.perf_counter()
+                    body = compress(body) + finish()
+                    headers["Content-Length"] = str(len(body))
+                    if "server-timing" in headers:
+                        compress_ms = (time.perf_counter() - compress_start) * 1000
+                        headers["Server-Timing"] = f"{headers['server-timing']}, compress;dur={compress_ms:.1f}"
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send(start_message)
+            
+            compress, flush, finish = compressor
+            chunk = compress(body) + (flush() if more_body else finish())
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+        
+        await self.app(scope, receive, send_compressed)
+
+# Request Metrics
+# Per-worker counters and histograms in the Prometheus text format, served at /api/metrics.
+# Requests are labelled by route template (not raw path) so label sets stay bounded. Each
+# worker publishes a snapshot to worker_metrics (expired by a TTL index in init-mongo.js),
+# so a scrape of any one worker can report the sum across all of them.
+METRICS_PREFIX = "cloud_access"
+METRICS_PUBLISH_SECONDS = float(os.environ.get('METRICS_PUBLISH_SECONDS', '15'))
+METRICS_WORKER_TTL_SECONDS = float(os.environ.get('METRICS_WORKER_TTL_SECONDS', '120'))  # Drop snapshots of dead workers
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # Static bearer token for scrapers; admins can always read
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RESPONSE_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# name -> (type, help, label names, histogram buckets)
+METRIC_DEFINITIONS = {
+    "http_requests_total": ("counter", "HTTP requests by route template and status", ("method", "route", "status"), None),
+    "http_request_duration_seconds": ("histogram", "Time until the response was sent", ("method", "route"), LATENCY_BUCKETS),
+    "http_response_size_bytes": ("histogram", "Response body bytes as sent (after compression)", ("method", "route"), RESPONSE_SIZE_BUCKETS),
+    "http_requests_in_flight": ("gauge", "Requests being handled", ("method", "route"), None),
+    "collection_scans_total": ("counter", "Multi-document user_access queries and aggregations by operation", ("route", "operation"), None),
+    "documents_scanned_total": ("counter", "user_access documents returned to the application (not counted inside aggregations)", ("route", "operation"), None),
+    "risk_evaluations_total": ("counter", "Risk scores computed: per user, per provider or vectorized", ("route", "kind"), None),
+    "cache_hits_total": ("counter", "Cache hits", ("cache",), None),
+    "cache_misses_total": ("counter", "Cache misses", ("cache",), None),
+    "cache_evictions_total": ("counter", "Entries evicted to stay within the cache size", ("cache",), None)
+}
+
+_metric_values: Dict[str, Dict[tuple, float]] = {}  # counters and gauges: name -> labels -> value
+_metric_histograms: Dict[str, Dict[tuple, list]] = {}  # name -> labels -> [bucket counts..., sum, count]
+_metrics_route: contextvars.ContextVar[str] = contextvars.ContextVar("metrics_route", default="background")
+_metrics_publish_task: Optional[asyncio.Task] = None
+
+def inc_metric(name: str, labels: tuple, value: float = 1):
+    """Add to a counter or gauge"""
+    values = _metric_values.setdefault(name, {})
+    values[labels] = values.get(labels, 0) + value
+
+def observe_metric(name: str, labels: tuple, value: float):
+    """Record one observation in a histogram"""
+    buckets = METRIC_DEFINITIONS[name][3]
+    histogram = _metric_histograms.setdefault(name, {})
+    state = histogram.get(labels)
+    if state is None:
+        state = histogram[labels] = [0] * (len(buckets) + 3)  # One count per bucket and +Inf, then sum and count
+    state[bisect.bisect_left(buckets, value)] += 1  # Cumulated when rendered
+    state[-2] += value
+    state[-1] += 1
+
+def record_scan(operation: str, documents: int = 0):
+    """Count a multi-document user_access read and the documents it returned so far"""
+    labels = (_metrics_route.get(), operation)
+    inc_metric("collection_scans_total", labels)
+    inc_metric("documents_scanned_total", labels, documents)
+
+def count_scanned_documents(operation: str, documents: int = 1):
+    """Count documents of a scan as a cursor hands them over"""
+    inc_metric("documents_scanned_total", (_metrics_route.get(), operation), documents)
+
+def count_risk_evaluations(kind: str, count: int = 1):
+    """Count risk scores computed; kind is user, provider or vectorized"""
+    inc_metric("risk_evaluations_total", (_metrics_route.get(), kind), count)
+
+def metrics_snapshot() -> Dict[str, Any]:
+    """This worker's metrics as plain JSON-friendly lists"""
+    values = {name: dict(series) for name, series in _metric_values.items()}
+    for cache, stats in (("principal", principal_cache_stats), ("graph", graph_cache_stats)):
+        for name, field in (("cache_hits_total", "hits"), ("cache_misses_total", "misses"), ("cache_evictions_total", "evictions")):
+            values.setdefault(name, {})[(cache,)] = stats[field]
+    return {
+        "values": {name: [[list(labels), value] for labels, value in series.items()] for name, series in values.items()},
+        "histograms": {
+            name: [[list(labels), list(state)] for labels, state in series.items()]
+            for name, series in _metric_histograms.items()
+        }
+    }
+
+def merge_metrics_snapshots(snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sum snapshots from several workers series by series"""
+    values: Dict[str, Dict[tuple, float]] = {}
+    histograms: Dict[str, Dict[tuple, list]] = {}
+    for snapshot in snapshots:
+        for name, series in snapshot["values"].items():
+            merged = values.setdefault(name, {})
+            for labels, value in series:
+                merged[tuple(labels)] = merged.get(tuple(labels), 0) + value
+        for name, series in snapshot["histograms"].items():
+            merged = histograms.setdefault(name, {})
+            for labels, state in series:
+                previous = merged.get(tuple(labels))
+                merged[tuple(labels)] = state if previous is None else [a + b for a, b in zip(previous, state)]
+    return {
+        "values": {name: [[list(labels), value] for labels, value in series.items()] for name, series in values.items()},
+        "histograms": {name: [[list(labels), state] for labels, state in series.items()] for name, series in histograms.items()}
+    }
+
+def escape_label_value(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def format_metric_labels(names: tuple, values: list, extra: str = "") -> str:
+    pairs = [f'{name}="{escape_label_value(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def format_metric_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+def render_metrics(snapshot: Dict[str, Any], workers: int) -> str:
+    """Render a snapshot in the Prometheus text exposition format"""
+    lines = [
+        f"# HELP {METRICS_PREFIX}_metrics_workers Workers whose metrics are included",
+        f"# TYPE {METRICS_PREFIX}_metrics_workers gauge",
+        f"{METRICS_PREFIX}_metrics_workers {workers}"
+    ]
+    for name, (metric_type, help_text, label_names, buckets) in METRIC_DEFINITIONS.items():
+        full_name = f"{METRICS_PREFIX}_{name}"
+        lines.append(f"# HELP {full_name} {help_text}")
+        lines.append(f"# TYPE {full_name} {metric_type}")
+        if metric_type != "histogram":
+            for labels, value in sorted(snapshot["values"].get(name, []), key=lambda item: item[0]):
+                lines.append(f"{full_name}{format_metric_labels(label_names, labels)} {format_metric_value(value)}")
+            continue
+        for labels, state in sorted(snapshot["histograms"].get(name, []), key=lambda item: item[0]):
+            cumulative = 0
+            for bound, count in zip([*buckets, "+Inf"], state[:-2]):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{full_name}_bucket{format_metric_labels(label_names, labels, le)} {cumulative}")
+            lines.append(f"{full_name}_sum{format_metric_labels(label_names, labels)} {format_metric_value(state[-2])}")
+            lines.append(f"{full_name}_count{format_metric_labels(label_names, labels)} {state[-1]}")
+    return "\n".join(lines) + "\n"
+
+def metrics_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+async def publish_metrics():
+    """Store this worker's snapshot for the aggregated view"""
+    await db.worker_metrics.replace_one(
+        {"worker": metrics_worker_id()},
+        {"worker": metrics_worker_id(), "snapshot": metrics_snapshot(), "updated_at": datetime.utcnow()},
+        upsert=True
+    )
+
+async def collect_worker_metrics() -> List[Dict[str, Any]]:
+    """Fresh snapshots of every worker, with this worker's taken live"""
+    fresh_after = datetime.utcnow() - timedelta(seconds=METRICS_WORKER_TTL_SECONDS)
+    snapshots = [
+        worker_doc["snapshot"]
+        async for worker_doc in db.worker_metrics.find(
+            {"updated_at": {"$gte": fresh_after}, "worker": {"$ne": metrics_worker_id()}},
+            {"_id": 0, "snapshot": 1}
+        )
+    ]
+    return [metrics_snapshot(), *snapshots]
+
+async def metrics_publish_loop():
+    """Keep this worker's snapshot current for scrapes served by other workers"""
+    while True:
+        try:
+            await publish_metrics()
+        except Exception as e:
+            logging.error(f"Failed to publish worker metrics: {str(e)}")
+        await asyncio.sleep(METRICS_PUBLISH_SECONDS)
+
+def route_template(scope) -> str:
+    """The path template of the route a request will hit, e.g. /api/search/{user_email}"""
+    partial = None
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path  # Path matches, method does not (405), unless a later route takes it
+    return partial or "unmatched"
+
+class MetricsMiddleware:
+    """Count requests, time them until the response is sent and track response sizes per route template.
+    
+    Background tasks that run after the response (streaming imports) are not part of the
+    latency, but their scans and risk evaluations are labelled with the route.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route = route_template(scope)
+        labels = (scope["method"], route)
+        status_code = 500
+        response_size = 0
+        finished = False
+        start = time.perf_counter()
+        
+        def finish():
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            inc_metric("http_requests_in_flight", labels, -1)
+            inc_metric("http_requests_total", (*labels, str(status_code)))
+            observe_metric("http_request_duration_seconds", labels, time.perf_counter() - start)
+            observe_metric("http_response_size_bytes", labels, response_size)
+        
+        async def send_tracked(message):
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finish()
+        
+        inc_metric("http_requests_in_flight", labels)
+        route_token = _metrics_route.set(route)
+        try:
+            await self.app(scope, receive, send_tracked)
+        finally:
+            finish()
+            _metrics_route.reset(route_token)
+
+# Server Timing
+# Per-phase wall-clock time of the heavy read endpoints (/analytics, /users/paginated),
+# sent as a Server-Timing header so browser devtools show where a slow request went.
+# Phases are exclusive: time spent in a nested phase (scoring a legacy document inside
+# row building) is reported under that phase only, so the entries add up to the total.
+SERVER_TIMING = os.environ.get('SERVER_TIMING', 'true').lower() == 'true'
+SERVER_TIMING_ALLOW_ORIGIN = os.environ.get('SERVER_TIMING_ALLOW_ORIGIN', '*')  # Timing-Allow-Origin for a cross-origin frontend
+
+class PhaseTimer:
+    """Accumulates exclusive durations of named phases of one request"""
+    
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self._stack: List[list] = []  # [name, start, seconds spent in nested phases]
+    
+    @contextmanager
+    def phase(self, name: str):
+        frame = [name, time.perf_counter(), 0.0]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            elapsed = time.perf_counter() - frame[1]
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed - frame[2]
+            if self._stack:
+                self._stack[-1][2] += elapsed
+    
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+    
+    def header(self) -> str:
+        entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.phases.items()]
+        entries.append(f"total;dur={self.elapsed_ms():.1f}")
+        return ", ".join(entries)
+    
+    def debug_block(self) -> Dict[str, Any]:
+        """Phase timings for the response body, up to the point it is built (serialization is header-only)"""
+        return {
+            "phases_ms": {name: round(seconds * 1000, 3) for name, seconds in self.phases.items()},
+            "total_ms": round(self.elapsed_ms(), 3)
+        }
+
+_phase_timer: contextvars.ContextVar[Optional[PhaseTimer]] = contextvars.ContextVar("phase_timer", default=None)
+
+def start_phase_timer(debug: bool = False) -> Optional[PhaseTimer]:
+    """Time the current request's phases; a debug request is timed even with SERVER_TIMING off"""
+    if not (SERVER_TIMING or debug):
+        return None
+    timer = PhaseTimer()
+    _phase_timer.set(timer)
+    return timer
+
+@contextmanager
+def timed_phase(name: str):
+    """Time a block under the current request's timer, if it has one"""
+    timer = _phase_timer.get()
+    if timer is None:
+        yield
+        return
+    with timer.phase(name):
+        yield
+
+def timed_response(timer: Optional[PhaseTimer], content: Any) -> Response:
+    """Serialize content as a timed phase and attach the Server-Timing header"""
+    with timed_phase("serialize"):
+        response = ORJSONModelResponse(content)
+    if timer is not None:
+        response.headers["Server-Timing"] = timer.header()
+        if SERVER_TIMING_ALLOW_ORIGIN:
+            response.headers["Timing-Allow-Origin"] = SERVER_TIMING_ALLOW_ORIGIN
+    return response
+
 # Create the main app without a prefix
 app = FastAPI(title="Cloud Access Visualization API", version="3.0.0")
 
@@ -444,7 +1097,7 @@ async def init_default_admin():
         # Create primary admin user
         primary_admin = User(
             email="self@iamsharn.com",
-            hashed_password=hash_password("Testing@123"),
+            hashed_password=await hash_password_async("Testing@123"),
             role=UserRole.ADMIN,
             created_at=datetime.utcnow()
         )
@@ -454,7 +1107,7 @@ async def init_default_admin():
         # Create secondary admin user for backward compatibility
         secondary_admin = User(
             email="adminn@iamsharan.com",
-            hashed_password=hash_password("Testing@123"),
+            hashed_password=await hash_password_async("Testing@123"),
             role=UserRole.ADMIN,
             created_at=datetime.utcnow()
         )
@@ -497,6 +1150,27 @@ class AuditEvent(BaseModel):
     ip_address: Optional[str] = None
     user_agent: Optional[str] = None
 
+# Import Job Models
+class ImportJob(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    status: str = "queued"  # queued, running, completed, failed
+    filename: str
+    created_by: str
+    processed_users: int = 0
+    imported_users: int = 0
+    inserted_users: int = 0
+    updated_users: int = 0
+    failed_users: int = 0
+    batches: int = 0
+    batch_results: List[Dict[str, int]] = []
+    errors: List[str] = []
+    metadata: Dict[str, Any] = {}
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+IMPORT_JOB_MAX_ERRORS = 20
+
 # Enhanced Risk Analysis Functions
 
 # Define sensitive resources patterns
@@ -602,18 +1276,44 @@ SENSITIVE_RESOURCES = {
     ]
 }
 
-def is_sensitive_resource(resource: CloudResource) -> tuple[bool, str, str]:
-    """Check if a resource is considered sensitive"""
-    provider_patterns = SENSITIVE_RESOURCES.get(resource.provider, [])
-    
-    for sensitive in provider_patterns:
-        if sensitive.service.lower() == resource.service.lower():
-            for pattern in sensitive.resource_patterns:
-                if pattern.lower() in resource.resource_name.lower():
-                    return True, sensitive.sensitivity_level, sensitive.description
+# Compiled sensitive-resource matcher, keyed by lowercase (provider, service).
+# Each key holds the rules for that service in table order, with all of a rule's
+# patterns folded into one precompiled alternation.
+_sensitive_matcher: Dict[tuple, List[tuple]] = {}
+
+def rebuild_sensitive_resource_matcher() -> None:
+    """Recompile the sensitive-resource matcher; call after changing SENSITIVE_RESOURCES"""
+    global _sensitive_matcher
+    matcher: Dict[tuple, List[tuple]] = {}
+    for provider, rules in SENSITIVE_RESOURCES.items():
+        provider_key = getattr(provider, "value", provider).lower()
+        for sensitive in rules:
+            if not sensitive.resource_patterns:
+                continue
+            regex = re.compile("|".join(re.escape(pattern.lower()) for pattern in sensitive.resource_patterns))
+            matcher.setdefault((provider_key, sensitive.service.lower()), []).append(
+                (regex.search, sensitive.sensitivity_level, sensitive.description)
+            )
+    _sensitive_matcher = matcher
+
+rebuild_sensitive_resource_matcher()
+
+def match_sensitive_resource(provider: str, service: str, resource_name: str) -> tuple[bool, str, str]:
+    """Check a provider, service and resource name against the sensitive-resource rules"""
+    # CloudProvider is a str enum, so it hashes and compares like its lowercase value
+    rules = _sensitive_matcher.get((provider, service.lower()))
+    if rules:
+        resource_name = resource_name.lower()
+        for search, sensitivity_level, description in rules:
+            if search(resource_name):
+                return True, sensitivity_level, description
     
     return False, "low", "Standard resource"
 
+def is_sensitive_resource(resource: CloudResource) -> tuple[bool, str, str]:
+    """Check if a resource is considered sensitive"""
+    return match_sensitive_resource(resource.provider, resource.service, resource.resource_name)
+
 def calculate_cross_account_risk(user_access: UserAccess) -> float:
     """Calculate risk from cross-account access patterns"""
     accounts = set()
@@ -925,28 +1625,383 @@ def calculate_comprehensive_risk_score(user_access: UserAccess) -> RiskAnalysisR
         confidence_score=min(confidence_score, 1.0)
     )
 
+def find_unused_privileges(resources: List[CloudResource]) -> List[str]:
+    """List provider-service keys of grants unused for more than 90 days"""
+    now = datetime.utcnow()
+    return [
+        f"{resource.provider}-{resource.service}"
+        for resource in resources
+        if resource.last_used and (now - resource.last_used).days > 90
+    ]
+
+def calculate_provider_risk(user_access: UserAccess, provider: str) -> Dict[str, Any]:
+    """Score the user's resources for a single provider as if they were the only grants"""
+    count_risk_evaluations("provider")
+    provider_resources = [r for r in user_access.resources if r.provider == provider]
+    scoped_user = user_access.model_copy(update={
+        "resources": provider_resources,
+        "cross_provider_admin": False,
+        "privilege_escalation_paths": [],
+        "unused_privileges": []
+    })
+    risk_result = calculate_comprehensive_risk_score(scoped_user)
+
+    return {
+        "risk_score": risk_result.overall_score,
+        "risk_level": risk_result.risk_level,
+        "confidence_score": risk_result.confidence_score,
+        "top_risk_factors": [rf.factor_type for rf in risk_result.risk_factors[:3]],
+        "cross_provider_admin": scoped_user.cross_provider_admin,
+        "privilege_escalation_count": len(scoped_user.privilege_escalation_paths),
+        "unused_privileges_count": len(find_unused_privileges(provider_resources)),
+        "resource_count": len(provider_resources)
+    }
+
 def analyze_user_access(user_access: UserAccess) -> UserAccess:
-    """Perform comprehensive risk analysis on user access"""
-    # Run comprehensive risk analysis
+    """Perform comprehensive risk analysis on user access and store the results on it"""
+    count_risk_evaluations("user")
+    # Reset flags the scoring functions only ever set, so rescoring is idempotent
+    user_access.cross_provider_admin = False
+
+    # Run comprehensive risk analysis (also sets escalation paths and cross-provider admin)
     risk_result = calculate_comprehensive_risk_score(user_access)
-    
+
     # Update user access with results
     user_access.overall_risk_score = risk_result.overall_score
-    
-    # Calculate privilege escalation paths separately to ensure they're set
-    _, _, escalation_paths = calculate_privilege_escalation_risk(user_access)
-    user_access.privilege_escalation_paths = escalation_paths
-    
-    # Detect unused privileges with 90-day threshold
-    user_access.unused_privileges = [
-        f"{resource.provider}-{resource.service}"
-        for resource in user_access.resources
-        if resource.last_used and (datetime.utcnow() - resource.last_used).days > 90
+    user_access.risk_level = risk_result.risk_level
+    user_access.risk_factors = [rf.dict() for rf in risk_result.risk_factors]
+    user_access.risk_recommendations = risk_result.recommendations
+    user_access.risk_confidence_score = risk_result.confidence_score
+    user_access.privilege_escalation_paths = [
+        path.dict() if isinstance(path, PrivilegeEscalationPath) else path
+        for path in user_access.privilege_escalation_paths
     ]
-    
+
+    # Detect unused privileges with 90-day threshold
+    user_access.unused_privileges = find_unused_privileges(user_access.resources)
+
+    # Provider-scoped scores serve the per-provider dashboards and filters
+    providers = set(CloudProvider(r.provider).value for r in user_access.resources)
+    if len(providers) == 1:
+        provider = next(iter(providers))
+        user_access.provider_risk = {provider: {
+            "risk_score": risk_result.overall_score,
+            "risk_level": risk_result.risk_level,
+            "confidence_score": risk_result.confidence_score,
+            "top_risk_factors": [rf.factor_type for rf in risk_result.risk_factors[:3]],
+            "cross_provider_admin": user_access.cross_provider_admin,
+            "privilege_escalation_count": len(user_access.privilege_escalation_paths),
+            "unused_privileges_count": len(user_access.unused_privileges),
+            "resource_count": len(user_access.resources)
+        }}
+    else:
+        user_access.provider_risk = {
+            provider: calculate_provider_risk(user_access, provider)
+            for provider in providers
+        }
+
+    user_access.providers = sorted(providers)
+    user_access.resource_count = len(user_access.resources)
+    user_access.user_email_lower = user_access.user_email.lower()
+    user_access.risk_scored_at = datetime.utcnow()
+    return user_access
+
+# Fields written by analyze_user_access and persisted on user_access documents
+ANALYZED_FIELDS = (
+    "overall_risk_score",
+    "risk_level",
+    "risk_factors",
+    "risk_recommendations",
+    "risk_confidence_score",
+    "privilege_escalation_paths",
+    "unused_privileges",
+    "cross_provider_admin",
+    "provider_risk",
+    "risk_scored_at",
+    "providers",
+    "resource_count",
+    "user_email_lower"
+)
+
+def ensure_risk_analysis(user_access: UserAccess) -> UserAccess:
+    """Return the user with its stored risk analysis, scoring documents imported before it was persisted"""
+    if user_access.risk_scored_at is None:
+        return analyze_user_access(user_access)
     return user_access
 
+def get_provider_risk(user_access: UserAccess, provider: str) -> Dict[str, Any]:
+    """Get the stored provider-scoped risk summary for a user"""
+    provider_risk = user_access.provider_risk.get(provider)
+    if provider_risk is None:
+        provider_risk = calculate_provider_risk(user_access, provider)
+    return provider_risk
+
+# Vectorized Risk Engine
+# Scores many users at once from columnar grant arrays. It reproduces the numeric
+# results of calculate_comprehensive_risk_score (score, level, confidence and the
+# cross-provider admin, escalation and unused-privilege counts) without building
+# pydantic objects, so tenant-wide analytics can score 100k+ users in one pass.
+RISK_ACCESS_CODES = {access.value: code for code, access in enumerate(AccessType)}
+RISK_ACCESS_MULTIPLIERS = np.array([
+    {"read": 1.0, "write": 1.5, "admin": 2.5, "owner": 3.0}.get(access.value, 1.0)
+    for access in AccessType
+] + [1.0])  # Trailing entry for unknown access types (code -1)
+RISK_SENSITIVITY_CODES = {"low": 1, "medium": 2, "high": 3, "critical": 4}
+RISK_SENSITIVITY_BASE_SCORES = np.array([0.0, 2.0, 5.0, 10.0, 20.0])
+RISK_LEVEL_NAMES = np.array(["low", "medium", "high", "critical"])
+RISK_UNUSED_AFTER = np.timedelta64(91, "D")  # More than 90 whole days unused
+
+def build_risk_columns(user_docs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Flatten raw user_access documents into columnar grant arrays for the risk engine"""
+    user_resources = [user_doc.get("resources") or [] for user_doc in user_docs]
+    resources = [resource for user_grants in user_resources for resource in user_grants]
+    user_index = np.repeat(np.arange(len(user_docs), dtype=np.int64), [len(grants) for grants in user_resources])
+
+    provider_codes, provider_names = pd.factorize(pd.Series([r["provider"] for r in resources], dtype=object))
+    service_names = [r["service"] for r in resources]
+    # Escalation groups by exact provider-service, as calculate_privilege_escalation_risk does
+    service_codes, service_keys = pd.factorize(pd.Series(list(zip(provider_codes.tolist(), service_names)), dtype=object))
+    access_values, access_names = pd.factorize(pd.Series([r["access_type"] for r in resources], dtype=object))
+    access_lookup = np.array([RISK_ACCESS_CODES.get(name, -1) for name in access_names] + [-1], dtype=np.int64)
+    account_codes, _ = pd.factorize(pd.Series([r.get("account_id") or None for r in resources], dtype=object))
+
+    # Only grants on services that have sensitive-resource rules need name matching
+    sensitivity = np.zeros(len(resources), dtype=np.int64)
+    ruled_keys = np.array([
+        (provider_names[provider_code], service.lower()) in _sensitive_matcher
+        for provider_code, service in service_keys
+    ], dtype=bool)
+    ruled = np.flatnonzero(ruled_keys[service_codes])
+    if len(ruled):
+        # Match each distinct (provider-service, resource name) pair once
+        name_codes, names = pd.factorize(pd.Series([resources[index]["resource_name"] for index in ruled.tolist()], dtype=object))
+        pairs, pair_index = np.unique(service_codes[ruled].astype(np.int64) * len(names) + name_codes, return_inverse=True)
+        name_list, service_list, provider_list = names.tolist(), service_keys.tolist(), provider_names.tolist()
+        levels = []
+        for service_code, name_code in zip(*np.divmod(pairs, len(name_list))):
+            provider_code, service = service_list[service_code]
+            is_sensitive, sensitivity_level, _ = match_sensitive_resource(provider_list[provider_code], service, name_list[name_code])
+            levels.append(RISK_SENSITIVITY_CODES[sensitivity_level] if is_sensitive else 0)
+        sensitivity[ruled] = np.array(levels, dtype=np.int64)[pair_index]
+
+    return {
+        "user_count": len(user_docs),
+        "providers": {name: code for code, name in enumerate(provider_names)},
+        "is_service_account": np.array([bool(doc.get("is_service_account")) for doc in user_docs], dtype=bool),
+        "user": user_index,
+        "provider": provider_codes.astype(np.int64),
+        "service": service_codes.astype(np.int64),
+        "access": access_lookup[access_values],
+        "account": account_codes.astype(np.int64),
+        # Stored as naive UTC, like datetime.utcnow()
+        "last_used": pd.to_datetime(pd.Series([r.get("last_used") for r in resources], dtype=object)).to_numpy(dtype="datetime64[us]"),
+        "privileged": np.array([bool(r.get("is_privileged")) for r in resources], dtype=bool),
+        "sensitivity": sensitivity
+    }
+
+def count_distinct_per_user(user: np.ndarray, codes: np.ndarray, user_count: int) -> np.ndarray:
+    """Count distinct non-negative codes per user"""
+    if not len(user):
+        return np.zeros(user_count, dtype=np.int64)
+    stride = int(codes.max()) + 1
+    pairs = np.unique(user * stride + codes)
+    return np.bincount(pairs // stride, minlength=user_count)
+
+def score_risk_columns(columns: Dict[str, Any], provider: Optional[str] = None,
+                       now: Optional[datetime] = None) -> Dict[str, np.ndarray]:
+    """Score every user in the columns, optionally scoped to one provider's grants"""
+    n = columns["user_count"]
+    count_risk_evaluations("vectorized", n)
+    now = np.datetime64(now or datetime.utcnow(), "us")
+
+    grants = slice(None)
+    if provider is not None:
+        grants = columns["provider"] == columns["providers"].get(provider, -1)
+    user = columns["user"][grants]
+    access = columns["access"][grants]
+    account = columns["account"][grants]
+    last_used = columns["last_used"][grants]
+    sensitivity = columns["sensitivity"][grants]
+
+    is_read = access == RISK_ACCESS_CODES["read"]
+    is_write = access == RISK_ACCESS_CODES["write"]
+    is_admin = access == RISK_ACCESS_CODES["admin"]
+
+    resource_count = np.bincount(user, minlength=n)
+    admin_count = np.bincount(user[is_admin], minlength=n)
+    privileged_count = np.bincount(user[columns["privileged"][grants]], minlength=n)
+    provider_count = count_distinct_per_user(user, columns["provider"][grants], n)
+    has_account = account >= 0
+    account_count = count_distinct_per_user(user[has_account], account[has_account], n)
+
+    # 1. Basic access patterns
+    total = admin_count * 12.0
+    total = total + np.where(privileged_count > admin_count, privileged_count * 5.0, 0.0)
+    multi_provider = provider_count > 2
+    cross_provider_admin = multi_provider & (admin_count > 0)
+    total = total + np.where(multi_provider, provider_count * 8.0, 0.0)
+    total = total + np.where(cross_provider_admin, 25.0, 0.0)
+
+    # 2. Cross-account access
+    cross_account = np.where(account_count > 1, account_count * 15.0, 0.0)
+    cross_account = cross_account + np.where(account_count > 3, 20.0, 0.0)
+    total = total + np.minimum(cross_account, 50.0)
+
+    # 3. Sensitive resources
+    is_sensitive = sensitivity > 0
+    sensitive_weights = RISK_SENSITIVITY_BASE_SCORES[sensitivity] * RISK_ACCESS_MULTIPLIERS[access]
+    sensitive_count = np.bincount(user[is_sensitive], minlength=n)
+    sensitive = np.bincount(user, weights=sensitive_weights, minlength=n)
+    sensitive = sensitive + np.where(sensitive_count > 5, sensitive_count * 2.0, 0.0)
+    total = total + np.minimum(sensitive, 60.0)
+
+    # 4. Unused privileges
+    has_last_used = ~np.isnat(last_used)
+    is_unused = has_last_used & (now - last_used >= RISK_UNUSED_AFTER)
+    unused_count = np.bincount(user[is_unused], minlength=n)
+    unused_admin_count = np.bincount(user[is_unused & is_admin], minlength=n)
+    unused = unused_admin_count * 8.0 + (unused_count - unused_admin_count) * 3.0
+    total = total + np.minimum(unused, 40.0)
+
+    # 5. Privilege escalation, per user and provider-service group
+    escalation = np.zeros(n)
+    escalation_count = np.zeros(n, dtype=np.int64)
+    if len(user):
+        service = columns["service"][grants]
+        stride = int(service.max()) + 1
+        groups, group_index = np.unique(user * stride + service, return_inverse=True)
+        group_access = np.zeros((len(groups), 3), dtype=bool)
+        for column, mask in enumerate((is_read, is_write, is_admin)):
+            group_access[group_index[mask], column] = True
+        has_read, has_write, has_admin = group_access.T
+        group_score = np.select(
+            [has_read & has_write & has_admin, has_read & has_admin, has_write & has_admin],
+            [30.0, 20.0, 15.0],
+            0.0
+        )
+        group_user = groups // stride
+        escalation = np.bincount(group_user, weights=group_score, minlength=n)
+        escalation_count = np.bincount(group_user[group_score > 0], minlength=n)
+    total = total + np.minimum(escalation, 50.0)
+
+    # 6. Service account adjustment
+    total = np.where(columns["is_service_account"], total * 1.3, total)
+
+    score = np.minimum(total, 100.0)
+    level = RISK_LEVEL_NAMES[np.searchsorted([30.0, 60.0, 80.0], score, side="right")]
+    confidence = 0.8 + np.where(np.bincount(user[has_last_used], minlength=n) > 0, 0.1, 0.0)
+    confidence = np.minimum(confidence + np.where(resource_count > 5, 0.1, 0.0), 1.0)
+
+    return {
+        "risk_score": score,
+        "risk_level": level,
+        "confidence_score": confidence,
+        "resource_count": resource_count,
+        "admin_count": admin_count,
+        "cross_provider_admin": cross_provider_admin,
+        "privilege_escalation_count": escalation_count,
+        "unused_privileges_count": unused_count
+    }
+
 # Audit Logging Functions
+# Events go through an in-process queue drained by a background writer with insert_many,
+# flushed when a batch fills, on an interval and at shutdown. Events that cannot be queued
+# or written are appended to a local spill file and replayed into audit_logs at startup.
+AUDIT_QUEUE_SIZE = int(os.environ.get('AUDIT_QUEUE_SIZE', '10000'))
+AUDIT_BATCH_SIZE = int(os.environ.get('AUDIT_BATCH_SIZE', '200'))
+AUDIT_FLUSH_INTERVAL_SECONDS = float(os.environ.get('AUDIT_FLUSH_INTERVAL_SECONDS', '1'))
+AUDIT_SPILL_PATH = Path(os.environ.get('AUDIT_SPILL_PATH', str(ROOT_DIR / 'audit-spill.ndjson')))
+_audit_queue: Optional[asyncio.Queue] = None
+_audit_writer_task: Optional[asyncio.Task] = None
+
+def spill_audit_events(audit_docs: List[Dict[str, Any]]):
+    """Append audit events to the local spill file so they are never dropped"""
+    with open(AUDIT_SPILL_PATH, "a", encoding="utf-8") as spill_file:
+        for audit_doc in audit_docs:
+            spill_file.write(json.dumps({k: v for k, v in audit_doc.items() if k != "_id"}, default=str) + "\n")
+    logging.warning(f"Spilled {len(audit_docs)} audit events to {AUDIT_SPILL_PATH}")
+
+async def write_audit_events(audit_docs: List[Dict[str, Any]]):
+    """Insert a batch of audit events, spilling whatever could not be written"""
+    if not audit_docs:
+        return
+    try:
+        await db.audit_logs.insert_many(audit_docs, ordered=False)
+    except BulkWriteError as e:
+        # Duplicate ids are events already written, e.g. by an earlier replay
+        failed = [
+            audit_docs[write_error["index"]] for write_error in e.details.get("writeErrors", [])
+            if write_error.get("code") != 11000
+        ]
+        if failed:
+            spill_audit_events(failed)
+    except Exception as e:
+        logging.error(f"Failed to write audit events: {str(e)}")
+        spill_audit_events(audit_docs)
+
+async def audit_writer_loop(audit_queue: asyncio.Queue):
+    """Drain the audit queue in batches until the shutdown sentinel (None) arrives"""
+    loop = asyncio.get_running_loop()
+    while True:
+        audit_doc = await audit_queue.get()
+        if audit_doc is None:
+            return
+        batch = [audit_doc]
+        deadline = loop.time() + AUDIT_FLUSH_INTERVAL_SECONDS
+        stopping = False
+        while len(batch) < AUDIT_BATCH_SIZE:
+            try:
+                audit_doc = await asyncio.wait_for(audit_queue.get(), max(deadline - loop.time(), 0))
+            except asyncio.TimeoutError:
+                break
+            if audit_doc is None:
+                stopping = True
+                break
+            batch.append(audit_doc)
+        
+        try:
+            await write_audit_events(batch)
+        except Exception as e:
+            # Only reachable if the spill file is unwritable too; keep draining regardless
+            logging.error(f"Lost {len(batch)} audit events: {str(e)}")
+        if stopping:
+            return
+
+async def replay_spilled_audit_events():
+    """Write events spilled by earlier runs into audit_logs"""
+    if not AUDIT_SPILL_PATH.exists():
+        return
+    # Claim the file first so events spilled meanwhile go to a fresh one
+    replay_path = AUDIT_SPILL_PATH.with_name(f"{AUDIT_SPILL_PATH.name}.replay-{os.getpid()}")
+    try:
+        os.replace(AUDIT_SPILL_PATH, replay_path)
+    except FileNotFoundError:
+        return  # Another worker claimed it
+    
+    with open(replay_path, encoding="utf-8") as spill_file:
+        audit_docs = [AuditEvent(**json.loads(line)).dict() for line in spill_file if line.strip()]
+    for batch_start in range(0, len(audit_docs), AUDIT_BATCH_SIZE):
+        await write_audit_events(audit_docs[batch_start:batch_start + AUDIT_BATCH_SIZE])
+    os.remove(replay_path)
+    logging.info(f"Replayed {len(audit_docs)} spilled audit events")
+
+async def start_audit_writer():
+    """Replay spilled events and start the background audit writer"""
+    global _audit_queue, _audit_writer_task
+    await replay_spilled_audit_events()
+    _audit_queue = asyncio.Queue(maxsize=AUDIT_QUEUE_SIZE)
+    _audit_writer_task = asyncio.create_task(audit_writer_loop(_audit_queue))
+
+async def stop_audit_writer():
+    """Flush queued audit events and stop the writer"""
+    global _audit_queue, _audit_writer_task
+    if _audit_writer_task is None:
+        return
+    audit_queue, writer_task = _audit_queue, _audit_writer_task
+    _audit_queue, _audit_writer_task = None, None  # New events are written directly from here on
+    await audit_queue.put(None)
+    await writer_task
+
 async def log_audit_event(
     event_type: str,
     user_email: str,
@@ -968,149 +2023,818 @@ async def log_audit_event(
     )
     
     try:
-        await db.audit_logs.insert_one(audit_event.dict())
+        if _audit_queue is None:
+            # Writer not running (startup, shutdown or scripts): write straight through
+            await write_audit_events([audit_event.dict()])
+        else:
+            try:
+                _audit_queue.put_nowait(audit_event.dict())
+            except asyncio.QueueFull:
+                spill_audit_events([audit_event.dict()])
         logging.info(f"Audit event logged: {event_type} by {user_email}")
     except Exception as e:
         logging.error(f"Failed to log audit event: {str(e)}")
 
-# Enhanced Analytics Functions
-async def get_provider_risk_analytics(provider: Optional[str] = None) -> Dict[str, Any]:
-    """Get risk analytics for specific provider or all providers"""
-    users = await db.user_access.find().to_list(1000)
+async def rescore_user_access_documents(query_filter: Dict[str, Any]) -> tuple[int, int]:
+    """Re-run risk analysis on matching user_access documents and persist the analyzed fields"""
+    rescored_users = 0
+    changed_users = 0
+    previous_docs, analyzed_docs = [], []
     
-    analytics = {
-        "total_users": 0,
-        "risk_distribution": {"low": 0, "medium": 0, "high": 0, "critical": 0},
-        "top_risks": [],
-        "sensitive_resource_access": {},
-        "privilege_escalation_count": 0,
-        "cross_account_users": 0,
-        "service_breakdown": {}
-    }
+    async def write_batch():
+        """Store one batch of analyzed fields with a single unordered bulk write"""
+        if not analyzed_docs:
+            return
+        operations = [
+            UpdateOne(
+                {"user_email": analyzed_doc["user_email"]},
+                {"$set": {field: analyzed_doc[field] for field in ANALYZED_FIELDS}}
+            )
+            for analyzed_doc in analyzed_docs
+        ]
+        try:
+            await db.user_access.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # Keep the summary in step with the documents that were written, then fail
+            failed_indexes = {write_error["index"] for write_error in e.details.get("writeErrors", [])}
+            await apply_analytics_changes(
+                [doc for position, doc in enumerate(previous_docs) if position not in failed_indexes],
+                [doc for position, doc in enumerate(analyzed_docs) if position not in failed_indexes]
+            )
+            raise
+        await apply_analytics_changes(previous_docs, analyzed_docs)
     
-    for user_doc in users:
+    record_scan("rescore")
+    async for user_doc in db.user_access.find(query_filter, {"_id": 0}):
+        count_scanned_documents("rescore")
         user_access = UserAccess(**user_doc)
-        
-        # Filter by provider if specified
-        if provider:
-            user_resources = [r for r in user_access.resources if r.provider == provider]
-            if not user_resources:
-                continue
-            user_access.resources = user_resources
-        
-        analytics["total_users"] += 1
-        
-        # Perform risk analysis
+        risk_score_before = user_access.overall_risk_score
         analyzed_user = analyze_user_access(user_access)
-        risk_result = calculate_comprehensive_risk_score(analyzed_user)
-        
-        # Update risk distribution
-        analytics["risk_distribution"][risk_result.risk_level] += 1
-        
-        # Track top risks
-        if risk_result.overall_score > 40:
-            analytics["top_risks"].append({
-                "user_email": user_access.user_email,
-                "user_name": user_access.user_name,
-                "risk_score": risk_result.overall_score,
-                "risk_level": risk_result.risk_level,
-                "primary_risks": [rf.factor_type for rf in risk_result.risk_factors[:3]]
-            })
-        
-        # Count privilege escalations
-        if analyzed_user.privilege_escalation_paths:
-            analytics["privilege_escalation_count"] += 1
         
-        # Count cross-account access
-        accounts = set(r.account_id for r in user_access.resources if r.account_id)
-        if len(accounts) > 1:
-            analytics["cross_account_users"] += 1
+        previous_docs.append(user_doc)
+        analyzed_docs.append(analyzed_user.dict())
+        if len(analyzed_docs) >= IMPORT_BATCH_SIZE:
+            await write_batch()
+            previous_docs, analyzed_docs = [], []
         
-        # Service breakdown
-        for resource in user_access.resources:
-            service_key = f"{resource.provider}-{resource.service}"
-            if service_key not in analytics["service_breakdown"]:
-                analytics["service_breakdown"][service_key] = {
-                    "user_count": 0,
-                    "total_access": 0,
-                    "admin_access": 0,
-                    "avg_risk": 0.0
-                }
-            
-            analytics["service_breakdown"][service_key]["total_access"] += 1
-            if resource.access_type == AccessType.ADMIN:
-                analytics["service_breakdown"][service_key]["admin_access"] += 1
+        rescored_users += 1
+        if analyzed_user.overall_risk_score != risk_score_before:
+            changed_users += 1
     
-    # Sort top risks by score
-    analytics["top_risks"].sort(key=lambda x: x["risk_score"], reverse=True)
-    analytics["top_risks"] = analytics["top_risks"][:20]  # Top 20
-    
-    return analytics
+    await write_batch()
+    return rescored_users, changed_users
 
-# JSON Import Functions
-async def process_json_import(json_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Process imported JSON data and save to database"""
-    try:
-        # Validate JSON structure
-        users_data = json_data.get("users", [])
-        metadata = json_data.get("metadata", {})
-        
-        processed_users = []
-        for user_data in users_data:
-            # Convert resources to CloudResource objects
-            resources = []
-            for resource_data in user_data.get("resources", []):
-                # Handle datetime parsing for last_used field
-                if "last_used" in resource_data and resource_data["last_used"]:
-                    try:
-                        # Parse ISO datetime string and convert to naive datetime
-                        from dateutil import parser
-                        dt = parser.parse(resource_data["last_used"])
-                        # Convert to naive datetime (remove timezone info)
-                        resource_data["last_used"] = dt.replace(tzinfo=None)
-                    except Exception as e:
-                        logging.warning(f"Could not parse last_used datetime: {e}")
-                        resource_data["last_used"] = None
-                
-                resource = CloudResource(**resource_data)
-                resources.append(resource)
-            
-            # Create UserAccess object
-            user_access = UserAccess(
-                user_email=user_data["user_email"],
-                user_name=user_data["user_name"],
-                user_id=user_data.get("user_id"),
-                department=user_data.get("department"),
-                job_title=user_data.get("job_title"),
-                manager=user_data.get("manager"),
-                is_service_account=user_data.get("is_service_account", False),
-                resources=resources,
-                groups=user_data.get("groups", []),
-                roles=user_data.get("roles", []),
-                data_source="json_import"
-            )
-            
-            # Perform risk analysis
-            user_access = analyze_user_access(user_access)
-            processed_users.append(user_access)
-        
-        # Save to database
-        for user_access in processed_users:
-            # Check if user already exists
-            existing_user = await db.user_access.find_one({"user_email": user_access.user_email})
-            if existing_user:
-                # Update existing user
-                await db.user_access.replace_one(
-                    {"user_email": user_access.user_email},
-                    user_access.dict()
-                )
-            else:
-                # Insert new user
-                await db.user_access.insert_one(user_access.dict())
-        
-        return {
-            "status": "success",
-            "imported_users": len(processed_users),
+RISK_SCAN_GRANT_FIELDS = ("provider", "service", "access_type", "resource_name", "account_id", "last_used", "is_privileged")
+RISK_SCAN_BATCH_SIZE = int(os.environ.get('RISK_SCAN_BATCH_SIZE', '5000'))
+RISK_SCAN_TOP_USERS = 20
+
+def summarize_risk_batch(user_docs: List[Dict[str, Any]], provider: Optional[str], scored_at: datetime) -> Dict[str, Any]:
+    """Score one batch of users and reduce it to the totals and top users scan_user_risk adds up"""
+    columns = build_risk_columns(user_docs)
+    scores = score_risk_columns(columns, provider, scored_at)
+
+    if provider:
+        stored = [user_doc.get("provider_risk", {}).get(provider, {}).get("risk_score") for user_doc in user_docs]
+    else:
+        stored = [user_doc.get("overall_risk_score") if user_doc.get("risk_scored_at") else None for user_doc in user_docs]
+    stored = np.array([np.nan if score is None else score for score in stored], dtype=float)
+
+    risk_score = scores["risk_score"]
+    levels, level_counts = np.unique(scores["risk_level"], return_counts=True)
+    return {
+        "total_users": len(user_docs),
+        "total_resources": int(scores["resource_count"].sum()),
+        "risk_distribution": {str(level): int(count) for level, count in zip(levels, level_counts)},
+        "risk_score_sum": float(risk_score.sum()),
+        "cross_provider_admins": int(scores["cross_provider_admin"].sum()),
+        "privilege_escalation_users": int((scores["privilege_escalation_count"] > 0).sum()),
+        "unused_privileges_count": int(scores["unused_privileges_count"].sum()),
+        # Stored scores drift as grants age past the unused-privilege threshold
+        "stale_scores": int((np.isnan(stored) | (np.abs(stored - risk_score) > 1e-9)).sum()),
+        "top_risks": [
+            {
+                "user_email": user_docs[index]["user_email"],
+                "user_name": user_docs[index].get("user_name"),
+                "risk_score": float(risk_score[index]),
+                "risk_level": str(scores["risk_level"][index])
+            }
+            for index in np.argsort(-risk_score, kind="stable")[:RISK_SCAN_TOP_USERS]
+        ]
+    }
+
+async def scan_user_risk(provider: Optional[str] = None) -> Dict[str, Any]:
+    """Score every user from their current grants, vectorized one cursor batch at a time
+
+    Users are scored independently, so only each batch's totals and top users are kept
+    and memory stays bounded by RISK_SCAN_BATCH_SIZE documents, not the tenant.
+    """
+    projection = {"_id": 0, "user_email": 1, "user_name": 1, "is_service_account": 1}
+    projection.update({f"resources.{field}": 1 for field in RISK_SCAN_GRANT_FIELDS})
+    if provider:
+        projection[f"provider_risk.{provider}.risk_score"] = 1
+    else:
+        projection.update({"overall_risk_score": 1, "risk_scored_at": 1})
+
+    scored_at = datetime.utcnow()
+    totals = {
+        "total_users": 0,
+        "total_resources": 0,
+        "risk_distribution": {"low": 0, "medium": 0, "high": 0, "critical": 0},
+        "risk_score_sum": 0.0,
+        "cross_provider_admins": 0,
+        "privilege_escalation_users": 0,
+        "unused_privileges_count": 0,
+        "stale_scores": 0,
+        "top_risks": []
+    }
+
+    async def add_batch(user_docs: List[Dict[str, Any]]):
+        batch = await asyncio.to_thread(summarize_risk_batch, user_docs, provider, scored_at)
+        for field, value in batch.items():
+            if field == "risk_distribution":
+                for level, count in value.items():
+                    totals[field][level] += count
+            elif field == "top_risks":
+                # Stable, so ties keep scan order as in a single pass
+                totals[field] = sorted(totals[field] + value, key=lambda risk: -risk["risk_score"])[:RISK_SCAN_TOP_USERS]
+            else:
+                totals[field] += value
+
+    query_filter = {"resources.provider": provider} if provider else {}
+    record_scan("risk_scan")
+    user_docs = []
+    async for user_doc in db.user_access.find(query_filter, projection).batch_size(RISK_SCAN_BATCH_SIZE):
+        count_scanned_documents("risk_scan")
+        user_docs.append(user_doc)
+        if len(user_docs) >= RISK_SCAN_BATCH_SIZE:
+            await add_batch(user_docs)
+            user_docs = []
+    if user_docs:
+        await add_batch(user_docs)
+
+    total_users = totals["total_users"]
+    return {
+        "provider": provider,
+        "total_users": total_users,
+        "total_resources": totals["total_resources"],
+        "risk_distribution": totals["risk_distribution"],
+        "average_risk_score": totals["risk_score_sum"] / total_users if total_users else 0.0,
+        "cross_provider_admins": totals["cross_provider_admins"],
+        "privilege_escalation_users": totals["privilege_escalation_users"],
+        "unused_privileges_count": totals["unused_privileges_count"],
+        "stale_scores": totals["stale_scores"],
+        "top_risks": totals["top_risks"],
+        "scored_at": scored_at
+    }
+
+# Resource Index Functions
+# resource_index holds one document per normalized resource name with every user holding it:
+# {"resource_key", "resource_name", "resource": <first CloudResource seen>, "holders": [{"user_email", "risk_level"}]}
+RISK_LEVEL_ORDER = ["low", "medium", "high", "critical"]
+
+def normalize_resource_key(resource_name: str) -> str:
+    """Normalize a resource name into its resource_index key"""
+    return resource_name.strip().lower()
+
+async def unindex_user_resources(user_emails: List[str]):
+    """Remove users from every resource they hold in the resource index"""
+    held_keys = await db.resource_index.distinct("resource_key", {"holders.user_email": {"$in": user_emails}})
+    if not held_keys:
+        return
+    
+    await db.resource_index.update_many(
+        {"resource_key": {"$in": held_keys}},
+        {"$pull": {"holders": {"user_email": {"$in": user_emails}}}}
+    )
+    await db.resource_index.delete_many({"resource_key": {"$in": held_keys}, "holders": {"$size": 0}})
+
+def collect_user_grants(user_doc: Dict[str, Any]) -> Dict[str, tuple[Dict[str, Any], str]]:
+    """Map each resource key a user document holds to a representative resource and the highest risk level"""
+    user_grants = {}
+    for resource in user_doc.get("resources", []):
+        resource_key = normalize_resource_key(resource["resource_name"])
+        risk_level = RiskLevel(resource.get("risk_level") or "low").value
+        if resource_key not in user_grants:
+            user_grants[resource_key] = (resource, risk_level)
+        elif RISK_LEVEL_ORDER.index(risk_level) > RISK_LEVEL_ORDER.index(user_grants[resource_key][1]):
+            user_grants[resource_key] = (user_grants[resource_key][0], risk_level)
+    return user_grants
+
+async def index_user_resources(user_docs: List[Dict[str, Any]]):
+    """Replace the users' entries in the resource index with the resources in their documents"""
+    if not user_docs:
+        return
+    # The last copy of a user repeated within the batch is the one that counts
+    user_docs = list({user_doc["user_email"]: user_doc for user_doc in user_docs}.values())
+    await unindex_user_resources([user_doc["user_email"] for user_doc in user_docs])
+    
+    # $addToSet keeps holders unique when two writers index the same user concurrently
+    operations = []
+    for user_doc in user_docs:
+        for resource_key, (resource, risk_level) in collect_user_grants(user_doc).items():
+            operations.append(UpdateOne(
+                {"resource_key": resource_key},
+                {
+                    "$setOnInsert": {
+                        "resource_key": resource_key,
+                        "resource_name": resource["resource_name"],
+                        "resource": resource
+                    },
+                    "$addToSet": {"holders": {"user_email": user_doc["user_email"], "risk_level": risk_level}}
+                },
+                upsert=True
+            ))
+    
+    if operations:
+        await db.resource_index.bulk_write(operations, ordered=False)
+
+async def rebuild_resource_index() -> int:
+    """Rebuild the resource index from scratch from user_access"""
+    await db.resource_index.delete_many({})
+    indexed_users = 0
+    batch = []
+    record_scan("resource_index_rebuild")
+    async for user_doc in db.user_access.find({}, {"_id": 0, "user_email": 1, "resources": 1}):
+        count_scanned_documents("resource_index_rebuild")
+        batch.append(user_doc)
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            await index_user_resources(batch)
+            indexed_users += len(batch)
+            batch = []
+    
+    await index_user_resources(batch)
+    indexed_users += len(batch)
+    logging.info(f"Resource index rebuilt for {indexed_users} users")
+    return indexed_users
+
+# Analytics Summary Functions
+# /analytics reads one analytics_summary document. Import, delete and rescore keep it
+# current with delta counters; POST /api/admin/analytics/rebuild recomputes and verifies it.
+# Every change bumps the summary's revision, and a rebuild only replaces the revision it
+# started from, so deltas applied during its scan are never overwritten. A summary is
+# complete once rebuilt_at is set; before that only its revision is kept.
+ANALYTICS_SUMMARY_ID = "access_analytics"
+ANALYTICS_REBUILD_ATTEMPTS = 3
+ANALYTICS_PROVIDERS = ("aws", "gcp", "azure", "okta")
+ANALYTICS_TOP_PRIVILEGED_USERS = 10
+ANALYTICS_MAX_ESCALATION_RISKS = 1000  # Keeps the summary well under the 16MB document limit
+
+def analytics_risk_bucket(risk_score: float) -> str:
+    """Bucket a risk score the way the analytics distribution does"""
+    if risk_score < 25:
+        return "low"
+    elif risk_score < 50:
+        return "medium"
+    elif risk_score < 75:
+        return "high"
+    return "critical"
+
+def analyzed_user_doc(user_doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the document with its risk analysis, scoring it if it was never scored"""
+    if user_doc.get("risk_scored_at") is None:
+        with timed_phase("validate"):
+            user_access = UserAccess(**user_doc)
+        with timed_phase("analyze"):
+            return analyze_user_access(user_access).dict()
+    return user_doc
+
+def add_analytics_contribution(counters: Dict[str, int], user_doc: Dict[str, Any], sign: int = 1):
+    """Add (or with sign=-1 remove) one user's share of the summary counters, keyed by field path"""
+    user_doc = analyzed_user_doc(user_doc)
+    resources = user_doc.get("resources") or []
+    contribution = {
+        "total_users": 1,
+        "total_resources": len(resources),
+        f"risk_distribution.{analytics_risk_bucket(user_doc.get('overall_risk_score', 0.0))}": 1,
+        "cross_provider_admins": 1 if user_doc.get("cross_provider_admin") else 0,
+        "unused_privileges_count": len(user_doc.get("unused_privileges") or [])
+    }
+    provider_resources: Dict[str, int] = {}
+    for resource in resources:
+        provider = getattr(resource["provider"], "value", resource["provider"])
+        provider_resources[provider] = provider_resources.get(provider, 0) + 1
+    for provider, resource_count in provider_resources.items():
+        contribution[f"provider_stats.{provider}.users"] = 1
+        contribution[f"provider_stats.{provider}.resources"] = resource_count
+    
+    for field, value in contribution.items():
+        counters[field] = counters.get(field, 0) + sign * value
+
+def top_privileged_user_entry(user_doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Summarize a user for top_privileged_users, or None without admin grants"""
+    resources = user_doc.get("resources") or []
+    admin_count = sum(1 for r in resources if r["access_type"] == AccessType.ADMIN)
+    if admin_count == 0:
+        return None
+    return {
+        "user_email": user_doc["user_email"],
+        "user_name": user_doc.get("user_name"),
+        "admin_access_count": admin_count,
+        "total_resources": len(resources),
+        "risk_score": user_doc.get("overall_risk_score", 0.0),
+        "is_service_account": user_doc.get("is_service_account", False)
+    }
+
+async def refresh_top_privileged_users():
+    """Recompute top_privileged_users by walking the risk score index"""
+    top_users = []
+    cursor = db.user_access.find(
+        {"resources.access_type": AccessType.ADMIN.value},
+        {"_id": 0, "user_email": 1, "user_name": 1, "overall_risk_score": 1, "is_service_account": 1, "resources.access_type": 1}
+    ).sort([("overall_risk_score", -1), ("user_email", -1)]).limit(ANALYTICS_TOP_PRIVILEGED_USERS)
+    async for user_doc in cursor:
+        top_users.append(top_privileged_user_entry(user_doc))
+    record_scan("top_privileged_users", len(top_users))
+    
+    await db.analytics_summary.update_one(
+        {"id": ANALYTICS_SUMMARY_ID},
+        {"$set": {"top_privileged_users": top_users}}
+    )
+
+async def apply_analytics_changes(old_docs: List[Dict[str, Any]], new_docs: List[Dict[str, Any]]):
+    """Move the analytics summary from the old to the new versions of the given users"""
+    try:
+        if not old_docs and not new_docs:
+            return
+        
+        counters: Dict[str, int] = {}
+        for user_doc in old_docs:
+            add_analytics_contribution(counters, user_doc, sign=-1)
+        for user_doc in new_docs:
+            add_analytics_contribution(counters, user_doc)
+        
+        update = {
+            "$set": {"updated_at": datetime.utcnow()},
+            "$inc": {"revision": 1, **{field: value for field, value in counters.items() if value}}
+        }
+        result = await db.analytics_summary.update_one(
+            {"id": ANALYTICS_SUMMARY_ID, "rebuilt_at": {"$exists": True}},
+            update
+        )
+        if result.matched_count == 0:
+            # No complete summary to adjust yet; still invalidate a first rebuild in progress
+            await db.analytics_summary.update_one(
+                {"id": ANALYTICS_SUMMARY_ID},
+                {"$inc": {"revision": 1}},
+                upsert=True
+            )
+            return
+        
+        # Escalation paths carry their user_email, so swap each user's paths out and in
+        user_emails = list({user_doc["user_email"] for user_doc in old_docs + new_docs})
+        await db.analytics_summary.update_one(
+            {"id": ANALYTICS_SUMMARY_ID},
+            {"$pull": {"privilege_escalation_risks": {"user_email": {"$in": user_emails}}}}
+        )
+        escalation_paths = [
+            path for user_doc in new_docs
+            for path in analyzed_user_doc(user_doc).get("privilege_escalation_paths") or []
+        ]
+        if escalation_paths:
+            await db.analytics_summary.update_one(
+                {"id": ANALYTICS_SUMMARY_ID},
+                {"$push": {"privilege_escalation_risks": {
+                    "$each": escalation_paths,
+                    "$slice": -ANALYTICS_MAX_ESCALATION_RISKS
+                }}}
+            )
+        
+        await refresh_top_privileged_users()
+    except Exception as e:
+        logging.error(f"Failed to update analytics summary: {str(e)}")
+
+async def compute_analytics_summary() -> Dict[str, Any]:
+    """Compute the analytics summary from scratch with one scan of user_access"""
+    counters: Dict[str, int] = {}
+    escalation_risks = []
+    privileged_users = []
+    record_scan("analytics_summary")
+    async for user_doc in db.user_access.find({}, user_access_projection("analytics_summary")):
+        count_scanned_documents("analytics_summary")
+        if user_doc.get("risk_scored_at") is None:
+            # Scoring needs the whole document
+            user_doc = await db.user_access.find_one({"user_email": user_doc["user_email"]}, {"_id": 0})
+        user_doc = analyzed_user_doc(user_doc)
+        add_analytics_contribution(counters, user_doc)
+        
+        if len(escalation_risks) < ANALYTICS_MAX_ESCALATION_RISKS:
+            escalation_risks.extend(user_doc.get("privilege_escalation_paths") or [])
+        entry = top_privileged_user_entry(user_doc)
+        if entry:
+            privileged_users.append(entry)
+    
+    # Same order as the index walk in refresh_top_privileged_users
+    privileged_users.sort(key=lambda x: (x["risk_score"], x["user_email"]), reverse=True)
+    
+    summary = {
+        "id": ANALYTICS_SUMMARY_ID,
+        "total_users": counters.get("total_users", 0),
+        "total_resources": counters.get("total_resources", 0),
+        "risk_distribution": {
+            level: counters.get(f"risk_distribution.{level}", 0)
+            for level in ("low", "medium", "high", "critical")
+        },
+        "top_privileged_users": privileged_users[:ANALYTICS_TOP_PRIVILEGED_USERS],
+        "unused_privileges_count": counters.get("unused_privileges_count", 0),
+        "cross_provider_admins": counters.get("cross_provider_admins", 0),
+        "privilege_escalation_risks": escalation_risks[:ANALYTICS_MAX_ESCALATION_RISKS],
+        "provider_stats": {
+            provider: {
+                "users": counters.get(f"provider_stats.{provider}.users", 0),
+                "resources": counters.get(f"provider_stats.{provider}.resources", 0)
+            }
+            for provider in ANALYTICS_PROVIDERS
+        },
+        "updated_at": datetime.utcnow()
+    }
+    summary["rebuilt_at"] = summary["updated_at"]
+    return summary
+
+def compare_analytics_summaries(stored: Dict[str, Any], rebuilt: Dict[str, Any]) -> Dict[str, Any]:
+    """List the fields where the maintained summary disagrees with a fresh rebuild"""
+    differences = {}
+    for field in ("total_users", "total_resources", "risk_distribution", "unused_privileges_count",
+                  "cross_provider_admins", "provider_stats", "top_privileged_users"):
+        stored_value = stored.get(field)
+        if field == "provider_stats" and stored_value is not None:
+            # Providers nobody has been imported for are only present after a rebuild
+            stored_value = {
+                provider: stored_value.get(provider, {"users": 0, "resources": 0})
+                for provider in ANALYTICS_PROVIDERS
+            }
+        if stored_value != rebuilt[field]:
+            differences[field] = {"stored": stored_value, "rebuilt": rebuilt[field]}
+    
+    # Escalation paths are kept in update order, and only comparable below the cap
+    stored_paths = stored.get("privilege_escalation_risks") or []
+    rebuilt_paths = rebuilt["privilege_escalation_risks"]
+    if max(len(stored_paths), len(rebuilt_paths)) < ANALYTICS_MAX_ESCALATION_RISKS:
+        path_key = lambda path: json.dumps(path, sort_keys=True, default=str)
+        if sorted(map(path_key, stored_paths)) != sorted(map(path_key, rebuilt_paths)):
+            differences["privilege_escalation_risks"] = {
+                "stored": len(stored_paths),
+                "rebuilt": len(rebuilt_paths)
+            }
+    return differences
+
+async def rebuild_analytics_summary() -> Optional[tuple[Dict[str, Any], Optional[Dict[str, Any]]]]:
+    """Replace the analytics summary with a fresh computation; returns it and the differences found.
+    
+    Returns None if another worker is rebuilding, or if every attempt was overtaken by changes.
+    """
+    if not await acquire_maintenance_lock("analytics_summary_rebuild"):
+        return None
+    try:
+        for _ in range(ANALYTICS_REBUILD_ATTEMPTS):
+            # $inc by 0 creates the document (or a missing revision) without changing one
+            stored = await db.analytics_summary.find_one_and_update(
+                {"id": ANALYTICS_SUMMARY_ID},
+                {"$inc": {"revision": 0}},
+                projection={"_id": 0},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            rebuilt = await compute_analytics_summary()
+            rebuilt["revision"] = stored["revision"]
+            result = await db.analytics_summary.replace_one(
+                {"id": ANALYTICS_SUMMARY_ID, "revision": stored["revision"]},
+                rebuilt
+            )
+            if result.matched_count:
+                differences = compare_analytics_summaries(stored, rebuilt) if "rebuilt_at" in stored else None
+                logging.info(f"Analytics summary rebuilt for {rebuilt['total_users']} users")
+                return rebuilt, differences
+        logging.warning(f"Analytics summary changed during {ANALYTICS_REBUILD_ATTEMPTS} rebuild attempts")
+        return None
+    finally:
+        await release_maintenance_lock("analytics_summary_rebuild")
+
+# Read Projections
+# Each user_access read path declares the fields it uses, so MongoDB only sends (and Motor
+# only decodes) those. Bulky fields such as permission_details, descriptions and stored
+# escalation path steps stay on the server; arrays of subdocuments that are only counted
+# project a single small field. "provider_risk" narrows to the requested provider.
+USER_ACCESS_READ_FIELDS = {
+    "analytics_summary": (
+        "user_email", "user_name", "is_service_account", "overall_risk_score", "risk_scored_at",
+        "cross_provider_admin", "unused_privileges", "privilege_escalation_paths",
+        "resources.provider", "resources.access_type"
+    ),
+    "provider_analytics": (
+        "user_email", "user_name", "overall_risk_score", "risk_level", "risk_factors.factor_type",
+        "privilege_escalation_paths.risk_score", "risk_scored_at", "provider_risk",
+        "resources.provider", "resources.service", "resources.access_type", "resources.account_id"
+    ),
+    "provider_dashboard": (
+        "user_email", "risk_scored_at", "provider_risk",
+        "resources.provider", "resources.service", "resources.access_type"
+    ),
+    "paginated_users": (
+        "user_email", "user_name", "department", "job_title", "is_service_account",
+        "overall_risk_score", "risk_level", "risk_confidence_score", "risk_factors.factor_type",
+        "cross_provider_admin", "privilege_escalation_paths.risk_score", "unused_privileges",
+        "provider_risk", "risk_scored_at", "last_updated",
+        "resources.provider", "resources.service", "resources.access_type"
+    )
+}
+
+def user_access_projection(read_path: str, provider: Optional[str] = None, extra_fields: tuple = ()) -> Dict[str, int]:
+    """Build the MongoDB projection for a declared read path"""
+    fields = [
+        f"provider_risk.{provider}" if field == "provider_risk" and provider else field
+        for field in USER_ACCESS_READ_FIELDS[read_path]
+    ]
+    for field in extra_fields:
+        # MongoDB rejects a path next to one of its own prefixes
+        if not any(field == projected or field.startswith(projected + ".") for projected in fields):
+            fields.append(field)
+    return {"_id": 0, **dict.fromkeys(fields, 1)}
+
+def needs_stored_analysis(user_doc: Dict[str, Any], provider: Optional[str] = None) -> bool:
+    """Whether a document predates its stored risk analysis (overall or for provider)"""
+    return user_doc.get("risk_scored_at") is None or bool(provider and provider not in (user_doc.get("provider_risk") or {}))
+
+async def with_full_documents(user_docs: List[Dict[str, Any]], provider: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Swap projected documents that still need scoring for the full documents scoring needs"""
+    unscored = [user_doc["user_email"] for user_doc in user_docs if needs_stored_analysis(user_doc, provider)]
+    if not unscored:
+        return user_docs
+    full_docs = {
+        user_doc["user_email"]: user_doc
+        async for user_doc in db.user_access.find({"user_email": {"$in": unscored}}, {"_id": 0})
+    }
+    record_scan("full_documents", len(full_docs))
+    return [full_docs.get(user_doc["user_email"], user_doc) for user_doc in user_docs]
+
+def scored_user_doc(user_doc: Dict[str, Any], provider: Optional[str] = None) -> Dict[str, Any]:
+    """Return the document with its stored analysis, scoring a full document that lacks it"""
+    if not needs_stored_analysis(user_doc, provider):
+        return user_doc
+    with timed_phase("validate"):
+        user_access = UserAccess(**user_doc)
+    with timed_phase("analyze"):
+        user_access = ensure_risk_analysis(user_access)
+    user_doc = user_access.model_dump()
+    if provider:
+        user_doc["provider_risk"] = {**user_doc["provider_risk"], provider: get_provider_risk(user_access, provider)}
+    return user_doc
+
+# Enhanced Analytics Functions
+async def get_provider_risk_analytics(provider: Optional[str] = None) -> Dict[str, Any]:
+    """Get risk analytics for specific provider or all providers"""
+    query_filter = {"providers": provider} if provider else {}
+    users = await db.user_access.find(query_filter, user_access_projection("provider_analytics", provider)).to_list(1000)
+    record_scan("provider_analytics", len(users))
+    users = await with_full_documents(users, provider)
+    
+    analytics = {
+        "total_users": 0,
+        "risk_distribution": {"low": 0, "medium": 0, "high": 0, "critical": 0},
+        "top_risks": [],
+        "sensitive_resource_access": {},
+        "privilege_escalation_count": 0,
+        "cross_account_users": 0,
+        "service_breakdown": {}
+    }
+    
+    for user_doc in users:
+        user_doc = scored_user_doc(user_doc, provider)
+        resources = user_doc["resources"]
+        
+        # Filter by provider if specified
+        if provider:
+            resources = [r for r in resources if r["provider"] == provider]
+            if not resources:
+                continue
+            risk_summary = user_doc["provider_risk"][provider]
+        else:
+            risk_summary = {
+                "risk_score": user_doc["overall_risk_score"],
+                "risk_level": user_doc["risk_level"],
+                "top_risk_factors": [rf["factor_type"] for rf in user_doc["risk_factors"][:3]],
+                "privilege_escalation_count": len(user_doc["privilege_escalation_paths"])
+            }
+        
+        analytics["total_users"] += 1
+        
+        # Update risk distribution from the stored analysis
+        analytics["risk_distribution"][risk_summary["risk_level"]] += 1
+        
+        # Track top risks
+        if risk_summary["risk_score"] > 40:
+            analytics["top_risks"].append({
+                "user_email": user_doc["user_email"],
+                "user_name": user_doc["user_name"],
+                "risk_score": risk_summary["risk_score"],
+                "risk_level": risk_summary["risk_level"],
+                "primary_risks": risk_summary["top_risk_factors"]
+            })
+        
+        # Count privilege escalations
+        if risk_summary["privilege_escalation_count"]:
+            analytics["privilege_escalation_count"] += 1
+        
+        # Count cross-account access
+        accounts = set(r.get("account_id") for r in resources if r.get("account_id"))
+        if len(accounts) > 1:
+            analytics["cross_account_users"] += 1
+        
+        # Service breakdown
+        for resource in resources:
+            service_key = f"{getattr(resource['provider'], 'value', resource['provider'])}-{resource['service']}"
+            if service_key not in analytics["service_breakdown"]:
+                analytics["service_breakdown"][service_key] = {
+                    "user_count": 0,
+                    "total_access": 0,
+                    "admin_access": 0,
+                    "avg_risk": 0.0
+                }
+            
+            analytics["service_breakdown"][service_key]["total_access"] += 1
+            if resource["access_type"] == AccessType.ADMIN:
+                analytics["service_breakdown"][service_key]["admin_access"] += 1
+    
+    # Sort top risks by score
+    analytics["top_risks"].sort(key=lambda x: x["risk_score"], reverse=True)
+    analytics["top_risks"] = analytics["top_risks"][:20]  # Top 20
+    
+    return analytics
+
+# JSON Import Functions
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', '500'))
+IMPORT_WORKERS = int(os.environ.get('IMPORT_WORKERS', str(os.cpu_count() or 1)))  # 0 scores in a single background thread
+IMPORT_PIPELINE_DEPTH = int(os.environ.get('IMPORT_PIPELINE_DEPTH', str(max(IMPORT_WORKERS, 1) * 2)))
+
+def build_user_access(user_data: Dict[str, Any]) -> UserAccess:
+    """Validate one imported user record into a UserAccess object"""
+    # Convert resources to CloudResource objects
+    resources = []
+    for resource_data in user_data.get("resources", []):
+        # Handle datetime parsing for last_used field
+        if "last_used" in resource_data and resource_data["last_used"]:
+            try:
+                # Parse ISO datetime string and convert to naive datetime
+                from dateutil import parser
+                dt = parser.parse(resource_data["last_used"])
+                # Convert to naive datetime (remove timezone info)
+                resource_data["last_used"] = dt.replace(tzinfo=None)
+            except Exception as e:
+                logging.warning(f"Could not parse last_used datetime: {e}")
+                resource_data["last_used"] = None
+        
+        resource = CloudResource(**resource_data)
+        resources.append(resource)
+    
+    # Create UserAccess object
+    return UserAccess(
+        user_email=user_data["user_email"],
+        user_name=user_data["user_name"],
+        user_id=user_data.get("user_id"),
+        department=user_data.get("department"),
+        job_title=user_data.get("job_title"),
+        manager=user_data.get("manager"),
+        is_service_account=user_data.get("is_service_account", False),
+        resources=resources,
+        groups=user_data.get("groups", []),
+        roles=user_data.get("roles", []),
+        data_source="json_import"
+    )
+
+def score_import_records(user_records: List[Dict[str, Any]]) -> tuple[List[Dict[str, Any]], List[str]]:
+    """Validate and score a chunk of imported user records (runs in the import process pool)"""
+    user_docs = []
+    errors = []
+    for user_data in user_records:
+        try:
+            # Scoring stage: the full risk analysis is stored with the document
+            user_access = analyze_user_access(build_user_access(user_data))
+            user_docs.append(user_access.dict())
+        except Exception as e:
+            errors.append(f"{user_data.get('user_email', 'unknown')}: {str(e)}")
+    return user_docs, errors
+
+_import_executor = None
+
+def get_import_executor():
+    """Get the shared executor for the CPU-bound import stages, creating it on first use"""
+    global _import_executor
+    if _import_executor is None:
+        if IMPORT_WORKERS > 0:
+            # spawn avoids forking a process that already runs the event loop and driver threads
+            _import_executor = ProcessPoolExecutor(
+                max_workers=IMPORT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        else:
+            _import_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="import")
+    return _import_executor
+
+async def score_import_chunk(user_records: List[Dict[str, Any]]) -> tuple[List[Dict[str, Any]], List[str]]:
+    """Run score_import_records off the event loop"""
+    loop = asyncio.get_running_loop()
+    user_docs, errors = await loop.run_in_executor(get_import_executor(), score_import_records, user_records)
+    if IMPORT_WORKERS > 0:
+        # Scored in another process, whose counters this worker never sees
+        count_risk_evaluations("user", len(user_docs))
+        count_risk_evaluations("provider", sum(len(user_doc["provider_risk"]) for user_doc in user_docs))
+    return user_docs, errors
+
+def carry_over_resource_ids(previous_doc: Dict[str, Any], user_doc: Dict[str, Any]):
+    """Reuse the stored ids of grants a re-import still contains, so graph node ids stay stable"""
+    def grant_key(resource: Dict[str, Any]) -> tuple:
+        # Enum members and their stored string values must compare (and hash) alike
+        return tuple(
+            getattr(resource[field], "value", resource[field])
+            for field in ("provider", "service", "resource_name", "access_type")
+        )
+    
+    previous_ids = {}
+    for resource in previous_doc.get("resources", []):
+        previous_ids.setdefault(grant_key(resource), []).append(resource["id"])
+    for resource in user_doc.get("resources", []):
+        if previous_ids.get(grant_key(resource)):
+            resource["id"] = previous_ids[grant_key(resource)].pop(0)
+
+async def save_user_access_documents(user_docs: List[Dict[str, Any]], batch_size: int = IMPORT_BATCH_SIZE) -> tuple[List[Dict[str, int]], List[str]]:
+    """Upsert analyzed user documents with unordered bulk writes and refresh their resource index entries"""
+    batch_results = []
+    errors = []
+    for batch_start in range(0, len(user_docs), batch_size):
+        batch = user_docs[batch_start:batch_start + batch_size]
+        previous_docs = await db.user_access.find(
+            {"user_email": {"$in": [user_doc["user_email"] for user_doc in batch]}},
+            {"_id": 0}
+        ).to_list(None)
+        record_scan("import_previous", len(previous_docs))
+        previous_by_email = {user_doc["user_email"]: user_doc for user_doc in previous_docs}
+        for user_doc in batch:
+            if user_doc["user_email"] in previous_by_email:
+                carry_over_resource_ids(previous_by_email[user_doc["user_email"]], user_doc)
+        operations = [
+            ReplaceOne({"user_email": user_doc["user_email"]}, user_doc, upsert=True)
+            for user_doc in batch
+        ]
+        
+        # Unordered writes keep going past a failed document; the unique user_email index
+        # (init-mongo.js) makes each upsert resolve to exactly one document
+        failed_indexes = set()
+        try:
+            result = await db.user_access.bulk_write(operations, ordered=False)
+            inserted, updated = result.upserted_count, result.matched_count
+        except BulkWriteError as e:
+            inserted, updated = e.details.get("nUpserted", 0), e.details.get("nMatched", 0)
+            for write_error in e.details.get("writeErrors", []):
+                failed_indexes.add(write_error["index"])
+                errors.append(f"{batch[write_error['index']]['user_email']}: {write_error.get('errmsg')}")
+        
+        saved_docs = [
+            user_doc for position, user_doc in enumerate(batch)
+            if position not in failed_indexes
+        ]
+        await index_user_resources(saved_docs)
+        
+        # The last copy of a user repeated within the batch is the one that counts
+        saved_by_email = {user_doc["user_email"]: user_doc for user_doc in saved_docs}
+        await apply_analytics_changes(
+            [user_doc for user_doc in previous_docs if user_doc["user_email"] in saved_by_email],
+            list(saved_by_email.values())
+        )
+        batch_results.append({
+            "inserted": inserted,
+            "updated": updated,
+            "failed": len(failed_indexes)
+        })
+    
+    return batch_results, errors
+
+async def process_json_import(json_data: Dict[str, Any], batch_size: int = IMPORT_BATCH_SIZE) -> Dict[str, Any]:
+    """Process imported JSON data and save to database"""
+    try:
+        # Validate JSON structure
+        users_data = json_data.get("users", [])
+        metadata = json_data.get("metadata", {})
+        
+        # Validate and score chunks in parallel; nothing is written unless every user is valid
+        chunk_results = await asyncio.gather(*[
+            score_import_chunk(users_data[chunk_start:chunk_start + batch_size])
+            for chunk_start in range(0, len(users_data), batch_size)
+        ])
+        processed_users = [user_doc for user_docs, _ in chunk_results for user_doc in user_docs]
+        scoring_errors = [error for _, chunk_errors in chunk_results for error in chunk_errors]
+        if scoring_errors:
+            raise ValueError(scoring_errors[0])
+        
+        # Save to database
+        batch_results, errors = await save_user_access_documents(processed_users, batch_size)
+        
+        return {
+            "status": "success",
+            "imported_users": sum(batch["inserted"] + batch["updated"] for batch in batch_results),
+            "inserted_users": sum(batch["inserted"] for batch in batch_results),
+            "updated_users": sum(batch["updated"] for batch in batch_results),
+            "failed_users": sum(batch["failed"] for batch in batch_results),
+            "batches": [{"batch": number, **batch} for number, batch in enumerate(batch_results, start=1)],
+            "errors": errors[:IMPORT_JOB_MAX_ERRORS],
             "metadata": metadata
         }
     
@@ -1118,6 +2842,119 @@ async def process_json_import(json_data: Dict[str, Any]) -> Dict[str, Any]:
         logging.error(f"Error processing JSON import: {str(e)}")
         raise HTTPException(status_code=400, detail=f"Error processing JSON: {str(e)}")
 
+def iter_import_records(json_file):
+    """Incrementally parse an import file, yielding ("user", dict) per users entry and ("metadata", dict)"""
+    builder = None
+    builder_prefix = None
+    for prefix, event, value in ijson.parse(json_file, use_float=True):
+        if builder is None:
+            if event == "start_map" and prefix in ("users.item", "metadata"):
+                builder = ijson.ObjectBuilder()
+                builder_prefix = prefix
+            else:
+                continue
+        
+        builder.event(event, value)
+        if event == "end_map" and prefix == builder_prefix:
+            yield ("user" if builder_prefix == "users.item" else "metadata"), builder.value
+            builder = None
+
+def next_import_batch(records, batch_size: int) -> List[tuple[str, Dict[str, Any]]]:
+    """Pull up to batch_size parsed records from the import stream"""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if record[0] == "user" and len(batch) >= batch_size:
+            break
+    return batch
+
+async def process_streaming_import(job_id: str, spool_path: str, batch_size: int = IMPORT_BATCH_SIZE):
+    """Import a spooled file through the parse -> validate/score -> write pipeline"""
+    await db.import_jobs.update_one(
+        {"id": job_id},
+        {"$set": {"status": "running", "started_at": datetime.utcnow()}}
+    )
+    job_counters = {
+        "processed_users": 0,
+        "imported_users": 0,
+        "inserted_users": 0,
+        "updated_users": 0,
+        "failed_users": 0,
+        "batches": 0
+    }
+    batch_progress = []
+    errors = []
+    metadata = {}
+    
+    # Scored chunks in submission order; the bound is the back-pressure between stages
+    scored_chunks = asyncio.Queue(maxsize=IMPORT_PIPELINE_DEPTH)
+    
+    async def parse_stage():
+        """Parse chunks off the event loop and hand them to the process pool"""
+        nonlocal metadata
+        try:
+            with open(spool_path, "rb") as json_file:
+                records = iter_import_records(json_file)
+                while batch := await asyncio.to_thread(next_import_batch, records, batch_size):
+                    user_records = []
+                    for record_type, record in batch:
+                        if record_type == "metadata":
+                            metadata = record
+                        else:
+                            user_records.append(record)
+                    
+                    job_counters["processed_users"] += len(user_records)
+                    await scored_chunks.put(asyncio.ensure_future(score_import_chunk(user_records)))
+        except Exception:
+            # Malformed or truncated JSON: stop the write stage, which re-raises this from parser_task
+            await scored_chunks.put(None)
+            raise
+        await scored_chunks.put(None)
+    
+    parser_task = asyncio.create_task(parse_stage())
+    try:
+        # Write stage: consume scored chunks in order so the last occurrence of a user wins
+        while (scored_chunk := await scored_chunks.get()) is not None:
+            user_docs, scoring_errors = await scored_chunk
+            job_counters["failed_users"] += len(scoring_errors)
+            errors.extend(scoring_errors[:IMPORT_JOB_MAX_ERRORS - len(errors)])
+            
+            batch_results, write_errors = await save_user_access_documents(user_docs, batch_size)
+            for batch in batch_results:
+                job_counters["batches"] += 1
+                job_counters["imported_users"] += batch["inserted"] + batch["updated"]
+                job_counters["inserted_users"] += batch["inserted"]
+                job_counters["updated_users"] += batch["updated"]
+                job_counters["failed_users"] += batch["failed"]
+                batch_progress.append({"batch": job_counters["batches"], **batch})
+            errors.extend(write_errors[:IMPORT_JOB_MAX_ERRORS - len(errors)])
+            
+            # Publish progress after every batch
+            await db.import_jobs.update_one(
+                {"id": job_id},
+                {"$set": {**job_counters, "errors": errors, "batch_results": batch_progress}}
+            )
+        await parser_task
+        
+        await db.import_jobs.update_one(
+            {"id": job_id},
+            {"$set": {**job_counters, "errors": errors, "metadata": metadata,
+                      "status": "completed", "finished_at": datetime.utcnow()}}
+        )
+        logging.info(f"Streaming import {job_id} completed: {job_counters['imported_users']} users")
+    
+    except Exception as e:
+        logging.error(f"Error processing streaming import {job_id}: {str(e)}")
+        errors.append(str(e))
+        await db.import_jobs.update_one(
+            {"id": job_id},
+            {"$set": {**job_counters, "errors": errors, "status": "failed", "finished_at": datetime.utcnow()}}
+        )
+    
+    finally:
+        parser_task.cancel()
+        os.remove(spool_path)
+
 # Enhanced sample data initialization
 async def init_sample_data():
     """Initialize the database with realistic sample data"""
@@ -1202,35 +3039,134 @@ async def init_sample_data():
     
     # Insert sample data
     for user_data in sample_users:
-        user_access = UserAccess(**user_data)
+        user_access = analyze_user_access(UserAccess(**user_data))
         await db.user_access.insert_one(user_access.dict())
+        await index_user_resources([user_access.dict()])
+        await apply_analytics_changes([], [user_access.dict()])
     
     logging.info("Sample data initialized successfully")
 
+# Per-process LRU of serialized search responses, keyed by user email. Each entry carries
+# a hash of the user_access document it was built from, so any re-import, rescore or edit
+# (in any worker) changes the ETag and rebuilds the graph on the next search.
+GRAPH_CACHE_MAX_ENTRIES = int(os.environ.get('GRAPH_CACHE_MAX_ENTRIES', '512'))  # 0 disables the cache
+_graph_cache: "OrderedDict[str, tuple[str, bytes]]" = OrderedDict()
+graph_cache_stats = {"hits": 0, "misses": 0, "not_modified": 0, "evictions": 0}
+
+def user_access_etag(user_doc: Dict[str, Any]) -> str:
+    """Opaque tag (quoted hash) over the stored user_access document; also the graph version"""
+    return '"' + hashlib.blake2b(bson.encode(user_doc), digest_size=16).hexdigest() + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header covers the given ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    opaque_tag = etag.removeprefix("W/")
+    return "*" in candidates or any(candidate.removeprefix("W/") == opaque_tag for candidate in candidates)
+
+def get_cached_graph(user_email: str, etag: str) -> Optional[bytes]:
+    """Return the cached search response for this exact document version"""
+    entry = _graph_cache.get(user_email)
+    if entry is None or entry[0] != etag:
+        graph_cache_stats["misses"] += 1
+        return None
+    _graph_cache.move_to_end(user_email)
+    graph_cache_stats["hits"] += 1
+    return entry[1]
+
+def cache_graph(user_email: str, etag: str, body: bytes):
+    """Cache a serialized search response, evicting the least recently used beyond the size limit"""
+    if GRAPH_CACHE_MAX_ENTRIES <= 0:
+        return
+    _graph_cache[user_email] = (etag, body)
+    _graph_cache.move_to_end(user_email)
+    while len(_graph_cache) > GRAPH_CACHE_MAX_ENTRIES:
+        _graph_cache.popitem(last=False)
+        graph_cache_stats["evictions"] += 1
+
+async def load_user_graph(user_email: str, user_doc: Dict[str, Any], etag: str) -> tuple[bytes, Optional[GraphData]]:
+    """The serialized search response for a document version, and its graph when it had to be built.
+    
+    A cache miss validates the document, builds the graph, records the version for /delta
+    and caches the response; a hit costs neither validation nor a write. (Validation is
+    cheaper here than model_construct, see benchmarks/trusted_decode.py.)
+    """
+    body = get_cached_graph(user_email, etag)
+    if body is not None:
+        return body, None
+    
+    user_access = UserAccess(**user_doc)
+    graph_data = generate_graph_data(user_access)
+    await record_graph_version(user_email, etag.removeprefix("W/").strip('"'), graph_data)
+    body = SearchResponse(user=user_access, graph_data=graph_data).model_dump_json().encode("utf-8")
+    cache_graph(user_email, etag, body)
+    return body, graph_data
+
+# Each served graph version is remembered as per-node/edge content hashes (graph_versions,
+# expired by a TTL index in init-mongo.js) so clients can ask for what changed since theirs
+def graph_fingerprints(items: List[BaseModel]) -> List[List[str]]:
+    """[id, content hash] pairs for graph nodes or edges"""
+    return [
+        [item.id, hashlib.blake2b(item.model_dump_json().encode("utf-8"), digest_size=8).hexdigest()]
+        for item in items
+    ]
+
+async def record_graph_version(user_email: str, version: str, graph_data: GraphData):
+    """Remember a graph version the first time it is served"""
+    try:
+        await db.graph_versions.update_one(
+            {"user_email": user_email, "version": version},
+            {"$setOnInsert": {
+                "nodes": graph_fingerprints(graph_data.nodes),
+                "edges": graph_fingerprints(graph_data.edges),
+                "created_at": datetime.utcnow()
+            }},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        pass  # Another worker recorded the same version concurrently
+
+def diff_graph_items(previous: List[List[str]], items: List[BaseModel]) -> tuple[list, list, List[str]]:
+    """Split current nodes or edges into added and changed ones, plus the ids removed since previous"""
+    previous_hashes = dict(previous)
+    added, changed = [], []
+    for item, (item_id, item_hash) in zip(items, graph_fingerprints(items)):
+        if item_id not in previous_hashes:
+            added.append(item)
+        elif previous_hashes[item_id] != item_hash:
+            changed.append(item)
+    current_ids = {item.id for item in items}
+    removed = [item_id for item_id in previous_hashes if item_id not in current_ids]
+    return added, changed, removed
+
+# Provider colors
+GRAPH_PROVIDER_COLORS = {
+    "aws": "#FF9900",
+    "gcp": "#4285F4", 
+    "azure": "#0078D4",
+    "okta": "#007DC1"
+}
+
+# Access type colors
+GRAPH_ACCESS_COLORS = {
+    "read": "#28A745",
+    "write": "#FFC107",
+    "admin": "#DC3545",
+    "owner": "#6F42C1",
+    "user": "#17A2B8",
+    "execute": "#FD7E14",
+    "delete": "#E83E8C"
+}
+
 # Helper function to generate graph data
 def generate_graph_data(user_access: UserAccess) -> GraphData:
     """Generate graph nodes and edges for visualization"""
     nodes = []
     edges = []
     
-    # Provider colors
-    provider_colors = {
-        "aws": "#FF9900",
-        "gcp": "#4285F4", 
-        "azure": "#0078D4",
-        "okta": "#007DC1"
-    }
-    
-    # Access type colors
-    access_colors = {
-        "read": "#28A745",
-        "write": "#FFC107",
-        "admin": "#DC3545",
-        "owner": "#6F42C1",
-        "user": "#17A2B8",
-        "execute": "#FD7E14",
-        "delete": "#E83E8C"
-    }
+    provider_colors = GRAPH_PROVIDER_COLORS
+    access_colors = GRAPH_ACCESS_COLORS
     
     # User node (center)
     user_node = GraphNode(
@@ -1323,6 +3259,419 @@ def generate_graph_data(user_access: UserAccess) -> GraphData:
     
     return GraphData(nodes=nodes, edges=edges)
 
+# Organization graph: the user -> provider -> service -> resource hierarchy aggregated across
+# every user_access document inside MongoDB, down to one level of detail at a time
+GRAPH_LEVEL_FIELDS = {
+    GraphLevel.PROVIDER: ["provider"],
+    GraphLevel.SERVICE: ["provider", "service"],
+    GraphLevel.RESOURCE: ["provider", "service", "resource_name"]
+}
+
+def org_graph_node_id(key: Dict[str, str]) -> str:
+    """Node id for an aggregated provider, service or resource, matching generate_graph_data's scheme"""
+    if "resource_name" in key:
+        return f"resource-{key['provider']}-{key['service'].replace(' ', '-').lower()}-{key['resource_name']}"
+    if "service" in key:
+        return f"service-{key['provider']}-{key['service'].replace(' ', '-').lower()}"
+    return f"provider-{key['provider']}"
+
+async def aggregate_graph_level(
+    level: GraphLevel,
+    user_filter: Dict[str, Any],
+    grant_filter: Dict[str, Any],
+    limit: Optional[int] = None
+) -> tuple[List[Dict[str, Any]], int]:
+    """Aggregate grants into nodes at one level, riskiest first; returns (rows, total nodes)"""
+    fields = GRAPH_LEVEL_FIELDS[level]
+    pipeline = [
+        {"$match": user_filter},
+        {"$project": {"overall_risk_score": 1, "resources.is_privileged": 1,
+                      **{f"resources.{field}": 1 for field in [*fields, *grant_filter]}}},
+        {"$unwind": "$resources"}
+    ]
+    if grant_filter:
+        pipeline.append({"$match": {f"resources.{field}": value for field, value in grant_filter.items()}})
+    # Count per (node, user) first so user counts stay exact, then roll up per node
+    pipeline += [
+        {"$group": {
+            "_id": {"user": "$_id", **{field: f"$resources.{field}" for field in fields}},
+            "grants": {"$sum": 1},
+            "privileged": {"$sum": {"$cond": ["$resources.is_privileged", 1, 0]}},
+            "risk": {"$max": "$overall_risk_score"}
+        }},
+        {"$group": {
+            "_id": {field: f"$_id.{field}" for field in fields},
+            "users": {"$sum": 1},
+            "grants": {"$sum": "$grants"},
+            "privileged": {"$sum": "$privileged"},
+            "risk": {"$max": "$risk"}
+        }},
+        {"$sort": {"risk": -1, "grants": -1}}
+    ]
+    record_scan("organization_graph_aggregate")
+    if limit is None:
+        rows = await db.user_access.aggregate(pipeline, allowDiskUse=True).to_list(None)
+        return rows, len(rows)
+    
+    pipeline.append({"$facet": {
+        "rows": [{"$limit": limit}],
+        "total": [{"$count": "count"}]
+    }})
+    result = await db.user_access.aggregate(pipeline, allowDiskUse=True).to_list(1)
+    total = result[0]["total"][0]["count"] if result and result[0]["total"] else 0
+    return (result[0]["rows"] if result else []), total
+
+async def build_organization_graph(
+    level: GraphLevel,
+    provider: Optional[str] = None,
+    service: Optional[str] = None,
+    top_users: int = 25,
+    max_nodes: int = 200
+) -> OrganizationGraph:
+    """Build the org-wide access graph at one level of detail, bounded by top_users and max_nodes"""
+    grant_filter = {}
+    if provider:
+        grant_filter["provider"] = provider
+    if service:
+        grant_filter["service"] = service
+    if service:
+        user_filter = {"resources": {"$elemMatch": grant_filter}}
+    elif provider:
+        user_filter = {"providers": provider}
+    else:
+        user_filter = {}
+    
+    # Only the requested level is pruned; the levels above it are a handful of nodes
+    levels = list(GraphLevel)[:list(GraphLevel).index(level) + 1]
+    level_rows = {}
+    for depth_level in levels:
+        rows, total_level_nodes = await aggregate_graph_level(
+            depth_level, user_filter, grant_filter, max_nodes if depth_level == level else None
+        )
+        level_rows[depth_level] = rows
+    
+    nodes = []
+    edges = []
+    kept_ids = {}
+    for depth_level in levels:
+        fields = GRAPH_LEVEL_FIELDS[depth_level]
+        for row in level_rows[depth_level]:
+            key = row["_id"]
+            node_id = org_graph_node_id(key)
+            parent_id = org_graph_node_id({field: key[field] for field in fields[:-1]}) if len(fields) > 1 else None
+            if parent_id is not None and parent_id not in kept_ids:
+                continue
+            kept_ids[node_id] = True
+            nodes.append(AggregateGraphNode(
+                id=node_id,
+                label=key["provider"].upper() if depth_level == GraphLevel.PROVIDER else key[fields[-1]],
+                type=depth_level.value,
+                provider=key["provider"],
+                color=GRAPH_PROVIDER_COLORS.get(key["provider"], "#6C757D"),
+                user_count=row["users"],
+                grant_count=row["grants"],
+                privileged_count=row["privileged"],
+                risk_score=row["risk"] or 0.0
+            ))
+            if parent_id is not None:
+                edges.append(AggregateGraphEdge(
+                    id=f"edge-{parent_id}-{node_id}",
+                    source=parent_id,
+                    target=node_id,
+                    label="provides" if depth_level == GraphLevel.SERVICE else "contains",
+                    weight=row["grants"]
+                ))
+    
+    # The riskiest users connect straight to the nodes they hold at the requested level
+    total_users = await db.user_access.count_documents(user_filter)
+    leaf_fields = GRAPH_LEVEL_FIELDS[level]
+    projection = {"user_email": 1, "overall_risk_score": 1, "resources.is_privileged": 1,
+                  **{f"resources.{field}": 1 for field in [*leaf_fields, *grant_filter]}}
+    user_docs = await db.user_access.find(user_filter, projection)\
+        .sort([("overall_risk_score", -1), ("user_email", -1)])\
+        .limit(top_users)\
+        .to_list(top_users) if top_users else []
+    record_scan("organization_graph_users", len(user_docs))
+    for user_doc in user_docs:
+        user_node_id = f"user-{user_doc['user_email']}"
+        held = {}
+        grant_count = 0
+        privileged_count = 0
+        for resource in user_doc.get("resources", []):
+            if any(resource.get(field) != value for field, value in grant_filter.items()):
+                continue
+            grant_count += 1
+            privileged_count += 1 if resource.get("is_privileged") else 0
+            node_id = org_graph_node_id({field: resource.get(field, "") for field in leaf_fields})
+            if node_id in kept_ids:
+                held[node_id] = held.get(node_id, 0) + 1
+        nodes.append(AggregateGraphNode(
+            id=user_node_id,
+            label=user_doc["user_email"],
+            type="user",
+            color="#6C757D",
+            user_count=1,
+            grant_count=grant_count,
+            privileged_count=privileged_count,
+            risk_score=user_doc.get("overall_risk_score") or 0.0
+        ))
+        for node_id, weight in held.items():
+            edges.append(AggregateGraphEdge(
+                id=f"edge-{user_node_id}-{node_id}",
+                source=user_node_id,
+                target=node_id,
+                label=f"{weight} grants",
+                weight=weight
+            ))
+    
+    return OrganizationGraph(
+        level=level,
+        provider=provider,
+        service=service,
+        nodes=nodes,
+        edges=edges,
+        total_users=total_users,
+        shown_users=len(user_docs),
+        total_level_nodes=total_level_nodes,
+        truncated=total_level_nodes > len(level_rows[level]) or total_users > len(user_docs)
+    )
+
+# Export helpers
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '200'))
+# XLSX is built in memory (see export_data), so its size is capped
+EXPORT_XLSX_MAX_ROWS = int(os.environ.get('EXPORT_XLSX_MAX_ROWS', '100000'))
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+}
+
+EXPORT_FIELDS = [
+    "user_email", "user_name", "department", "job_title", "is_service_account",
+    "provider", "service", "resource_type", "resource_name", "access_type",
+    "risk_level", "is_privileged", "last_used", "mfa_required",
+    "user_risk_score", "cross_provider_admin"
+]
+
+async def iter_export_rows(
+    provider: Optional[str] = None,
+    access_type: Optional[str] = None,
+    risk_level: Optional[str] = None
+):
+    """Yield export rows one user at a time from a batched database cursor"""
+    # Only fetch users holding at least one grant that passes every filter
+    grant_filter = {}
+    if provider:
+        grant_filter["provider"] = provider
+    if access_type:
+        grant_filter["access_type"] = access_type
+    if risk_level:
+        grant_filter["risk_level"] = risk_level
+    query_filter = {"resources": {"$elemMatch": grant_filter}} if grant_filter else {}
+    
+    record_scan("export")
+    async for user_doc in db.user_access.find(query_filter).batch_size(EXPORT_BATCH_SIZE):
+        count_scanned_documents("export")
+        user = ensure_risk_analysis(UserAccess(**user_doc))
+        for resource in user.resources:
+            if provider and resource.provider != provider:
+                continue
+            if access_type and resource.access_type != access_type:
+                continue
+            if risk_level and resource.risk_level != risk_level:
+                continue
+            
+            yield {
+                "user_email": user.user_email,
+                "user_name": user.user_name,
+                "department": user.department,
+                "job_title": user.job_title,
+                "is_service_account": user.is_service_account,
+                "provider": resource.provider,
+                "service": resource.service,
+                "resource_type": resource.resource_type,
+                "resource_name": resource.resource_name,
+                "access_type": resource.access_type,
+                "risk_level": resource.risk_level,
+                "is_privileged": resource.is_privileged,
+                "last_used": resource.last_used,
+                "mfa_required": resource.mfa_required,
+                "user_risk_score": user.overall_risk_score,
+                "cross_provider_admin": user.cross_provider_admin
+            }
+
+async def stream_csv_export(rows):
+    """Encode export rows as CSV chunks, writing the header with the first row"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    header_written = False
+    pending_rows = 0
+    
+    async for row in rows:
+        if not header_written:
+            writer.writeheader()
+            header_written = True
+        writer.writerow(row)
+        pending_rows += 1
+        
+        if pending_rows >= EXPORT_BATCH_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            pending_rows = 0
+    
+    if buffer.tell():
+        yield buffer.getvalue()
+
+async def stream_ndjson_export(rows):
+    """Encode export rows as newline-delimited JSON chunks"""
+    lines = []
+    async for row in rows:
+        lines.append(json.dumps(row, default=str))
+        if len(lines) >= EXPORT_BATCH_SIZE:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+async def stream_json_export(rows):
+    """Encode export rows as an indented JSON array, one element at a time"""
+    first_row = True
+    async for row in rows:
+        element = "\n".join("  " + line for line in json.dumps(row, default=str, indent=2).splitlines())
+        yield ("[\n" if first_row else ",\n") + element
+        first_row = False
+    
+    yield "[]" if first_row else "\n]"
+
+# Keyset pagination helpers
+PAGINATED_SORT_FIELDS = {
+    "risk_score": "overall_risk_score",
+    "user_email": "user_email",
+    "last_updated": "last_updated",
+    "total_resources": "resource_count"
+}
+
+# Sort fields that switch to the provider_risk summary when a provider filter is applied
+PROVIDER_SCOPED_SORT_FIELDS = {
+    "risk_score": "risk_score",
+    "total_resources": "resource_count"
+}
+
+def get_document_field(document: Dict[str, Any], field_path: str) -> Any:
+    """Read a dotted field path from a raw MongoDB document"""
+    value = document
+    for part in field_path.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+def encode_page_cursor(sort_value: Any, user_email: str, sort_field: str, descending: bool) -> str:
+    """Encode the keyset position of the last row of a page into an opaque cursor"""
+    cursor_data = {"f": sort_field, "d": descending, "e": user_email, "v": sort_value}
+    if isinstance(sort_value, datetime):
+        cursor_data.update({"v": sort_value.isoformat(), "t": "datetime"})
+    return base64.urlsafe_b64encode(json.dumps(cursor_data).encode("utf-8")).decode("ascii")
+
+def decode_page_cursor(cursor: str, sort_field: str, descending: bool) -> tuple[Any, str]:
+    """Decode an opaque cursor into its (sort value, user_email) keyset position"""
+    try:
+        cursor_data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        sort_value = cursor_data["v"]
+        if cursor_data.get("t") == "datetime":
+            sort_value = datetime.fromisoformat(sort_value)
+        cursor_field, cursor_descending, user_email = cursor_data["f"], cursor_data["d"], cursor_data["e"]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    
+    if cursor_field != sort_field or cursor_descending != descending:
+        raise HTTPException(status_code=400, detail="Pagination cursor does not match the requested sort")
+    return sort_value, user_email
+
+def keyset_filter(sort_field: str, sort_value: Any, user_email: str, descending: bool) -> Dict[str, Any]:
+    """Build the query matching rows strictly after a keyset position"""
+    op = "$lt" if descending else "$gt"
+    if sort_field == "user_email":
+        return {"user_email": {op: user_email}}
+    return {"$or": [
+        {sort_field: {op: sort_value}},
+        {sort_field: sort_value, "user_email": {op: user_email}}
+    ]}
+
+def paginated_user_row(user_doc: Dict[str, Any], provider_key: Optional[str] = None) -> Dict[str, Any]:
+    """Summarize a stored user_access document for /users/paginated.
+    
+    Scored documents are read as they are (trusted read): the row only needs a few
+    fields, so building and validating UserAccess with every resource would dominate.
+    Documents that still need scoring must be full ones (see with_full_documents).
+    """
+    user_doc = scored_user_doc(user_doc, provider_key)
+    resources = user_doc["resources"]
+    if provider_key:
+        # Use the stored analysis of the provider-scoped resources
+        risk_summary = user_doc["provider_risk"][provider_key]
+        resources = [r for r in resources if r["provider"] == provider_key]
+    else:
+        risk_summary = {
+            "risk_score": user_doc["overall_risk_score"],
+            "risk_level": user_doc["risk_level"],
+            "confidence_score": user_doc["risk_confidence_score"],
+            "top_risk_factors": [rf["factor_type"] for rf in user_doc["risk_factors"][:3]],
+            "cross_provider_admin": user_doc["cross_provider_admin"],
+            "privilege_escalation_count": len(user_doc["privilege_escalation_paths"]),
+            "unused_privileges_count": len(user_doc["unused_privileges"])
+        }
+    
+    return {
+        "user_email": user_doc["user_email"],
+        "user_name": user_doc["user_name"],
+        "department": user_doc.get("department"),
+        "job_title": user_doc.get("job_title"),
+        "is_service_account": user_doc.get("is_service_account", False),
+        "risk_score": risk_summary["risk_score"],
+        "risk_level": risk_summary["risk_level"],
+        "confidence_score": risk_summary["confidence_score"],
+        "total_resources": len(resources),
+        "admin_access_count": sum(1 for r in resources if r["access_type"] == AccessType.ADMIN),
+        "providers": list(set(r["provider"] for r in resources)),
+        "services": list(set(f"{getattr(r['provider'], 'value', r['provider'])}-{r['service']}" for r in resources)),
+        "cross_provider_admin": risk_summary["cross_provider_admin"],
+        "privilege_escalation_count": risk_summary["privilege_escalation_count"],
+        "unused_privileges_count": risk_summary["unused_privileges_count"],
+        "top_risk_factors": risk_summary["top_risk_factors"],
+        "last_updated": user_doc["last_updated"]
+    }
+
+def encode_audit_cursor(audit_doc: Dict[str, Any]) -> str:
+    """Encode an audit log's (timestamp, id) position into an opaque cursor"""
+    cursor_data = {"t": audit_doc["timestamp"].isoformat(), "i": audit_doc["id"]}
+    return base64.urlsafe_b64encode(json.dumps(cursor_data).encode("utf-8")).decode("ascii")
+
+def decode_audit_cursor(cursor: str) -> tuple[datetime, str]:
+    """Decode an audit log cursor into its (timestamp, id) position"""
+    try:
+        cursor_data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(cursor_data["t"]), cursor_data["i"]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid audit log cursor")
+
+def audit_keyset_filter(cursor: str, older: bool) -> Dict[str, Any]:
+    """Match audit logs strictly older (or newer) than a cursor position, ties broken by id"""
+    timestamp, audit_id = decode_audit_cursor(cursor)
+    op = "$lt" if older else "$gt"
+    return {"$or": [
+        {"timestamp": {op: timestamp}},
+        {"timestamp": timestamp, "id": {op: audit_id}}
+    ]}
+
+def to_naive_utc(value: datetime) -> datetime:
+    """Normalize a datetime to naive UTC, as timestamps are stored"""
+    if value.tzinfo is not None:
+        value = (value - value.utcoffset()).replace(tzinfo=None)
+    return value
+
 # API Routes
 
 # Authentication Endpoints
@@ -1358,7 +3707,7 @@ async def signup(user_data: dict):
         
         # Create new user
         user_id = str(uuid.uuid4())
-        hashed_password = hash_password(password)
+        hashed_password = await hash_password_async(password)
         
         # Determine role (first user is admin, others are users)
         user_count = await db.users.count_documents({})
@@ -1416,20 +3765,25 @@ async def login(user_credentials: UserLogin):
     """Authenticate user and return JWT token"""
     try:
         user_doc = await db.users.find_one({"email": user_credentials.email})
-        if not user_doc or not verify_password(user_credentials.password, user_doc["hashed_password"]):
+        if not user_doc or not await verify_password_async(user_credentials.password, user_doc["hashed_password"]):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        user = User(**user_doc)
+        user = trusted_user(user_doc)
         if not user.is_active:
             raise HTTPException(status_code=400, detail="Inactive user")
         
+        # Move hashes made with another BCRYPT_ROUNDS to the current cost while the password is at hand
+        if password_needs_rehash(user.hashed_password):
+            user.hashed_password = await hash_password_async(user_credentials.password)
+            await db.users.update_one({"id": user.id}, {"$set": {"hashed_password": user.hashed_password}})
+        
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
-            data={"sub": user.email}, expires_delta=access_token_expires
+            data=build_token_claims(user), expires_delta=access_token_expires
         )
         
         user_response = UserResponse(
@@ -1456,6 +3810,13 @@ async def login(user_credentials: UserLogin):
 @api_router.get("/auth/me", response_model=UserResponse)
 async def get_current_user_info(current_user: User = Depends(get_current_user)):
     """Get current user information"""
+    if JWT_STATELESS_AUTH:
+        # Stateless principals only carry the token claims
+        user_doc = await db.users.find_one({"id": current_user.id})
+        if user_doc is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        current_user = trusted_user(user_doc)
+    
     return UserResponse(
         id=current_user.id,
         email=current_user.email,
@@ -1481,7 +3842,7 @@ async def create_user(
         # Create new user
         new_user = User(
             email=user_data.email,
-            hashed_password=hash_password(user_data.password),
+            hashed_password=await hash_password_async(user_data.password),
             role=user_data.role,
             created_by=current_admin.email
         )
@@ -1542,7 +3903,7 @@ async def update_user(
             update_data["email"] = user_data.email
         
         if user_data.password:
-            update_data["hashed_password"] = hash_password(user_data.password)
+            update_data["hashed_password"] = await hash_password_async(user_data.password)
         
         if user_data.is_active is not None:
             update_data["is_active"] = user_data.is_active
@@ -1550,6 +3911,9 @@ async def update_user(
         update_data["updated_at"] = datetime.utcnow()
         
         await db.users.update_one({"id": user_id}, {"$set": update_data})
+        invalidate_principal_cache(user_id=user_id, email=user_doc["email"])
+        if {"email", "hashed_password"} & update_data.keys() or user_data.is_active is False:
+            await revoke_user_tokens(user_id)
         
         # Get updated user
         updated_user_doc = await db.users.find_one({"id": user_id})
@@ -1580,9 +3944,12 @@ async def delete_user(
         if current_admin.id == user_id:
             raise HTTPException(status_code=400, detail="Cannot delete your own account")
         
+        # Revoke first: the token version lives on the user document
+        await revoke_user_tokens(user_id)
         result = await db.users.delete_one({"id": user_id})
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="User not found")
+        invalidate_principal_cache(user_id=user_id)
         
         return {"message": "User deleted successfully"}
     
@@ -1609,11 +3976,14 @@ async def update_own_profile(
             update_data["email"] = user_data.email
         
         if user_data.password:
-            update_data["hashed_password"] = hash_password(user_data.password)
+            update_data["hashed_password"] = await hash_password_async(user_data.password)
         
         update_data["updated_at"] = datetime.utcnow()
         
         await db.users.update_one({"id": current_user.id}, {"$set": update_data})
+        invalidate_principal_cache(user_id=current_user.id, email=current_user.email)
+        if {"email", "hashed_password"} & update_data.keys():
+            await revoke_user_tokens(current_user.id)
         
         # Get updated user
         updated_user_doc = await db.users.find_one({"id": current_user.id})
@@ -1657,6 +4027,7 @@ async def root():
 @api_router.get("/search/{user_email}", response_model=SearchResponse)
 async def search_user_access(
     user_email: str,
+    request: Request,
     current_user: User = Depends(get_current_user)
 ):
     """Search for user access across all cloud providers"""
@@ -1671,24 +4042,60 @@ async def search_user_access(
                 graph_data=GraphData(nodes=[], edges=[])
             )
         
-        user_access = UserAccess(**user_doc)
-        graph_data = generate_graph_data(user_access)
+        # The graph only changes with the document, so revalidation never rebuilds it. The
+        # ETag is weak because the 200 may go out compressed; 304s must carry the same one
+        etag = "W/" + user_access_etag(user_doc)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            graph_cache_stats["not_modified"] += 1
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
         
-        return SearchResponse(
-            user=user_access,
-            graph_data=graph_data
-        )
+        body, _ = await load_user_graph(user_email, user_doc, etag)
+        return Response(content=body, media_type="application/json", headers=headers)
     
     except Exception as e:
         logging.error(f"Error searching for user {user_email}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error searching user access: {str(e)}")
 
+@api_router.get("/graph/organization", response_model=OrganizationGraph)
+async def get_organization_graph(
+    level: GraphLevel = Query(GraphLevel.PROVIDER, description="Deepest level of detail to return"),
+    provider: Optional[CloudProvider] = Query(None, description="Restrict to one provider's subtree"),
+    service: Optional[str] = Query(None, description="Restrict to one service's subtree"),
+    top_users: int = Query(25, ge=0, le=500, description="Riskiest users to include as nodes"),
+    max_nodes: int = Query(200, ge=1, le=2000, description="Most nodes to return at the requested level, riskiest first"),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the organization-wide access graph, aggregated to a level of detail"""
+    try:
+        if level == GraphLevel.RESOURCE and not (provider and service):
+            raise HTTPException(
+                status_code=400,
+                detail="Resource-level graphs need a provider and service subtree"
+            )
+        
+        return ORJSONModelResponse(await build_organization_graph(
+            level,
+            provider=provider.value if provider else None,
+            service=service,
+            top_users=top_users,
+            max_nodes=max_nodes
+        ))
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error building organization graph: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error building organization graph")
+
 @api_router.get("/users", response_model=List[UserAccess])
 async def get_all_users(current_user: User = Depends(get_current_user)):
     """Get all users in the system"""
     try:
-        users = await db.user_access.find().to_list(1000)
-        return [UserAccess(**user) for user in users]
+        # Stored documents already have the UserAccess shape (trusted read)
+        users = await db.user_access.find({}, {"_id": 0}).to_list(1000)
+        record_scan("users", len(users))
+        return ORJSONModelResponse(users)
     except Exception as e:
         logging.error(f"Error getting users: {str(e)}")
         raise HTTPException(status_code=500, detail="Error retrieving users")
@@ -1717,9 +4124,8 @@ async def get_user_resources(
 async def get_provider_statistics(current_user: User = Depends(get_current_user)):
     """Get statistics about all cloud providers"""
     try:
-        users = await db.user_access.find().to_list(1000)
         stats = {
-            "total_users": len(users),
+            "total_users": await db.user_access.count_documents({}),
             "providers": {
                 "aws": {"users": 0, "resources": 0},
                 "gcp": {"users": 0, "resources": 0},
@@ -1728,16 +4134,26 @@ async def get_provider_statistics(current_user: User = Depends(get_current_user)
             }
         }
         
-        for user_doc in users:
-            user_access = UserAccess(**user_doc)
-            user_providers = set()
-            
-            for resource in user_access.resources:
-                provider = resource.provider
-                if provider not in user_providers:
-                    stats["providers"][provider]["users"] += 1
-                    user_providers.add(provider)
-                stats["providers"][provider]["resources"] += 1
+        # Count per (user, provider) first, then roll up per provider, all inside MongoDB
+        pipeline = [
+            {"$project": {"resources.provider": 1}},
+            {"$unwind": "$resources"},
+            {"$group": {
+                "_id": {"user": "$_id", "provider": "$resources.provider"},
+                "resources": {"$sum": 1}
+            }},
+            {"$group": {
+                "_id": "$_id.provider",
+                "users": {"$sum": 1},
+                "resources": {"$sum": "$resources"}
+            }}
+        ]
+        record_scan("provider_stats")
+        async for provider_stats in db.user_access.aggregate(pipeline):
+            stats["providers"][provider_stats["_id"]] = {
+                "users": provider_stats["users"],
+                "resources": provider_stats["resources"]
+            }
         
         return stats
     except Exception as e:
@@ -1748,7 +4164,10 @@ async def get_provider_statistics(current_user: User = Depends(get_current_user)
 
 @api_router.post("/import/json")
 async def import_json_data(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
+    streaming: bool = Query(False, description="Spool the upload to disk and import it incrementally in the background"),
+    batch_size: int = Query(IMPORT_BATCH_SIZE, ge=1, le=10000, description="Users per bulk write batch"),
     current_user: User = Depends(get_current_user)
 ):
     """Import user access data from JSON file"""
@@ -1756,10 +4175,13 @@ async def import_json_data(
         if not file.filename.endswith('.json'):
             raise HTTPException(status_code=400, detail="File must be a JSON file")
         
+        if streaming:
+            return await start_streaming_import(file, current_user, background_tasks, batch_size)
+        
         content = await file.read()
         json_data = json.loads(content.decode('utf-8'))
         
-        result = await process_json_import(json_data)
+        result = await process_json_import(json_data, batch_size)
         return result
     
     except json.JSONDecodeError:
@@ -1768,6 +4190,42 @@ async def import_json_data(
         logging.error(f"Error importing JSON data: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error importing data: {str(e)}")
 
+async def start_streaming_import(
+    file: UploadFile,
+    current_user: User,
+    background_tasks: BackgroundTasks,
+    batch_size: int = IMPORT_BATCH_SIZE
+) -> Dict[str, Any]:
+    """Spool an upload to disk and schedule its incremental import"""
+    spool_file = tempfile.NamedTemporaryFile(prefix="import-", suffix=".json", delete=False)
+    try:
+        with spool_file:
+            while chunk := await file.read(1024 * 1024):
+                spool_file.write(chunk)
+    except Exception:
+        os.remove(spool_file.name)
+        raise
+    
+    job = ImportJob(filename=file.filename, created_by=current_user.email)
+    await db.import_jobs.insert_one(job.dict())
+    background_tasks.add_task(process_streaming_import, job.id, spool_file.name, batch_size)
+    
+    return {
+        "status": "accepted",
+        "job_id": job.id
+    }
+
+@api_router.get("/import/jobs/{job_id}", response_model=ImportJob)
+async def get_import_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Get the progress of a streaming import"""
+    job_doc = await db.import_jobs.find_one({"id": job_id})
+    if not job_doc:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return ImportJob(**job_doc)
+
 @api_router.get("/search/resource/{resource_name}", response_model=List[ResourceSearchResult])
 async def search_by_resource(
     resource_name: str,
@@ -1775,35 +4233,24 @@ async def search_by_resource(
 ):
     """Search for users who have access to a specific resource"""
     try:
-        users = await db.user_access.find().to_list(1000)
-        results = []
+        # Substring match on normalized resource names, answered from the resource index
+        index_entries = await db.resource_index.find(
+            {"resource_key": {"$regex": re.escape(normalize_resource_key(resource_name))}}
+        ).sort("resource_key", 1).to_list(1000)
         
-        for user_doc in users:
-            user_access = UserAccess(**user_doc)
-            matching_resources = [
-                resource for resource in user_access.resources
-                if resource_name.lower() in resource.resource_name.lower()
-            ]
+        results = []
+        for entry in index_entries:
+            holders = entry["holders"]
+            risk_summary = {level: 0 for level in RISK_LEVEL_ORDER}
+            for holder in holders:
+                risk_summary[holder["risk_level"]] += 1
             
-            if matching_resources:
-                for resource in matching_resources:
-                    # Count total users with access to this resource
-                    total_users = 0
-                    risk_summary = {"low": 0, "medium": 0, "high": 0, "critical": 0}
-                    
-                    for other_user_doc in users:
-                        other_user = UserAccess(**other_user_doc)
-                        if any(r.resource_name == resource.resource_name for r in other_user.resources):
-                            total_users += 1
-                            risk_level = resource.risk_level or "low"
-                            risk_summary[risk_level] += 1
-                    
-                    results.append(ResourceSearchResult(
-                        resource=resource,
-                        users_with_access=[user_access.user_email],
-                        total_users=total_users,
-                        risk_summary=risk_summary
-                    ))
+            results.append(ResourceSearchResult(
+                resource=CloudResource(**entry["resource"]),
+                users_with_access=[holder["user_email"] for holder in holders],
+                total_users=len(holders),
+                risk_summary=risk_summary
+            ))
         
         return results
     
@@ -1811,93 +4258,99 @@ async def search_by_resource(
         logging.error(f"Error searching by resource {resource_name}: {str(e)}")
         raise HTTPException(status_code=500, detail="Error searching by resource")
 
-@api_router.get("/analytics", response_model=AccessAnalytics)
-async def get_access_analytics(current_user: User = Depends(get_current_user)):
-    """Get comprehensive access analytics and insights"""
+# Registered after /search/resource/{resource_name}, which would otherwise lose
+# /search/resource/delta (a resource named "delta") to this route
+@api_router.get("/search/{user_email}/delta", response_model=GraphDelta)
+async def get_user_graph_delta(
+    user_email: str,
+    since: str = Query(..., description="Graph version the client holds (the ETag of its /search response)"),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the nodes and edges of a user's graph that changed since a previous version"""
     try:
-        users = await db.user_access.find().to_list(1000)
-        user_objects = [UserAccess(**user) for user in users]
+        user_doc = await db.user_access.find_one({"user_email": user_email})
+        if not user_doc:
+            raise HTTPException(status_code=404, detail="User not found")
         
-        # Calculate analytics
-        total_users = len(user_objects)
-        total_resources = sum(len(user.resources) for user in user_objects)
+        since = since.removeprefix("W/").strip('"')
+        etag = "W/" + user_access_etag(user_doc)
+        version = etag.removeprefix("W/").strip('"')
+        if since == version:
+            return GraphDelta(version=version, since=since)
         
-        # Risk distribution
-        risk_distribution = {"low": 0, "medium": 0, "high": 0, "critical": 0}
-        cross_provider_admins = 0
-        unused_privileges_count = 0
-        privilege_escalation_risks = []
+        # Same cached graph as /search; only its nodes and edges are decoded from the response
+        body, graph_data = await load_user_graph(user_email, user_doc, etag)
+        if graph_data is None:
+            graph_data = GraphData.model_validate(orjson.loads(body)["graph_data"])
+        previous = await db.graph_versions.find_one({"user_email": user_email, "version": since})
+        if not previous:
+            return GraphDelta(version=version, since=since, full=True, graph=graph_data)
         
-        # Top privileged users
-        top_privileged_users = []
+        added_nodes, changed_nodes, removed_node_ids = diff_graph_items(previous["nodes"], graph_data.nodes)
+        added_edges, changed_edges, removed_edge_ids = diff_graph_items(previous["edges"], graph_data.edges)
+        return GraphDelta(
+            version=version,
+            since=since,
+            added_nodes=added_nodes,
+            changed_nodes=changed_nodes,
+            removed_node_ids=removed_node_ids,
+            added_edges=added_edges,
+            changed_edges=changed_edges,
+            removed_edge_ids=removed_edge_ids
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error getting graph delta for user {user_email}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error retrieving graph delta")
+
+@api_router.get("/analytics", response_model=AccessAnalytics)
+async def get_access_analytics(
+    debug_timing: bool = Query(False, description="Include phase timings in a debug block"),
+    current_user: User = Depends(get_current_user)
+):
+    """Get comprehensive access analytics and insights"""
+    try:
+        timer = start_phase_timer(debug_timing)
         
-        for user in user_objects:
-            # Analyze user and calculate risk
-            analyzed_user = analyze_user_access(user)
-            
-            # Update risk distribution
-            if analyzed_user.overall_risk_score < 25:
-                risk_distribution["low"] += 1
-            elif analyzed_user.overall_risk_score < 50:
-                risk_distribution["medium"] += 1
-            elif analyzed_user.overall_risk_score < 75:
-                risk_distribution["high"] += 1
-            else:
-                risk_distribution["critical"] += 1
-            
-            # Count cross-provider admins
-            if analyzed_user.cross_provider_admin:
-                cross_provider_admins += 1
-            
-            # Count unused privileges
-            unused_privileges_count += len(analyzed_user.unused_privileges)
-            
-            # Collect privilege escalation risks
-            privilege_escalation_risks.extend(analyzed_user.privilege_escalation_paths)
-            
-            # Add to top privileged users
-            admin_count = sum(1 for r in user.resources if r.access_type == AccessType.ADMIN)
-            if admin_count > 0:
-                top_privileged_users.append({
-                    "user_email": user.user_email,
-                    "user_name": user.user_name,
-                    "admin_access_count": admin_count,
-                    "total_resources": len(user.resources),
-                    "risk_score": analyzed_user.overall_risk_score,
-                    "is_service_account": user.is_service_account
-                })
-        
-        # Sort top privileged users by risk score
-        top_privileged_users.sort(key=lambda x: x["risk_score"], reverse=True)
-        top_privileged_users = top_privileged_users[:10]  # Top 10
-        
-        # Provider statistics
-        provider_stats = {}
-        for provider in ["aws", "gcp", "azure", "okta"]:
-            users_with_provider = sum(
-                1 for user in user_objects
-                if any(r.provider == provider for r in user.resources)
+        # Maintained incrementally by import, delete and rescore. Building it takes a full
+        # scan, which is left to startup and the admin rebuild rather than done per request
+        with timed_phase("mongo"):
+            summary = await db.analytics_summary.find_one(
+                {"id": ANALYTICS_SUMMARY_ID, "rebuilt_at": {"$exists": True}},
+                {"_id": 0}
             )
-            resources_in_provider = sum(
-                len([r for r in user.resources if r.provider == provider])
-                for user in user_objects
+        if summary is None:
+            raise HTTPException(
+                status_code=503,
+                detail="Analytics summary is not built yet",
+                headers={"Retry-After": "30"}
             )
-            provider_stats[provider] = {
-                "users": users_with_provider,
-                "resources": resources_in_provider
-            }
         
-        return AccessAnalytics(
-            total_users=total_users,
-            total_resources=total_resources,
-            risk_distribution=risk_distribution,
-            top_privileged_users=top_privileged_users,
-            unused_privileges_count=unused_privileges_count,
-            cross_provider_admins=cross_provider_admins,
-            privilege_escalation_risks=privilege_escalation_risks,
-            provider_stats=provider_stats
-        )
+        provider_stats = summary.get("provider_stats", {})
+        with timed_phase("validate"):
+            analytics = AccessAnalytics(
+                total_users=summary["total_users"],
+                total_resources=summary["total_resources"],
+                risk_distribution=summary["risk_distribution"],
+                top_privileged_users=summary.get("top_privileged_users", []),
+                unused_privileges_count=summary["unused_privileges_count"],
+                cross_provider_admins=summary["cross_provider_admins"],
+                privilege_escalation_risks=summary.get("privilege_escalation_risks", []),
+                provider_stats={
+                    provider: provider_stats.get(provider, {"users": 0, "resources": 0})
+                    for provider in ANALYTICS_PROVIDERS
+                }
+            )
+        
+        content = analytics
+        if debug_timing:
+            content = {**analytics.model_dump(), "debug": {"timing": timer.debug_block()}}
+        return timed_response(timer, content)
     
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error getting analytics: {str(e)}")
         raise HTTPException(status_code=500, detail="Error retrieving analytics")
@@ -1907,78 +4360,48 @@ async def export_data(
     format: str,
     provider: Optional[str] = Query(None),
     access_type: Optional[str] = Query(None),
-    risk_level: Optional[str] = Query(None)
+    risk_level: Optional[str] = Query(None),
+    current_user: User = Depends(get_current_user)
 ):
-    """Export access data in various formats (CSV, XLSX, JSON)"""
+    """Export access data in various formats (CSV, NDJSON, XLSX, JSON)
+    
+    CSV, NDJSON and JSON are streamed as rows are read. XLSX is not: the workbook is built
+    in memory, so it is refused above EXPORT_XLSX_MAX_ROWS rows in favour of CSV or NDJSON.
+    """
     try:
-        if format not in ["csv", "xlsx", "json"]:
-            raise HTTPException(status_code=400, detail="Format must be csv, xlsx, or json")
-        
-        # Get all users
-        users = await db.user_access.find().to_list(1000)
-        user_objects = [UserAccess(**user) for user in users]
-        
-        # Apply filters
-        filtered_data = []
-        for user in user_objects:
-            analyzed_user = analyze_user_access(user)
-            for resource in user.resources:
-                if provider and resource.provider != provider:
-                    continue
-                if access_type and resource.access_type != access_type:
-                    continue
-                if risk_level and resource.risk_level != risk_level:
-                    continue
-                
-                filtered_data.append({
-                    "user_email": user.user_email,
-                    "user_name": user.user_name,
-                    "department": user.department,
-                    "job_title": user.job_title,
-                    "is_service_account": user.is_service_account,
-                    "provider": resource.provider,
-                    "service": resource.service,
-                    "resource_type": resource.resource_type,
-                    "resource_name": resource.resource_name,
-                    "access_type": resource.access_type,
-                    "risk_level": resource.risk_level,
-                    "is_privileged": resource.is_privileged,
-                    "last_used": resource.last_used,
-                    "mfa_required": resource.mfa_required,
-                    "user_risk_score": analyzed_user.overall_risk_score,
-                    "cross_provider_admin": analyzed_user.cross_provider_admin
-                })
-        
-        if format == "json":
-            output = json.dumps(filtered_data, default=str, indent=2)
-            media_type = "application/json"
-            filename = f"cloud_access_export_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.json"
-        
-        elif format == "csv":
-            output = io.StringIO()
-            if filtered_data:
-                writer = csv.DictWriter(output, fieldnames=filtered_data[0].keys())
-                writer.writeheader()
-                writer.writerows(filtered_data)
-            output = output.getvalue()
-            media_type = "text/csv"
-            filename = f"cloud_access_export_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"
-        
-        elif format == "xlsx":
-            df = pd.DataFrame(filtered_data)
+        if format not in EXPORT_MEDIA_TYPES:
+            raise HTTPException(status_code=400, detail="Format must be csv, ndjson, xlsx, or json")
+        
+        filters = {"provider": provider, "access_type": access_type, "risk_level": risk_level}
+        filename = f"cloud_access_export_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{format}"
+        headers = {"Content-Disposition": f"attachment; filename={filename}"}
+        
+        if format == "xlsx":
+            # The XLSX container is a zip archive and cannot be written incrementally
+            rows = []
+            async for row in iter_export_rows(**filters):
+                if len(rows) >= EXPORT_XLSX_MAX_ROWS:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"XLSX exports are limited to {EXPORT_XLSX_MAX_ROWS} rows; use csv or ndjson for larger exports"
+                    )
+                rows.append(row)
+            df = pd.DataFrame(rows)
             output = io.BytesIO()
             with pd.ExcelWriter(output, engine='openpyxl') as writer:
                 df.to_excel(writer, index=False, sheet_name='Cloud Access Report')
-            output = output.getvalue()
-            media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            filename = f"cloud_access_export_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.xlsx"
+            output.seek(0)
+            return StreamingResponse(output, media_type=EXPORT_MEDIA_TYPES[format], headers=headers)
         
+        stream_writers = {"csv": stream_csv_export, "ndjson": stream_ndjson_export, "json": stream_json_export}
         return StreamingResponse(
-            io.BytesIO(output) if format == "xlsx" else io.StringIO(output),
-            media_type=media_type,
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
+            stream_writers[format](iter_export_rows(**filters)),
+            media_type=EXPORT_MEDIA_TYPES[format],
+            headers=headers
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error exporting data: {str(e)}")
         raise HTTPException(status_code=500, detail="Error exporting data")
@@ -1989,106 +4412,103 @@ async def export_data(
 async def get_users_paginated(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(50, ge=1, le=500, description="Items per page"),
-    search: Optional[str] = Query(None, description="Search by email"),
+    search: Optional[str] = Query(None, description="Search by email (case-insensitive substring)"),
     provider: Optional[str] = Query(None, description="Filter by provider"),
     risk_level: Optional[str] = Query(None, description="Filter by risk level"),
     sort_by: str = Query("risk_score", description="Sort by field"),
     sort_order: str = Query("desc", description="Sort order (asc/desc)"),
+    cursor: Optional[str] = Query(None, description="Opaque keyset cursor from a previous page's next_cursor (overrides page)"),
+    debug_timing: bool = Query(False, description="Include phase timings in a debug block"),
     current_user: User = Depends(get_current_user)
 ):
     """Get paginated list of users with search and filtering"""
     try:
-        # Calculate skip value
+        timer = start_phase_timer(debug_timing)
+        provider_key = provider.lower() if provider else None
+        
+        # Provider-filtered rows are scored on that provider's resources only
+        scoped_prefix = None
+        if provider_key in [p.value for p in CloudProvider]:
+            scoped_prefix = f"provider_risk.{provider_key}."
+        
+        # Build the query on the denormalized, indexed fields
+        query_filter = {}
+        if search:
+            # Substring match on the lowercased email. Unanchored, it still walks the
+            # user_email_lower index keys only and fetches just the matching documents
+            query_filter["user_email_lower"] = {"$regex": re.escape(search.lower())}
+        if provider_key:
+            query_filter["providers"] = provider_key
+        if risk_level:
+            query_filter[f"{scoped_prefix}risk_level" if scoped_prefix else "risk_level"] = risk_level
+        
+        # Sort on the requested field with user_email as the unique tiebreaker
+        sort_field = PAGINATED_SORT_FIELDS.get(sort_by, "user_email")
+        if scoped_prefix and sort_by in PROVIDER_SCOPED_SORT_FIELDS:
+            sort_field = scoped_prefix + PROVIDER_SCOPED_SORT_FIELDS[sort_by]
+        descending = sort_order.lower() == "desc"
+        direction = -1 if descending else 1
+        sort_spec = [(sort_field, direction)]
+        if sort_field != "user_email":
+            sort_spec.append(("user_email", direction))
+        
+        # Keyset mode continues after the cursor position; page mode skips
+        page_filter = query_filter
         skip = (page - 1) * page_size
+        if cursor:
+            sort_value, last_email = decode_page_cursor(cursor, sort_field, descending)
+            page_filter = {"$and": [query_filter, keyset_filter(sort_field, sort_value, last_email, descending)]}
+            skip = 0
         
-        # Get all users and apply filters in memory (for advanced filtering)
-        all_users = await db.user_access.find().to_list(10000)
-        filtered_users = []
+        # Fetch one extra row to learn whether another page follows
+        projection = user_access_projection("paginated_users", scoped_prefix and provider_key, (sort_field,))
+        with timed_phase("mongo"):
+            user_docs = await db.user_access.find(page_filter, projection)\
+                .sort(sort_spec)\
+                .skip(skip)\
+                .limit(page_size + 1)\
+                .to_list(page_size + 1)
+        record_scan("paginated_users", len(user_docs))
+        has_next = len(user_docs) > page_size
+        user_docs = user_docs[:page_size]
         
-        for user_doc in all_users:
-            user_access = UserAccess(**user_doc)
-            
-            # Apply search filter
-            if search and search.lower() not in user_access.user_email.lower():
-                continue
-            
-            # Apply provider filter
-            if provider:
-                # Filter resources by provider first
-                provider_resources = [r for r in user_access.resources if r.provider.lower() == provider.lower()]
-                if not provider_resources:
-                    continue
-                # Create a copy of user_access with only provider resources for analysis
-                user_access = UserAccess(
-                    user_email=user_access.user_email,
-                    user_name=user_access.user_name,
-                    department=user_access.department,
-                    job_title=user_access.job_title,
-                    is_service_account=user_access.is_service_account,
-                    last_updated=user_access.last_updated,
-                    resources=provider_resources,
-                    cross_provider_admin=False,
-                    privilege_escalation_paths=[],
-                    unused_privileges=[],
-                    overall_risk_score=0.0
-                )
-            
-            # Perform risk analysis
-            analyzed_user = analyze_user_access(user_access)
-            risk_result = calculate_comprehensive_risk_score(analyzed_user)
-            
-            # Apply risk level filter
-            if risk_level and risk_result.risk_level != risk_level:
-                continue
-            
-            # Prepare user data for response
-            user_data = {
-                "user_email": user_access.user_email,
-                "user_name": user_access.user_name,
-                "department": user_access.department,
-                "job_title": user_access.job_title,
-                "is_service_account": user_access.is_service_account,
-                "risk_score": risk_result.overall_score,
-                "risk_level": risk_result.risk_level,
-                "confidence_score": risk_result.confidence_score,
-                "total_resources": len(user_access.resources),
-                "admin_access_count": sum(1 for r in user_access.resources if r.access_type == AccessType.ADMIN),
-                "providers": list(set(r.provider for r in user_access.resources)),
-                "services": list(set(f"{r.provider}-{r.service}" for r in user_access.resources)),
-                "cross_provider_admin": analyzed_user.cross_provider_admin,
-                "privilege_escalation_count": len(analyzed_user.privilege_escalation_paths),
-                "unused_privileges_count": len(analyzed_user.unused_privileges),
-                "top_risk_factors": [rf.factor_type for rf in risk_result.risk_factors[:3]],
-                "last_updated": user_access.last_updated
-            }
-            
-            filtered_users.append(user_data)
-        
-        # Sort users
-        reverse_sort = sort_order.lower() == "desc"
-        if sort_by == "risk_score":
-            filtered_users.sort(key=lambda x: x["risk_score"], reverse=reverse_sort)
-        elif sort_by == "user_email":
-            filtered_users.sort(key=lambda x: x["user_email"], reverse=reverse_sort)
-        elif sort_by == "last_updated":
-            filtered_users.sort(key=lambda x: x["last_updated"], reverse=reverse_sort)
-        elif sort_by == "total_resources":
-            filtered_users.sort(key=lambda x: x["total_resources"], reverse=reverse_sort)
-        
-        # Apply pagination
-        total_users = len(filtered_users)
-        paginated_users = filtered_users[skip:skip + page_size]
+        with timed_phase("mongo"):
+            row_docs = await with_full_documents(user_docs, provider_key)
+        with timed_phase("rows"):
+            paginated_users = [paginated_user_row(user_doc, provider_key) for user_doc in row_docs]
         
-        return {
-            "users": paginated_users,
-            "pagination": {
+        next_cursor = None
+        if has_next and user_docs:
+            last_doc = user_docs[-1]
+            next_cursor = encode_page_cursor(get_document_field(last_doc, sort_field), last_doc["user_email"], sort_field, descending)
+        
+        # Totals need a count over the whole filter, so only page mode reports them
+        if cursor:
+            pagination = {
+                "page": None,
+                "page_size": page_size,
+                "total_users": None,
+                "total_pages": None,
+                "has_next": has_next,
+                "has_prev": True,
+                "next_cursor": next_cursor
+            }
+        else:
+            with timed_phase("count"):
+                total_users = await db.user_access.count_documents(query_filter)
+            pagination = {
                 "page": page,
                 "page_size": page_size,
                 "total_users": total_users,
                 "total_pages": (total_users + page_size - 1) // page_size,
-                "has_next": skip + page_size < total_users,
-                "has_prev": page > 1
-            },
+                "has_next": has_next,
+                "has_prev": page > 1,
+                "next_cursor": next_cursor
+            }
+        
+        content = {
+            "users": paginated_users,
+            "pagination": pagination,
             "filters": {
                 "search": search,
                 "provider": provider,
@@ -2097,7 +4517,12 @@ async def get_users_paginated(
                 "sort_order": sort_order
             }
         }
+        if debug_timing:
+            content["debug"] = {"timing": timer.debug_block()}
+        return timed_response(timer, content)
     
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error getting paginated users: {str(e)}")
         raise HTTPException(status_code=500, detail="Error retrieving users")
@@ -2115,6 +4540,18 @@ async def get_provider_analytics(
         logging.error(f"Error getting provider analytics: {str(e)}")
         raise HTTPException(status_code=500, detail="Error retrieving provider analytics")
 
+@api_router.get("/analytics/risk-scan")
+async def get_risk_scan(
+    provider: Optional[CloudProvider] = Query(None, description="Score only this provider's grants"),
+    current_user: User = Depends(get_current_user)
+):
+    """Rescore all users from their current grants with the vectorized risk engine"""
+    try:
+        return await scan_user_risk(provider.value if provider else None)
+    except Exception as e:
+        logging.error(f"Error scanning user risk: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error scanning user risk")
+
 @api_router.get("/analytics/dashboard/{provider}")
 async def get_provider_dashboard(
     provider: str,
@@ -2126,21 +4563,24 @@ async def get_provider_dashboard(
         analytics = await get_provider_risk_analytics(provider)
         
         # Get top risky services for this provider
-        users = await db.user_access.find().to_list(1000)
+        users = await db.user_access.find(
+            {"providers": provider}, user_access_projection("provider_dashboard", provider)
+        ).to_list(1000)
+        record_scan("provider_dashboard", len(users))
+        users = await with_full_documents(users, provider)
         service_risks = {}
         
         for user_doc in users:
-            user_access = UserAccess(**user_doc)
-            provider_resources = [r for r in user_access.resources if r.provider == provider]
+            user_doc = scored_user_doc(user_doc, provider)
+            provider_resources = [r for r in user_doc["resources"] if r["provider"] == provider]
             
             if not provider_resources:
                 continue
                 
-            user_access.resources = provider_resources
-            analyzed_user = analyze_user_access(user_access)
+            provider_risk_score = user_doc["provider_risk"][provider]["risk_score"]
             
             for resource in provider_resources:
-                service_key = resource.service
+                service_key = resource["service"]
                 if service_key not in service_risks:
                     service_risks[service_key] = {
                         "service": service_key,
@@ -2152,15 +4592,15 @@ async def get_provider_dashboard(
                     }
                 
                 service_risks[service_key]["total_users"] += 1
-                service_risks[service_key]["total_risk"] += analyzed_user.overall_risk_score
+                service_risks[service_key]["total_risk"] += provider_risk_score
                 
-                if resource.access_type == AccessType.ADMIN:
+                if resource["access_type"] == AccessType.ADMIN:
                     service_risks[service_key]["admin_users"] += 1
                 
-                if analyzed_user.overall_risk_score > 60:
+                if provider_risk_score > 60:
                     service_risks[service_key]["high_risk_users"].append({
-                        "user_email": user_access.user_email,
-                        "risk_score": analyzed_user.overall_risk_score
+                        "user_email": user_doc["user_email"],
+                        "risk_score": provider_risk_score
                     })
         
         # Calculate average risk per service
@@ -2213,9 +4653,7 @@ async def get_user_risk_analysis(
         if not user_doc:
             raise HTTPException(status_code=404, detail="User not found")
         
-        user_access = UserAccess(**user_doc)
-        analyzed_user = analyze_user_access(user_access)
-        risk_result = calculate_comprehensive_risk_score(analyzed_user)
+        user_access = ensure_risk_analysis(UserAccess(**user_doc))
         
         return {
             "user_email": user_email,
@@ -2223,14 +4661,15 @@ async def get_user_risk_analysis(
             "department": user_access.department,
             "job_title": user_access.job_title,
             "is_service_account": user_access.is_service_account,
-            "overall_risk_score": risk_result.overall_score,
-            "risk_level": risk_result.risk_level,
-            "confidence_score": risk_result.confidence_score,
-            "risk_factors": [rf.dict() for rf in risk_result.risk_factors],
-            "recommendations": risk_result.recommendations,
-            "cross_provider_admin": analyzed_user.cross_provider_admin,
-            "privilege_escalation_paths": [path.dict() for path in analyzed_user.privilege_escalation_paths],
-            "unused_privileges": analyzed_user.unused_privileges,
+            "overall_risk_score": user_access.overall_risk_score,
+            "risk_level": user_access.risk_level,
+            "confidence_score": user_access.risk_confidence_score,
+            "risk_factors": user_access.risk_factors,
+            "recommendations": user_access.risk_recommendations,
+            "cross_provider_admin": user_access.cross_provider_admin,
+            "privilege_escalation_paths": user_access.privilege_escalation_paths,
+            "unused_privileges": user_access.unused_privileges,
+            "risk_scored_at": user_access.risk_scored_at,
             "admin_access_count": sum(1 for r in user_access.resources if r.access_type == AccessType.ADMIN),
             "privileged_access_count": sum(1 for r in user_access.resources if r.is_privileged),
             "providers_with_access": list(set(r.provider for r in user_access.resources)),
@@ -2276,13 +4715,16 @@ async def delete_user_access(
         if not user_doc:
             raise HTTPException(status_code=404, detail="User access data not found")
         
-        user_access = UserAccess(**user_doc)
-        risk_score_before = analyze_user_access(user_access).overall_risk_score
+        user_access = ensure_risk_analysis(UserAccess(**user_doc))
+        risk_score_before = user_access.overall_risk_score
         
         # Delete user access data
         result = await db.user_access.delete_one({"user_email": user_email})
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="User access data not found")
+        await unindex_user_resources([user_email])
+        await apply_analytics_changes([user_access.dict()], [])
+        _graph_cache.pop(user_email, None)
         
         # Log audit event
         await log_audit_event(
@@ -2306,44 +4748,241 @@ async def delete_user_access(
         logging.error(f"Error deleting user access for {user_email}: {str(e)}")
         raise HTTPException(status_code=500, detail="Error deleting user access data")
 
+@api_router.post("/admin/rescore")
+async def rescore_user_access(
+    user_email: Optional[str] = Query(None, description="Rescore a single user instead of all users"),
+    current_admin: User = Depends(get_current_admin_user)
+):
+    """Recompute and persist the stored risk analysis (Admin only)"""
+    try:
+        query_filter = {"user_email": user_email} if user_email else {}
+        if user_email and not await db.user_access.find_one(query_filter, {"_id": 1}):
+            raise HTTPException(status_code=404, detail="User access data not found")
+        
+        rescored_users, changed_users = await rescore_user_access_documents(query_filter)
+        
+        await log_audit_event(
+            event_type="risk_rescore",
+            user_email=current_admin.email,
+            target_user=user_email,
+            action="rescore_user_access",
+            details={
+                "rescored_users": rescored_users,
+                "changed_users": changed_users
+            }
+        )
+        
+        return {
+            "status": "success",
+            "rescored_users": rescored_users,
+            "changed_users": changed_users
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error rescoring user access: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error rescoring user access data")
+
+@api_router.post("/admin/resource-index/rebuild")
+async def rebuild_resource_index_endpoint(current_admin: User = Depends(get_current_admin_user)):
+    """Rebuild the resource to holders index from user_access (Admin only)"""
+    try:
+        indexed_users = await rebuild_resource_index()
+        indexed_resources = await db.resource_index.count_documents({})
+        
+        await log_audit_event(
+            event_type="resource_index_rebuild",
+            user_email=current_admin.email,
+            action="rebuild_resource_index",
+            details={
+                "indexed_users": indexed_users,
+                "indexed_resources": indexed_resources
+            }
+        )
+        
+        return {
+            "status": "success",
+            "indexed_users": indexed_users,
+            "indexed_resources": indexed_resources
+        }
+    
+    except Exception as e:
+        logging.error(f"Error rebuilding resource index: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error rebuilding resource index")
+
+@api_router.post("/admin/analytics/rebuild")
+async def rebuild_analytics_summary_endpoint(current_admin: User = Depends(get_current_admin_user)):
+    """Rebuild the analytics summary from user_access and verify the maintained one (Admin only)"""
+    try:
+        rebuild = await rebuild_analytics_summary()
+        if rebuild is None:
+            raise HTTPException(
+                status_code=409,
+                detail="Analytics summary is being rebuilt or changing too quickly; try again later"
+            )
+        summary, differences = rebuild
+        
+        await log_audit_event(
+            event_type="analytics_summary_rebuild",
+            user_email=current_admin.email,
+            action="rebuild_analytics_summary",
+            details={
+                "total_users": summary["total_users"],
+                "verified": differences == {},
+                "mismatched_fields": sorted(differences or {})
+            }
+        )
+        
+        return {
+            "status": "success",
+            "total_users": summary["total_users"],
+            # None when there was no summary to verify
+            "verified": None if differences is None else not differences,
+            "differences": differences or {}
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error rebuilding analytics summary: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error rebuilding analytics summary")
+
+@api_router.get("/admin/principal-cache")
+async def get_principal_cache_stats(current_admin: User = Depends(get_current_admin_user)):
+    """Get this worker's authenticated-principal cache counters (Admin only)"""
+    lookups = principal_cache_stats["hits"] + principal_cache_stats["misses"]
+    return {
+        **principal_cache_stats,
+        "hit_rate": principal_cache_stats["hits"] / lookups if lookups else 0.0,
+        "entries": len(_principal_cache),
+        "max_entries": PRINCIPAL_CACHE_MAX_ENTRIES,
+        "ttl_seconds": PRINCIPAL_CACHE_TTL_SECONDS,
+        "worker_pid": os.getpid()
+    }
+
+@api_router.get("/admin/graph-cache")
+async def get_graph_cache_stats(current_admin: User = Depends(get_current_admin_user)):
+    """Get this worker's search graph cache counters (Admin only)"""
+    lookups = graph_cache_stats["hits"] + graph_cache_stats["misses"]
+    return {
+        **graph_cache_stats,
+        "hit_rate": graph_cache_stats["hits"] / lookups if lookups else 0.0,
+        "entries": len(_graph_cache),
+        "max_entries": GRAPH_CACHE_MAX_ENTRIES,
+        "worker_pid": os.getpid()
+    }
+
+@api_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(
+    scope: str = Query("all", description="all: summed across workers; worker: only the worker serving the scrape"),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """Request, scan, risk evaluation and cache metrics in the Prometheus text format (Admin or METRICS_TOKEN)"""
+    if not (METRICS_TOKEN and hmac.compare_digest(credentials.credentials, METRICS_TOKEN)):
+        await get_current_admin_user(await get_current_user(credentials))
+    if scope not in ("all", "worker"):
+        raise HTTPException(status_code=400, detail="scope must be all or worker")
+    
+    try:
+        if scope == "worker":
+            snapshots = [metrics_snapshot()]
+        else:
+            snapshots = await collect_worker_metrics()
+        return PlainTextResponse(
+            render_metrics(merge_metrics_snapshots(snapshots), len(snapshots)),
+            media_type="text/plain; version=0.0.4; charset=utf-8"
+        )
+    except Exception as e:
+        logging.error(f"Error rendering metrics: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error rendering metrics")
+
 @api_router.get("/audit-logs")
 async def get_audit_logs(
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=200),
     event_type: Optional[str] = Query(None),
+    target_user: Optional[str] = Query(None, description="Filter by the user an event was about"),
+    start_time: Optional[datetime] = Query(None, description="Only events at or after this time"),
+    end_time: Optional[datetime] = Query(None, description="Only events before this time"),
+    before: Optional[str] = Query(None, description="Cursor: events older than this position (next_cursor of a previous page)"),
+    after: Optional[str] = Query(None, description="Cursor: events newer than this position (prev_cursor of a previous page)"),
+    estimate_total: bool = Query(False, description="Use the collection's estimated count for the unfiltered total"),
     current_admin: User = Depends(get_current_admin_user)
 ):
     """Get audit logs (Admin only)"""
     try:
-        skip = (page - 1) * page_size
+        if before and after:
+            raise HTTPException(status_code=400, detail="Use either before or after, not both")
         
-        # Build query filter
+        # Build query filter; (event_type|target_user, timestamp, id) indexes serve it (init-mongo.js)
         query_filter = {}
         if event_type:
             query_filter["event_type"] = event_type
+        if target_user:
+            query_filter["target_user"] = target_user
+        if start_time or end_time:
+            query_filter["timestamp"] = {}
+            if start_time:
+                query_filter["timestamp"]["$gte"] = to_naive_utc(start_time)
+            if end_time:
+                query_filter["timestamp"]["$lt"] = to_naive_utc(end_time)
         
         # Get total count
-        total_logs = await db.audit_logs.count_documents(query_filter)
+        if estimate_total and not query_filter:
+            total_logs = await db.audit_logs.estimated_document_count()
+        elif before or after:
+            total_logs = None  # Cursor pages skip the count
+        else:
+            total_logs = await db.audit_logs.count_documents(query_filter)
+        
+        if before or after:
+            # Keyset pages: fetch one extra row to know whether the walk continues
+            page_filter = {"$and": [query_filter, audit_keyset_filter(before or after, older=bool(before))]}
+            direction = -1 if before else 1
+            logs = await db.audit_logs.find(page_filter)\
+                .sort([("timestamp", direction), ("id", direction)])\
+                .limit(page_size + 1)\
+                .to_list(page_size + 1)
+            has_more = len(logs) > page_size
+            logs = logs[:page_size]
+            if after:
+                logs.reverse()  # Pages are always newest first
+            has_next = has_more if before else True
+            has_prev = True if before else has_more
+        else:
+            skip = (page - 1) * page_size
+            
+            # Get paginated logs
+            logs = await db.audit_logs.find(query_filter)\
+                .sort([("timestamp", -1), ("id", -1)])\
+                .skip(skip)\
+                .limit(page_size)\
+                .to_list(page_size)
+            has_next = skip + page_size < total_logs if total_logs is not None else len(logs) == page_size
+            has_prev = page > 1
         
-        # Get paginated logs
-        logs = await db.audit_logs.find(query_filter)\
-            .sort("timestamp", -1)\
-            .skip(skip)\
-            .limit(page_size)\
-            .to_list(page_size)
+        pagination = {
+            "page_size": page_size,
+            "total_logs": total_logs,
+            "has_next": has_next,
+            "has_prev": has_prev,
+            "next_cursor": encode_audit_cursor(logs[-1]) if logs and has_next else None,
+            "prev_cursor": encode_audit_cursor(logs[0]) if logs and has_prev else None
+        }
+        if not (before or after):
+            pagination.update({
+                "page": page,
+                "total_pages": (total_logs + page_size - 1) // page_size
+            })
         
         return {
             "logs": [AuditEvent(**log).dict() for log in logs],
-            "pagination": {
-                "page": page,
-                "page_size": page_size,
-                "total_logs": total_logs,
-                "total_pages": (total_logs + page_size - 1) // page_size,
-                "has_next": skip + page_size < total_logs,
-                "has_prev": page > 1
-            }
+            "pagination": pagination
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error getting audit logs: {str(e)}")
         raise HTTPException(status_code=500, detail="Error retrieving audit logs")
@@ -2351,6 +4990,8 @@ async def get_audit_logs(
 # Include the router in the main app
 app.include_router(api_router)
 
+app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -2359,6 +5000,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so latency and response sizes cover compression and CORS too
+app.add_middleware(MetricsMiddleware)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -2389,7 +5033,7 @@ async def initialize_admin_users():
             if not existing_admin:
                 # Create admin user
                 admin_id = str(uuid.uuid4())
-                hashed_password = hash_password(admin_data["password"])
+                hashed_password = await hash_password_async(admin_data["password"])
                 
                 admin_user = User(
                     id=admin_id,
@@ -2419,17 +5063,96 @@ async def initialize_admin_users():
     except Exception as e:
         logging.error(f"Error creating admin users: {str(e)}")
 
+# Startup Maintenance
+# Backfills and rebuilds at startup must run in one gunicorn worker only. The worker that
+# claims the lock document runs them; the others start serving right away. The lock
+# expires after MAINTENANCE_LOCK_SECONDS so a worker that died holding it cannot block
+# later restarts.
+MAINTENANCE_LOCK_SECONDS = float(os.environ.get('MAINTENANCE_LOCK_SECONDS', '900'))
+
+async def acquire_maintenance_lock(name: str) -> bool:
+    """Claim a named lock for this worker unless another worker holds an unexpired one"""
+    now = datetime.utcnow()
+    try:
+        # _id is unique, so of concurrent upserts only one can create the lock
+        await db.maintenance_locks.find_one_and_update(
+            {"_id": name, "locked_until": {"$lt": now}},
+            {"$set": {
+                "holder": metrics_worker_id(),
+                "acquired_at": now,
+                "locked_until": now + timedelta(seconds=MAINTENANCE_LOCK_SECONDS)
+            }},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        return False
+    return True
+
+async def release_maintenance_lock(name: str):
+    await db.maintenance_locks.delete_one({"_id": name, "holder": metrics_worker_id()})
+
+async def run_startup_maintenance() -> bool:
+    """Backfill and rebuild derived data if this worker claims the lock; False if another worker has it"""
+    if not await acquire_maintenance_lock("startup_maintenance"):
+        return False
+    try:
+        # Store analyzed fields on documents imported before they were persisted
+        backfilled_users, _ = await rescore_user_access_documents({"resource_count": {"$exists": False}})
+        if backfilled_users:
+            logging.info(f"Stored risk analysis for {backfilled_users} existing users")
+        
+        # Add the search field to documents scored before it existed
+        await db.user_access.update_many(
+            {"user_email_lower": {"$exists": False}},
+            [{"$set": {"user_email_lower": {"$toLower": "$user_email"}}}]
+        )
+        
+        # Build the resource index for data imported before it existed
+        if await db.resource_index.estimated_document_count() == 0 and await db.user_access.estimated_document_count() > 0:
+            await rebuild_resource_index()
+        
+        # Build the analytics summary the first time; afterwards it is maintained incrementally
+        if await db.analytics_summary.count_documents({"id": ANALYTICS_SUMMARY_ID, "rebuilt_at": {"$exists": True}}) == 0:
+            await rebuild_analytics_summary()
+    finally:
+        await release_maintenance_lock("startup_maintenance")
+    return True
+
 # Application startup
 @app.on_event("startup")
 async def startup_event():
     """Initialize the application"""
+    global _token_revocation_task, _metrics_publish_task
     logging.info("Starting Cloud Access Visualizer API...")
     
+    # Start the buffered audit writer before anything logs events
+    await start_audit_writer()
+    
     # Initialize admin users
     await initialize_admin_users()
     
+    # Backfills and rebuilds run in one worker only, so their writes and analytics deltas apply once
+    await run_startup_maintenance()
+    
+    # Mirror token revocations for stateless JWT validation and the principal cache
+    if JWT_STATELESS_AUTH or PRINCIPAL_CACHE_TTL_SECONDS > 0:
+        await refresh_token_revocations()
+        _token_revocation_task = asyncio.create_task(token_revocation_refresh_loop())
+    
+    # Share this worker's metrics with the others for aggregated scrapes
+    _metrics_publish_task = asyncio.create_task(metrics_publish_loop())
+    
     logging.info("Cloud Access Visualizer API started successfully")
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    await stop_audit_writer()
+    if _token_revocation_task is not None:
+        _token_revocation_task.cancel()
+    if _metrics_publish_task is not None:
+        _metrics_publish_task.cancel()
+        await db.worker_metrics.delete_one({"worker": metrics_worker_id()})
+    client.close()
+    _password_executor.shutdown(wait=False)
+    if _import_executor is not None:
+        _import_executor.shutdown(wait=False, cancel_futures=True)
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""
+Shared fixtures for the backend tests.
+
+Tests run server.py against an in-memory MongoDB (mongomock-motor): `db` swaps a fresh
+database in for the module's and clears the per-worker caches, `client` and
+`admin_client` drive the app through its middleware stack, and `user_access_doc` builds
+analyzed user_access documents as imports store them.
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "cloud_access_visualizer_test")
+
+import server  # noqa: E402
+
+ADMIN = server.User(email="admin@company.com", hashed_password="", role=server.UserRole.ADMIN)
+DEFAULT_RESOURCES = [
+    {"provider": "aws", "service": "S3", "resource_type": "bucket", "resource_name": "logs", "access_type": "read"}
+]
+
+
+@pytest.fixture
+def db(monkeypatch):
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    database = mongomock_motor.AsyncMongoMockClient()["test"]
+    monkeypatch.setattr(server, "db", database)
+    monkeypatch.setattr(server, "IMPORT_WORKERS", 0)  # Score imports in a thread, no process pool
+    monkeypatch.setattr(server, "_token_revocations", {})
+    server._principal_cache.clear()
+    server._graph_cache.clear()
+    return database
+
+
+@pytest.fixture
+def client(db):
+    """Unauthenticated client"""
+    from fastapi.testclient import TestClient
+    return TestClient(server.app)
+
+
+@pytest.fixture
+def admin_client(client):
+    """Client whose requests are authenticated as an admin"""
+    server.app.dependency_overrides[server.get_current_user] = lambda: ADMIN
+    yield client
+    server.app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def user_access_doc():
+    """Build an analyzed user_access document for an email and its resources"""
+    def make(email: str, resources=None, **fields) -> dict:
+        return server.analyze_user_access(server.UserAccess(
+            user_email=email,
+            user_name=email.split("@")[0],
+            resources=DEFAULT_RESOURCES if resources is None else resources,
+            **fields
+        )).model_dump()
+    return make
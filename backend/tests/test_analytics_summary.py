@@ -0,0 +1,66 @@
+"""
+Analytics summary rebuilds (rebuild_analytics_summary) and /api/analytics.
+
+A rebuild must not overwrite deltas applied while it scans, only one runs at a time, and
+/analytics never rebuilds inline.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import server
+
+
+async def import_user(db, user_access_doc, email: str):
+    """Store a user and apply its analytics delta, as an import does"""
+    doc = user_access_doc(email)
+    await db.user_access.insert_one(dict(doc))
+    await server.apply_analytics_changes([], [doc])
+
+
+async def stored_summary(db) -> dict:
+    return await db.analytics_summary.find_one({"id": server.ANALYTICS_SUMMARY_ID}, {"_id": 0})
+
+
+def test_analytics_without_summary_is_unavailable(admin_client, db, user_access_doc):
+    asyncio.run(import_user(db, user_access_doc, "alice@company.com"))
+    response = admin_client.get("/api/analytics")
+    assert response.status_code == 503
+    assert response.headers["retry-after"]
+    assert "rebuilt_at" not in asyncio.run(stored_summary(db))  # Not rebuilt inline
+
+    assert admin_client.post("/api/admin/analytics/rebuild").json()["verified"] is None
+    assert admin_client.get("/api/analytics").json()["total_users"] == 1
+
+
+def test_rebuild_keeps_deltas_applied_during_its_scan(db, user_access_doc, monkeypatch):
+    compute = server.compute_analytics_summary
+    imports_during_scan = []
+
+    async def compute_then_import():
+        summary = await compute()
+        while imports_during_scan:
+            await import_user(db, user_access_doc, imports_during_scan.pop())
+        return summary
+    monkeypatch.setattr(server, "compute_analytics_summary", compute_then_import)
+
+    async def run():
+        await import_user(db, user_access_doc, "alice@company.com")
+        await server.rebuild_analytics_summary()
+        assert (await stored_summary(db))["total_users"] == 1
+
+        # The first scan misses bob; replacing it would drop his delta, so the rebuild retries
+        imports_during_scan.append("bob@company.com")
+        summary, differences = await server.rebuild_analytics_summary()
+        assert summary["total_users"] == 2 and differences == {}
+        assert (await stored_summary(db))["total_users"] == 2
+    asyncio.run(run())
+
+
+def test_rebuild_waits_for_another_workers_rebuild(admin_client, db):
+    asyncio.run(db.maintenance_locks.insert_one({
+        "_id": "analytics_summary_rebuild", "holder": "other-host:1",
+        "locked_until": datetime.utcnow() + timedelta(minutes=5)
+    }))
+    assert asyncio.run(server.rebuild_analytics_summary()) is None
+    assert admin_client.post("/api/admin/analytics/rebuild").status_code == 409
+    assert asyncio.run(stored_summary(db)) is None
@@ -0,0 +1,73 @@
+"""
+/api/audit-logs keyset cursors.
+
+next_cursor (before) walks to older events and prev_cursor (after) back to newer ones;
+pages are always newest first, and events sharing a timestamp are ordered by id.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import server
+
+START = datetime(2026, 1, 1)
+
+
+def seed_events(db, count: int = 11):
+    # Pairs of events share a timestamp, so the id tiebreak matters
+    asyncio.run(db.audit_logs.insert_many([
+        server.AuditEvent(
+            event_type="login" if i % 3 else "user_update",
+            user_email="admin@company.com",
+            action=f"action-{i:02d}",
+            details={},
+            timestamp=START + timedelta(minutes=i // 2)
+        ).dict()
+        for i in range(count)
+    ]))
+
+
+def get_logs(admin_client, **params) -> dict:
+    response = admin_client.get("/api/audit-logs", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_cursors_walk_every_event_in_both_directions(admin_client, db):
+    seed_events(db)
+    expected = [log["id"] for log in get_logs(admin_client, page_size=200)["logs"]]
+    assert len(expected) == 11
+
+    pages, params = [], {"page_size": 4}
+    while True:
+        body = get_logs(admin_client, **params)
+        pages.append([log["id"] for log in body["logs"]])
+        if not body["pagination"]["next_cursor"]:
+            break
+        params = {"page_size": 4, "before": body["pagination"]["next_cursor"]}
+    assert [log_id for page in pages for log_id in page] == expected
+
+    # From the last page back to the first through prev_cursor
+    body = get_logs(admin_client, page_size=4, before=params["before"])
+    for page in reversed(pages[:-1]):
+        body = get_logs(admin_client, page_size=4, after=body["pagination"]["prev_cursor"])
+        assert [log["id"] for log in body["logs"]] == page
+    assert body["pagination"]["has_prev"] is False
+
+
+def test_cursor_pages_keep_the_filters(admin_client, db):
+    seed_events(db)
+    params = {"event_type": "login", "start_time": (START + timedelta(minutes=1)).isoformat(), "page_size": 2}
+    expected = [log["id"] for log in get_logs(admin_client, **{**params, "page_size": 200})["logs"]]
+
+    first = get_logs(admin_client, **params)
+    second = get_logs(admin_client, **params, before=first["pagination"]["next_cursor"])
+    assert [log["id"] for log in first["logs"] + second["logs"]] == expected[:4]
+    assert all(log["event_type"] == "login" for log in second["logs"])
+    assert second["pagination"]["total_logs"] is None
+
+
+def test_invalid_cursor_requests_are_rejected(admin_client, db):
+    seed_events(db)
+    cursor = get_logs(admin_client, page_size=2)["pagination"]["next_cursor"]
+    assert admin_client.get("/api/audit-logs", params={"before": cursor, "after": cursor}).status_code == 400
+    assert admin_client.get("/api/audit-logs", params={"before": "not-a-cursor"}).status_code == 400
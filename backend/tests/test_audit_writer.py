@@ -0,0 +1,82 @@
+"""
+Buffered audit writer.
+
+Events are queued and written with insert_many in batches; events that do not fit in the
+queue or fail to write go to the spill file, which the next start replays into audit_logs.
+"""
+import asyncio
+
+import pytest
+
+import server
+
+
+@pytest.fixture(autouse=True)
+def audit_settings(db, monkeypatch, tmp_path):
+    monkeypatch.setattr(server, "AUDIT_SPILL_PATH", tmp_path / "audit-spill.ndjson")
+    monkeypatch.setattr(server, "AUDIT_BATCH_SIZE", 2)
+    monkeypatch.setattr(server, "_audit_queue", None)
+    monkeypatch.setattr(server, "_audit_writer_task", None)
+
+
+async def log_events(count: int, start: int = 0):
+    for i in range(start, start + count):
+        await server.log_audit_event(event_type="test", user_email="admin@company.com", action=f"action-{i}", details={})
+
+
+async def logged_actions(db) -> list:
+    return sorted([event["action"] async for event in db.audit_logs.find({}, {"_id": 0, "action": 1})])
+
+
+def test_queued_events_are_written_in_batches(db, monkeypatch):
+    collection_type = type(db.audit_logs)
+    insert_many = collection_type.insert_many
+    batch_sizes = []
+
+    async def counting_insert_many(collection, documents, **kwargs):
+        batch_sizes.append(len(documents))
+        return await insert_many(collection, documents, **kwargs)
+    monkeypatch.setattr(collection_type, "insert_many", counting_insert_many)
+
+    async def run():
+        await server.start_audit_writer()
+        await log_events(5)
+        await server.stop_audit_writer()
+        assert await logged_actions(db) == [f"action-{i}" for i in range(5)]
+    asyncio.run(run())
+    assert sum(batch_sizes) == 5 and max(batch_sizes) <= 2
+
+
+def test_overflow_is_spilled_and_replayed(db, monkeypatch):
+    monkeypatch.setattr(server, "AUDIT_QUEUE_SIZE", 1)
+
+    async def run():
+        await server.start_audit_writer()
+        await log_events(3)  # The writer gets no chance to drain: one is queued, two spill
+        await server.stop_audit_writer()
+        assert await logged_actions(db) == ["action-0"]
+        assert len(server.AUDIT_SPILL_PATH.read_text().splitlines()) == 2
+
+        await server.start_audit_writer()
+        await server.stop_audit_writer()
+        assert await logged_actions(db) == ["action-0", "action-1", "action-2"]
+        assert not server.AUDIT_SPILL_PATH.exists()
+    asyncio.run(run())
+
+
+def test_failed_writes_are_spilled(db, monkeypatch):
+    collection_type = type(db.audit_logs)
+    insert_many = collection_type.insert_many
+
+    async def failing_insert_many(collection, documents, **kwargs):
+        raise ConnectionError("MongoDB unavailable")
+
+    async def run():
+        monkeypatch.setattr(collection_type, "insert_many", failing_insert_many)
+        await log_events(2)  # Writer not running: written straight through
+        assert len(server.AUDIT_SPILL_PATH.read_text().splitlines()) == 2
+
+        monkeypatch.setattr(collection_type, "insert_many", insert_many)
+        await server.replay_spilled_audit_events()
+        assert await logged_actions(db) == ["action-0", "action-1"]
+    asyncio.run(run())
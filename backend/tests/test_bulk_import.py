@@ -0,0 +1,54 @@
+"""
+JSON imports saved with unordered bulk upserts (process_json_import).
+
+New users are inserted and known ones replaced, batch by batch; grants a re-import still
+contains keep their resource ids, and the analytics summary follows the changes.
+"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+def user(email: str, *names: str) -> dict:
+    return {
+        "user_email": email,
+        "user_name": email.split("@")[0],
+        "resources": [
+            {"provider": "aws", "service": "S3", "resource_type": "bucket", "resource_name": name, "access_type": "read"}
+            for name in names
+        ]
+    }
+
+
+def test_reimport_updates_users_and_keeps_grant_ids(db):
+    async def run():
+        first = await server.process_json_import({"users": [user("alice@company.com", "logs", "data"), user("bob@company.com", "logs")]}, batch_size=1)
+        assert (first["inserted_users"], first["updated_users"], len(first["batches"])) == (2, 0, 2)
+        await server.rebuild_analytics_summary()
+        before = await db.user_access.find_one({"user_email": "alice@company.com"})
+        ids = {r["resource_name"]: r["id"] for r in before["resources"]}
+
+        second = await server.process_json_import({"users": [user("alice@company.com", "logs", "archive"), user("carol@company.com", "logs")]}, batch_size=2)
+        assert (second["inserted_users"], second["updated_users"], second["failed_users"]) == (1, 1, 0)
+
+        after = await db.user_access.find_one({"user_email": "alice@company.com"})
+        after_ids = {r["resource_name"]: r["id"] for r in after["resources"]}
+        assert after_ids["logs"] == ids["logs"]
+        assert after_ids["archive"] not in ids.values()
+        assert await db.user_access.count_documents({}) == 3
+
+        stored = await db.analytics_summary.find_one({"id": server.ANALYTICS_SUMMARY_ID}, {"_id": 0})
+        assert server.compare_analytics_summaries(stored, await server.compute_analytics_summary()) == {}
+    asyncio.run(run())
+
+
+def test_invalid_user_aborts_the_import(db):
+    async def run():
+        with pytest.raises(HTTPException) as error:
+            await server.process_json_import({"users": [user("alice@company.com", "logs"), {"user_email": "broken"}]})
+        assert error.value.status_code == 400
+        assert await db.user_access.count_documents({}) == 0
+    asyncio.run(run())
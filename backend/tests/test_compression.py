@@ -0,0 +1,93 @@
+"""
+Response compression (CompressionMiddleware).
+
+JSON and text bodies of at least minimum_size bytes are compressed with brotli or gzip as
+the client prefers; strong ETags become weak, and streamed bodies stay streamed.
+"""
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+import server
+
+LARGE = {"users": [{"user_email": f"user{i}@company.com", "risk_score": i} for i in range(200)]}
+
+
+@pytest.fixture
+def compressed_client():
+    app = FastAPI()
+
+    @app.get("/large")
+    def large():
+        return Response(
+            json.dumps(LARGE), media_type="application/json",
+            headers={"ETag": '"v1"', "Server-Timing": "mongo;dur=1.0"}
+        )
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/binary")
+    def binary():
+        return Response(b"\0" * 4096, media_type="application/octet-stream")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((f"line {i}\n" * 50 for i in range(20)), media_type="application/x-ndjson")
+
+    app.add_middleware(server.CompressionMiddleware, minimum_size=1024)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("accept_encoding, encoding", [
+    ("gzip, deflate, br", "br"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("gzip;q=0, *", "br"),
+    ("*;q=0.2, br;q=0", "gzip"),
+    ("identity", None),
+    ("", None)
+])
+def test_negotiate_encoding(accept_encoding, encoding):
+    assert server.negotiate_encoding(accept_encoding) == encoding
+
+
+@pytest.mark.parametrize("encoding", ["br", "gzip"])
+def test_large_json_is_compressed(compressed_client, encoding):
+    response = compressed_client.get("/large", headers={"Accept-Encoding": encoding})
+    assert response.headers["content-encoding"] == encoding
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) < len(json.dumps(LARGE))
+    assert response.json() == LARGE  # Decoded by the client
+    assert response.headers["etag"] == 'W/"v1"'
+    assert response.headers["server-timing"].startswith("mongo;dur=1.0, compress;dur=")
+
+
+@pytest.mark.parametrize("path, headers", [
+    ("/small", {"Accept-Encoding": "br"}),
+    ("/binary", {"Accept-Encoding": "br"}),
+    ("/large", {"Accept-Encoding": "identity"})
+])
+def test_uncompressed_responses(compressed_client, path, headers):
+    response = compressed_client.get(path, headers=headers)
+    assert "content-encoding" not in response.headers
+    if path == "/large":
+        assert response.headers["etag"] == '"v1"'
+
+
+def test_streamed_body_is_compressed_without_a_length(compressed_client):
+    response = compressed_client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text == "".join(f"line {i}\n" * 50 for i in range(20))
+
+
+def test_minimum_size_zero_disables_compression():
+    app = FastAPI()
+    app.add_api_route("/text", lambda: PlainTextResponse("x" * 4096))
+    app.add_middleware(server.CompressionMiddleware, minimum_size=0)
+    response = TestClient(app).get("/text", headers={"Accept-Encoding": "br"})
+    assert "content-encoding" not in response.headers
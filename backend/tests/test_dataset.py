@@ -0,0 +1,41 @@
+"""
+Synthetic tenants (benchmarks/dataset.py).
+
+The same users, seed and as-of date always write the same file, and every generated
+user imports as a valid UserAccess document.
+"""
+import json
+from datetime import datetime, timezone
+
+from benchmarks import dataset
+
+import server
+
+AS_OF = datetime(2026, 1, 1)
+
+
+def test_same_arguments_write_the_same_file(tmp_path):
+    first, second, other_seed = tmp_path / "first.json", tmp_path / "second.json", tmp_path / "other.json"
+    grants = dataset.write_dataset(first, 1000, 42, AS_OF)
+    assert dataset.write_dataset(second, 1000, 42, AS_OF) == grants
+    dataset.write_dataset(other_seed, 1000, 7, AS_OF)
+
+    assert first.read_bytes() == second.read_bytes()
+    assert first.read_bytes() != other_seed.read_bytes()
+
+
+def test_generated_users_are_valid_imports(tmp_path):
+    output = tmp_path / "tenant.json"
+    grants = dataset.write_dataset(output, 1000, 42, AS_OF)
+    content = json.loads(output.read_text(encoding="utf-8"))
+
+    assert content["metadata"]["generator"] == {"users": 1000, "seed": 42, "as_of": "2026-01-01"}
+    users = [server.UserAccess(**user) for user in content["users"]]
+    assert len({user.user_email for user in users}) == 1000
+    assert sum(len(user.resources) for user in users) == sum(grants.values())
+    assert all(count for count in grants.values())  # Every provider is represented
+
+    last_used = [resource.last_used for user in users for resource in user.resources]
+    assert None in last_used
+    assert all(used is None or used <= AS_OF.replace(tzinfo=timezone.utc) for used in last_used)
+    assert 0 < sum(user.is_service_account for user in users) < 200
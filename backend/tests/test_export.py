@@ -0,0 +1,37 @@
+"""
+/api/export/{format} requires an authenticated user and streams rows for one; xlsx,
+built in memory, is capped at EXPORT_XLSX_MAX_ROWS rows.
+"""
+import asyncio
+
+import pytest
+
+import server
+
+
+@pytest.fixture(autouse=True)
+def seed(db, user_access_doc):
+    asyncio.run(db.user_access.insert_one(user_access_doc("alice@company.com")))
+
+
+@pytest.mark.parametrize("format", ["csv", "ndjson", "json", "xlsx"])
+def test_export_requires_authentication(client, format):
+    response = client.get(f"/api/export/{format}")
+    assert response.status_code in (401, 403)
+
+
+def test_authenticated_export_streams_rows(admin_client):
+    response = admin_client.get("/api/export/ndjson")
+    assert response.status_code == 200
+    assert b"alice@company.com" in response.content
+
+
+def test_xlsx_export_is_capped(admin_client, db, user_access_doc, monkeypatch):
+    assert admin_client.get("/api/export/xlsx").status_code == 200
+
+    asyncio.run(db.user_access.insert_one(user_access_doc("bob@company.com")))
+    monkeypatch.setattr(server, "EXPORT_XLSX_MAX_ROWS", 1)
+    response = admin_client.get("/api/export/xlsx")
+    assert response.status_code == 400
+    assert "csv" in response.json()["detail"]
+    assert admin_client.get("/api/export/csv").status_code == 200
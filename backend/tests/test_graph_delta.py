@@ -0,0 +1,87 @@
+"""
+/api/search/{email}/delta: routing next to the resource search and the graph diff.
+"""
+import asyncio
+
+import pytest
+from starlette.routing import Match
+
+import server
+
+EMAIL = "alice@company.com"
+
+
+def matched_route(path: str) -> str:
+    scope = {"type": "http", "method": "GET", "path": path, "root_path": ""}
+    for route in server.app.router.routes:
+        if route.matches(scope)[0] == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+@pytest.mark.parametrize("path, route", [
+    ("/api/search/resource/delta", "/api/search/resource/{resource_name}"),
+    ("/api/search/resource/prod-bucket", "/api/search/resource/{resource_name}"),
+    (f"/api/search/{EMAIL}/delta", "/api/search/{user_email}/delta"),
+    (f"/api/search/{EMAIL}", "/api/search/{user_email}")
+])
+def test_search_routes_do_not_overlap(path, route):
+    assert matched_route(path) == route
+
+
+def test_resource_named_delta_is_searchable(admin_client, db, user_access_doc):
+    asyncio.run(db.user_access.insert_one(user_access_doc(EMAIL, [
+        {"provider": "aws", "service": "S3", "resource_type": "bucket", "resource_name": "delta", "access_type": "read"}
+    ])))
+    asyncio.run(server.rebuild_resource_index())
+    response = admin_client.get("/api/search/resource/delta")
+    assert response.status_code == 200
+    assert response.json()[0]["users_with_access"] == [EMAIL]
+
+
+RESOURCES = [
+    {"provider": "aws", "service": "S3", "resource_type": "bucket", "resource_name": "logs", "access_type": "read"},
+    {"provider": "aws", "service": "EC2", "resource_type": "instance", "resource_name": "web", "access_type": "read"},
+    {"provider": "gcp", "service": "BigQuery", "resource_type": "dataset", "resource_name": "sales", "access_type": "read"}
+]
+
+
+def test_delta_reports_added_changed_and_removed_items(admin_client, db, user_access_doc):
+    doc = user_access_doc(EMAIL, RESOURCES)
+    asyncio.run(db.user_access.insert_one(doc))
+    etag = admin_client.get(f"/api/search/{EMAIL}").headers["etag"]
+
+    logs, web, sales = doc["resources"]
+    logs["access_type"] = "write"
+    okta = server.CloudResource(
+        provider="okta", service="Okta", resource_type="application", resource_name="hr", access_type="user"
+    ).model_dump()
+    asyncio.run(db.user_access.update_one({"user_email": EMAIL}, {"$set": {"resources": [logs, sales, okta]}}))
+
+    delta = admin_client.get(f"/api/search/{EMAIL}/delta", params={"since": etag}).json()
+    assert not delta["full"]
+    assert delta["since"] == etag.removeprefix("W/").strip('"')
+    assert f"resource-{okta['id']}" in {node["id"] for node in delta["added_nodes"]}
+    assert f"resource-{web['id']}" in delta["removed_node_ids"]
+    assert f"edge-S3-{logs['id']}" in {edge["id"] for edge in delta["changed_edges"]}
+    assert f"edge-BigQuery-{sales['id']}" not in {edge["id"] for edge in delta["changed_edges"]}
+
+    current = admin_client.get(f"/api/search/{EMAIL}").headers["etag"]
+    unchanged = admin_client.get(f"/api/search/{EMAIL}/delta", params={"since": current}).json()
+    assert unchanged["added_nodes"] == unchanged["changed_edges"] == unchanged["removed_node_ids"] == []
+
+
+def test_delta_reuses_the_cached_search_graph(admin_client, db, user_access_doc, monkeypatch):
+    asyncio.run(db.user_access.insert_one(user_access_doc(EMAIL, RESOURCES)))
+    search = admin_client.get(f"/api/search/{EMAIL}").json()
+    assert asyncio.run(db.graph_versions.count_documents({})) == 1
+
+    def rebuild(user_access):
+        raise AssertionError("graph rebuilt despite a cached response")
+    monkeypatch.setattr(server, "generate_graph_data", rebuild)
+    monkeypatch.setattr(server, "record_graph_version", rebuild)
+
+    delta = admin_client.get(f"/api/search/{EMAIL}/delta", params={"since": "unknown"}).json()
+    assert delta["full"]
+    assert delta["graph"] == search["graph_data"]
+    assert asyncio.run(db.graph_versions.count_documents({})) == 1
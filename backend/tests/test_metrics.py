@@ -0,0 +1,88 @@
+"""
+/api/metrics (Prometheus text format).
+
+Requests are labelled by route template, scans by route and operation; the default scope
+sums the snapshots other workers published, and scrapers may use METRICS_TOKEN.
+"""
+import asyncio
+from datetime import datetime
+
+import pytest
+
+import server
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics(db, monkeypatch):
+    monkeypatch.setattr(server, "_metric_values", {})
+    monkeypatch.setattr(server, "_metric_histograms", {})
+    monkeypatch.setattr(server, "METRICS_TOKEN", "scrape-secret")
+
+
+SCRAPER = {"Authorization": "Bearer scrape-secret"}
+
+
+def bearer(db, role: server.UserRole) -> dict:
+    """Authorization header of a stored user with the role"""
+    user = server.User(email=f"{role.value}@company.com", hashed_password="not-used", role=role)
+    asyncio.run(db.users.insert_one(user.model_dump()))
+    return {"Authorization": f"Bearer {server.create_access_token(data=server.build_token_claims(user))}"}
+
+
+def sample(text: str, series: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{series} not in metrics")
+
+
+def test_requests_are_labelled_by_route_template(admin_client, db, user_access_doc):
+    asyncio.run(db.user_access.insert_one(user_access_doc("alice@company.com")))
+    for _ in range(2):
+        assert admin_client.get("/api/search/alice@company.com").status_code == 200
+    admin_client.get("/api/users/paginated")
+
+    text = admin_client.get("/api/metrics", params={"scope": "worker"}, headers=SCRAPER).text
+    route = 'method="GET",route="/api/search/{user_email}"'
+    assert sample(text, f'cloud_access_http_requests_total{{{route},status="200"}}') == 2
+    assert sample(text, f'cloud_access_http_request_duration_seconds_count{{{route}}}') == 2
+    assert sample(text, f'cloud_access_http_request_duration_seconds_bucket{{{route},le="+Inf"}}') == 2
+    assert sample(text, 'cloud_access_documents_scanned_total{route="/api/users/paginated",operation="paginated_users"}') == 1
+    assert "alice@company.com" not in text
+
+
+def test_default_scope_sums_other_workers(admin_client, db):
+    other = {"values": {"cache_hits_total": [[["graph"], 5]]}, "histograms": {}}
+    asyncio.run(db.worker_metrics.insert_many([
+        {"worker": "other-host:1", "snapshot": other, "updated_at": datetime.utcnow()},
+        {"worker": "dead-host:1", "snapshot": other, "updated_at": datetime(2020, 1, 1)}
+    ]))
+    hits = server.graph_cache_stats["hits"]
+
+    all_workers = admin_client.get("/api/metrics", headers=SCRAPER).text
+    assert sample(all_workers, "cloud_access_metrics_workers") == 2
+    assert sample(all_workers, 'cloud_access_cache_hits_total{cache="graph"}') == hits + 5
+    worker = admin_client.get("/api/metrics", params={"scope": "worker"}, headers=SCRAPER).text
+    assert sample(worker, 'cloud_access_cache_hits_total{cache="graph"}') == hits
+
+
+def test_metrics_need_the_token_or_an_admin(client, db):
+    assert client.get("/api/metrics", headers=SCRAPER).status_code == 200
+    assert client.get("/api/metrics", headers=bearer(db, server.UserRole.ADMIN)).status_code == 200
+    assert client.get("/api/metrics", headers=bearer(db, server.UserRole.USER)).status_code == 403
+    assert client.get("/api/metrics").status_code == 403
+
+
+def test_histograms_count_observations_beyond_the_last_bucket():
+    labels = ("GET", "/api/export")
+    server.observe_metric("http_request_duration_seconds", labels, 0.001)
+    server.observe_metric("http_request_duration_seconds", labels, 60.0)
+    snapshot = server.merge_metrics_snapshots([server.metrics_snapshot(), server.metrics_snapshot()])
+
+    text = server.render_metrics(snapshot, 2)
+    series = 'method="GET",route="/api/export"'
+    assert sample(text, f'cloud_access_http_request_duration_seconds_bucket{{{series},le="0.005"}}') == 2
+    assert sample(text, f'cloud_access_http_request_duration_seconds_bucket{{{series},le="30.0"}}') == 2
+    assert sample(text, f'cloud_access_http_request_duration_seconds_bucket{{{series},le="+Inf"}}') == 4
+    assert sample(text, f'cloud_access_http_request_duration_seconds_sum{{{series}}}') == 120.002
+    assert sample(text, f'cloud_access_http_request_duration_seconds_count{{{series}}}') == 4
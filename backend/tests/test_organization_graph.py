@@ -0,0 +1,77 @@
+"""
+/api/graph/organization: the org-wide graph aggregated in MongoDB.
+
+Node counts match the stored grants, only the requested level is pruned to max_nodes,
+and the riskiest users link to the nodes they hold.
+"""
+import asyncio
+
+import bson
+
+import server
+
+GRANTS = {
+    "alice@company.com": [("aws", "IAM", "admin", "admin"), ("aws", "S3", "logs", "read"), ("gcp", "BigQuery", "sales", "write")],
+    "bob@company.com": [("aws", "S3", "logs", "write"), ("aws", "S3", "backups", "read")],
+    "carol@company.com": [("gcp", "BigQuery", "sales", "read")]
+}
+
+
+def seed(db, user_access_doc):
+    # Round trip through BSON so enum fields are stored as strings, as MongoDB stores them
+    asyncio.run(db.user_access.insert_many([
+        bson.decode(bson.encode(user_access_doc(email, [
+            {"provider": provider, "service": service, "resource_type": "resource", "resource_name": name,
+             "access_type": access, "is_privileged": access == "admin"}
+            for provider, service, name, access in grants
+        ])))
+        for email, grants in GRANTS.items()
+    ]))
+
+
+def nodes_by_id(graph: dict) -> dict:
+    return {node["id"]: node for node in graph["nodes"]}
+
+
+def test_provider_level_counts_users_and_grants(admin_client, db, user_access_doc):
+    seed(db, user_access_doc)
+    graph = admin_client.get("/api/graph/organization", params={"top_users": 2}).json()
+    nodes = nodes_by_id(graph)
+
+    assert (nodes["provider-aws"]["user_count"], nodes["provider-aws"]["grant_count"]) == (2, 4)
+    assert (nodes["provider-gcp"]["user_count"], nodes["provider-gcp"]["grant_count"]) == (2, 2)
+    assert nodes["provider-aws"]["privileged_count"] == 1
+    assert graph["total_users"] == 3 and graph["shown_users"] == 2 and graph["truncated"]
+
+    shown = [node for node in graph["nodes"] if node["type"] == "user"]
+    assert shown[0]["id"] == "user-alice@company.com"  # Riskiest first
+    alice_edges = {edge["target"]: edge["weight"] for edge in graph["edges"] if edge["source"] == "user-alice@company.com"}
+    assert alice_edges == {"provider-aws": 2, "provider-gcp": 1}
+
+
+def test_only_the_requested_level_is_pruned(admin_client, db, user_access_doc):
+    seed(db, user_access_doc)
+    graph = admin_client.get("/api/graph/organization", params={"level": "service", "max_nodes": 1, "top_users": 0}).json()
+    nodes = nodes_by_id(graph)
+
+    assert {"provider-aws", "provider-gcp"} <= set(nodes)
+    assert [node_id for node_id in nodes if node_id.startswith("service-")] == ["service-aws-s3"]  # Ties on risk, most grants
+    assert graph["total_level_nodes"] == 3 and graph["truncated"]
+    assert {(edge["source"], edge["target"]) for edge in graph["edges"]} == {("provider-aws", "service-aws-s3")}
+
+
+def test_resource_level_is_scoped_to_a_service(admin_client, db, user_access_doc):
+    seed(db, user_access_doc)
+    assert admin_client.get("/api/graph/organization", params={"level": "resource"}).status_code == 400
+
+    graph = admin_client.get(
+        "/api/graph/organization", params={"level": "resource", "provider": "aws", "service": "S3"}
+    ).json()
+    nodes = nodes_by_id(graph)
+    assert set(nodes) == {
+        "provider-aws", "service-aws-s3", "resource-aws-s3-logs", "resource-aws-s3-backups",
+        "user-alice@company.com", "user-bob@company.com"
+    }
+    assert (nodes["resource-aws-s3-logs"]["user_count"], nodes["resource-aws-s3-logs"]["grant_count"]) == (2, 2)
+    assert nodes["user-alice@company.com"]["grant_count"] == 1  # Grants outside the subtree are not counted
+    assert graph["total_users"] == 2 and not graph["truncated"]
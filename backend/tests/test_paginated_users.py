@@ -0,0 +1,108 @@
+"""
+/api/users/paginated: keyset cursors and email search.
+
+Following next_cursor visits every matching row once, in the same order as page numbers,
+including rows that tie on the sort field. Search is a case-insensitive substring match on the stored user_email_lower field, as it
+was when rows were filtered in Python.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import orjson
+import pytest
+
+import server
+
+EMAILS = ["Alice.Admin@Company.com", "alina@company.com", "bob@company.com", "mallory.alice@company.com"]
+
+
+async def seed(db):
+    await db.user_access.insert_many([
+        server.analyze_user_access(server.UserAccess(
+            user_email=email,
+            user_name=email.split("@")[0],
+            resources=[{"provider": "aws", "service": "S3", "resource_type": "bucket", "resource_name": "logs", "access_type": "read"}]
+        )).model_dump()
+        for email in EMAILS
+    ])
+
+
+async def search(search_text: str) -> list:
+    response = await server.get_users_paginated(
+        page=1, page_size=50, search=search_text, provider=None, risk_level=None,
+        sort_by="user_email", sort_order="asc", cursor=None, debug_timing=False, current_user=None
+    )
+    return [row["user_email"] for row in orjson.loads(response.body)["users"]]
+
+
+def test_search_is_a_case_insensitive_substring_match(db):
+    async def run():
+        await seed(db)
+        assert await search("ALI") == ["Alice.Admin@Company.com", "alina@company.com", "mallory.alice@company.com"]
+        assert await search("alice.") == ["Alice.Admin@Company.com"]
+        assert await search("company") == EMAILS
+        assert await search("smith") == []
+    asyncio.run(run())
+
+
+def test_search_escapes_regex_characters(db):
+    async def run():
+        await seed(db)
+        assert await search("e.a") == ["Alice.Admin@Company.com"]
+        assert await search("a.i") == []
+        assert await search(".*") == []
+    asyncio.run(run())
+
+
+CURSOR_RESOURCES = [
+    [{"provider": "aws", "service": "S3", "resource_type": "bucket", "resource_name": "logs", "access_type": "read"}],
+    [{"provider": "aws", "service": "IAM", "resource_type": "role", "resource_name": "admin", "access_type": "admin"}],
+    [{"provider": "gcp", "service": "BigQuery", "resource_type": "dataset", "resource_name": "sales", "access_type": "write"}]
+]
+
+
+async def seed_for_cursors(db, user_access_doc, users: int = 13):
+    """Users whose risk scores and resource counts tie in groups, with distinct timestamps"""
+    start = datetime(2026, 1, 1)
+    await db.user_access.insert_many([
+        {**user_access_doc(f"user{i:02d}@company.com", CURSOR_RESOURCES[i % 3]), "last_updated": start + timedelta(hours=i)}
+        for i in range(users)
+    ])
+
+
+def walk_cursors(admin_client, **params) -> list:
+    emails, cursor = [], None
+    while True:
+        response = admin_client.get("/api/users/paginated", params={**params, "page_size": 4, "cursor": cursor})
+        assert response.status_code == 200
+        body = response.json()
+        emails.extend(row["user_email"] for row in body["users"])
+        cursor = body["pagination"]["next_cursor"]
+        if cursor is None:
+            return emails
+
+
+@pytest.mark.parametrize("params", [
+    {"sort_by": "risk_score", "sort_order": "desc"},
+    {"sort_by": "risk_score", "sort_order": "asc"},
+    {"sort_by": "total_resources", "sort_order": "desc", "provider": "aws"},
+    {"sort_by": "last_updated", "sort_order": "desc"},
+    {"sort_by": "user_email", "sort_order": "asc", "search": "@COMPANY"}
+])
+def test_cursors_visit_every_row_in_page_order(admin_client, db, user_access_doc, params):
+    asyncio.run(seed_for_cursors(db, user_access_doc))
+    first_page = admin_client.get("/api/users/paginated", params={**params, "page_size": 500}).json()
+    expected = [row["user_email"] for row in first_page["users"]]
+    assert expected and first_page["pagination"]["next_cursor"] is None
+
+    assert walk_cursors(admin_client, **params) == expected
+
+
+def test_cursor_must_match_the_sort(admin_client, db, user_access_doc):
+    asyncio.run(seed_for_cursors(db, user_access_doc))
+    page = admin_client.get("/api/users/paginated", params={"sort_by": "risk_score", "page_size": 4}).json()
+    cursor = page["pagination"]["next_cursor"]
+
+    mismatched = admin_client.get("/api/users/paginated", params={"sort_by": "user_email", "cursor": cursor})
+    assert mismatched.status_code == 400
+    assert admin_client.get("/api/users/paginated", params={"cursor": "not-a-cursor"}).status_code == 400
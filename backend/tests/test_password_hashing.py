@@ -0,0 +1,43 @@
+"""
+Password hashing in the bcrypt thread pool.
+
+Hashes use BCRYPT_ROUNDS; a login with a hash of another cost rehashes it at the current
+cost, and logins still check the password.
+"""
+import asyncio
+
+import server
+
+EMAIL = "alice@company.com"
+PASSWORD = "correct horse battery staple"
+
+
+def store_user(db, rounds: int, monkeypatch):
+    monkeypatch.setattr(server, "BCRYPT_ROUNDS", rounds)
+    hashed_password = asyncio.run(server.hash_password_async(PASSWORD))
+    asyncio.run(db.users.insert_one(server.User(email=EMAIL, hashed_password=hashed_password).model_dump()))
+    return hashed_password
+
+
+def test_hashes_use_the_configured_cost(monkeypatch):
+    monkeypatch.setattr(server, "BCRYPT_ROUNDS", 5)
+    hashed_password = asyncio.run(server.hash_password_async(PASSWORD))
+    assert hashed_password.split("$")[2] == "05"
+    assert asyncio.run(server.verify_password_async(PASSWORD, hashed_password))
+    assert not asyncio.run(server.verify_password_async("wrong", hashed_password))
+    assert not server.password_needs_rehash(hashed_password)
+    assert server.password_needs_rehash(hashed_password.replace("$05$", "$04$", 1))
+    assert not server.password_needs_rehash("not-a-bcrypt-hash")
+
+
+def test_login_rehashes_at_the_current_cost(client, db, monkeypatch):
+    old_hash = store_user(db, 4, monkeypatch)
+    monkeypatch.setattr(server, "BCRYPT_ROUNDS", 5)
+
+    assert client.post("/api/auth/login", json={"email": EMAIL, "password": "wrong"}).status_code == 401
+    assert asyncio.run(db.users.find_one({"email": EMAIL}))["hashed_password"] == old_hash
+
+    assert client.post("/api/auth/login", json={"email": EMAIL, "password": PASSWORD}).status_code == 200
+    new_hash = asyncio.run(db.users.find_one({"email": EMAIL}))["hashed_password"]
+    assert new_hash.split("$")[2] == "05"
+    assert client.post("/api/auth/login", json={"email": EMAIL, "password": PASSWORD}).status_code == 200
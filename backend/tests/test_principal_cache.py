@@ -0,0 +1,78 @@
+"""
+Principal cache (get_current_user) across workers.
+
+A user deactivated through another worker is dropped from this worker's cache once the
+token revocation mirror is refreshed, instead of staying valid for the cache TTL. Without
+stateless tokens the mirror is only refreshed while the cache holds principals.
+"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+import server
+
+
+@pytest.fixture(autouse=True)
+def stateful_cached_auth(db, monkeypatch):
+    monkeypatch.setattr(server, "JWT_STATELESS_AUTH", False)
+    monkeypatch.setattr(server, "PRINCIPAL_CACHE_TTL_SECONDS", 300)
+
+
+async def login(db) -> tuple[server.User, HTTPAuthorizationCredentials]:
+    user = server.User(email="alice@company.com", hashed_password="not-used")
+    await db.users.insert_one(user.model_dump())
+    token = server.create_access_token(data=server.build_token_claims(user))
+    return user, HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def test_deactivation_in_another_worker_reaches_the_cache(db):
+    async def run():
+        user, credentials = await login(db)
+        assert (await server.get_current_user(credentials)).id == user.id
+
+        # Another worker deactivates the user: it writes Mongo, not this worker's cache
+        await db.users.update_one({"id": user.id}, {"$set": {"is_active": False}})
+        own_mirror = dict(server._token_revocations)
+        await server.revoke_user_tokens(user.id)
+        server._token_revocations.clear()
+        server._token_revocations.update(own_mirror)
+        assert (await server.get_current_user(credentials)).id == user.id  # Until the mirror refreshes
+
+        await server.refresh_token_revocations()
+        with pytest.raises(HTTPException) as error:
+            await server.get_current_user(credentials)
+        assert error.value.status_code == 400
+    asyncio.run(run())
+
+
+def test_unrevoked_principal_is_served_from_cache(db):
+    async def run():
+        _, credentials = await login(db)
+        await server.get_current_user(credentials)
+        hits = server.principal_cache_stats["hits"]
+        await server.get_current_user(credentials)
+        assert server.principal_cache_stats["hits"] == hits + 1
+    asyncio.run(run())
+
+
+def test_revocations_are_polled_only_while_principals_are_cached(db, monkeypatch):
+    refreshes = []
+
+    async def refresh():
+        refreshes.append(len(server._principal_cache))
+    monkeypatch.setattr(server, "refresh_token_revocations", refresh)
+    monkeypatch.setattr(server, "TOKEN_REVOCATION_REFRESH_SECONDS", 0.001)
+
+    async def run():
+        _, credentials = await login(db)
+        refresh_loop = asyncio.create_task(server.token_revocation_refresh_loop())
+        await asyncio.sleep(0.05)
+        assert refreshes == []
+
+        await server.get_current_user(credentials)
+        await asyncio.sleep(0.05)
+        refresh_loop.cancel()
+        assert refreshes and all(refreshes)
+    asyncio.run(run())
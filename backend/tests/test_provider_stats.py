@@ -0,0 +1,28 @@
+"""
+/api/providers statistics from the aggregation pipeline.
+
+A user counts once per provider they hold grants on; resources count every grant.
+"""
+import asyncio
+
+
+def grant(provider: str, name: str) -> dict:
+    return {"provider": provider, "service": "Service", "resource_type": "resource", "resource_name": name, "access_type": "read"}
+
+
+def test_provider_statistics(admin_client, db, user_access_doc):
+    asyncio.run(db.user_access.insert_many([
+        user_access_doc("alice@company.com", [grant("aws", "a"), grant("aws", "b"), grant("gcp", "c")]),
+        user_access_doc("bob@company.com", [grant("aws", "d")]),
+        user_access_doc("carol@company.com", [])
+    ]))
+    stats = admin_client.get("/api/providers").json()
+    assert stats == {
+        "total_users": 3,
+        "providers": {
+            "aws": {"users": 2, "resources": 3},
+            "gcp": {"users": 1, "resources": 1},
+            "azure": {"users": 0, "resources": 0},
+            "okta": {"users": 0, "resources": 0}
+        }
+    }
@@ -0,0 +1,49 @@
+"""
+Read projections (user_access_projection).
+
+Every read path that projects user_access must answer exactly as it would from the full
+documents, i.e. each declared field list covers what the path uses.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import server
+
+RESOURCES = [
+    {"provider": "aws", "service": "IAM", "resource_type": "role", "resource_name": "admin-role", "access_type": "admin",
+     "account_id": "111", "last_used": datetime.utcnow() - timedelta(days=200), "is_privileged": True},
+    {"provider": "aws", "service": "IAM", "resource_type": "role", "resource_name": "reader", "access_type": "read", "account_id": "222"},
+    {"provider": "aws", "service": "S3", "resource_type": "bucket", "resource_name": "prod-customer-data", "access_type": "write"},
+    {"provider": "gcp", "service": "BigQuery", "resource_type": "dataset", "resource_name": "finance", "access_type": "admin"},
+    {"provider": "azure", "service": "Key Vault", "resource_type": "vault", "resource_name": "secrets", "access_type": "read"}
+]
+
+PATHS = [
+    "/api/analytics",
+    "/api/analytics/provider/aws",
+    "/api/analytics/dashboard/aws",
+    "/api/users/paginated",
+    "/api/users/paginated?provider=aws&sort_by=total_resources"
+]
+
+
+def full_documents(read_path, provider=None, extra_fields=()):
+    return {"_id": 0}
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_projected_reads_match_full_documents(admin_client, db, user_access_doc, monkeypatch, path):
+    asyncio.run(db.user_access.insert_many([
+        user_access_doc(f"user{i}@company.com", RESOURCES[i % 3:], department="Finance" if i % 2 else None)
+        for i in range(6)
+    ]))
+    asyncio.run(server.rebuild_analytics_summary())
+    response = admin_client.get(path)
+    assert response.status_code == 200
+    projected = response.json()
+
+    monkeypatch.setattr(server, "user_access_projection", full_documents)
+    asyncio.run(server.rebuild_analytics_summary())
+    assert admin_client.get(path).json() == projected
@@ -0,0 +1,42 @@
+"""
+Rescoring stored user_access documents (rescore_user_access_documents).
+
+Analyzed fields are written with one unordered bulk write per batch, and the analytics
+summary follows the rescored documents.
+"""
+import asyncio
+
+import server
+
+
+def test_rescore_writes_in_batches(db, user_access_doc, monkeypatch):
+    monkeypatch.setattr(server, "IMPORT_BATCH_SIZE", 2)
+    collection_type = type(db.user_access)
+    bulk_write = collection_type.bulk_write
+    batch_sizes = []
+
+    async def counting_bulk_write(collection, operations, **kwargs):
+        if collection.name == "user_access":
+            assert kwargs.get("ordered") is False
+            batch_sizes.append(len(operations))
+        return await bulk_write(collection, operations, **kwargs)
+    monkeypatch.setattr(collection_type, "bulk_write", counting_bulk_write)
+
+    async def run():
+        stale = []
+        for i in range(5):
+            doc = user_access_doc(f"user{i}@company.com", [
+                {"provider": "aws", "service": "IAM", "resource_type": "role", "resource_name": "admin", "access_type": "admin"}
+            ])
+            stale.append({**doc, "overall_risk_score": 0.0, "risk_level": "low"})
+        await db.user_access.insert_many(stale)
+        await server.rebuild_analytics_summary()
+
+        rescored_users, changed_users = await server.rescore_user_access_documents({})
+        assert (rescored_users, changed_users) == (5, 5)
+        assert batch_sizes == [2, 2, 1]
+        assert await db.user_access.count_documents({"overall_risk_score": 0.0}) == 0
+
+        stored = await db.analytics_summary.find_one({"id": server.ANALYTICS_SUMMARY_ID}, {"_id": 0})
+        assert server.compare_analytics_summaries(stored, await server.compute_analytics_summary()) == {}
+    asyncio.run(run())
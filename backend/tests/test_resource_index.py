@@ -0,0 +1,66 @@
+"""
+Resource index maintenance.
+
+Holders stay unique when a user repeats within an import batch or is indexed by two
+writers at once, and only one worker at a time can claim the startup maintenance lock.
+"""
+import asyncio
+
+import server
+
+
+def user_doc(email: str, *resource_names: str) -> dict:
+    return {
+        "user_email": email,
+        "resources": [
+            {"provider": "aws", "service": "S3", "resource_type": "bucket", "resource_name": name,
+             "access_type": "read", "risk_level": "low"}
+            for name in resource_names
+        ]
+    }
+
+
+async def holders(db, resource_key: str) -> list:
+    entry = await db.resource_index.find_one({"resource_key": resource_key})
+    return [holder["user_email"] for holder in entry["holders"]] if entry else []
+
+
+def test_repeated_user_in_batch_is_indexed_once(db):
+    async def run():
+        await server.index_user_resources([
+            user_doc("alice@company.com", "shared-bucket", "old-bucket"),
+            user_doc("alice@company.com", "shared-bucket")
+        ])
+        assert await holders(db, "shared-bucket") == ["alice@company.com"]
+        assert await holders(db, "old-bucket") == []  # The last copy wins
+    asyncio.run(run())
+
+
+def test_concurrent_indexing_keeps_holders_unique(db, monkeypatch):
+    async def run():
+        docs = [user_doc("alice@company.com", "shared-bucket"), user_doc("bob@company.com", "shared-bucket")]
+        await server.index_user_resources(docs)
+        # Another worker's writes landing after this one's unindex step (startup rebuilds in every worker)
+        async def unindexed_elsewhere(user_emails):
+            pass
+        monkeypatch.setattr(server, "unindex_user_resources", unindexed_elsewhere)
+        await server.index_user_resources(docs)
+        assert sorted(await holders(db, "shared-bucket")) == ["alice@company.com", "bob@company.com"]
+    asyncio.run(run())
+
+
+def test_maintenance_lock_has_one_holder(db):
+    async def run():
+        assert await server.acquire_maintenance_lock("startup_maintenance")
+        assert not await server.acquire_maintenance_lock("startup_maintenance")
+        await server.release_maintenance_lock("startup_maintenance")
+        assert await server.acquire_maintenance_lock("startup_maintenance")
+    asyncio.run(run())
+
+
+def test_expired_maintenance_lock_can_be_taken(db, monkeypatch):
+    async def run():
+        monkeypatch.setattr(server, "MAINTENANCE_LOCK_SECONDS", -1)
+        assert await server.acquire_maintenance_lock("startup_maintenance")
+        assert await server.acquire_maintenance_lock("startup_maintenance")
+    asyncio.run(run())
@@ -0,0 +1,53 @@
+"""
+Risk analysis persisted at write time.
+
+Imports store the analyzed fields on each user_access document; read endpoints serve the
+stored analysis instead of rescoring, score documents that were never scored, and
+/admin/rescore refreshes the stored fields.
+"""
+import asyncio
+import json
+
+import server
+
+EMAIL = "alice@company.com"
+RESOURCES = [
+    {"provider": "aws", "service": "IAM", "resource_type": "role", "resource_name": "admin-role", "access_type": "admin"},
+    {"provider": "gcp", "service": "BigQuery", "resource_type": "dataset", "resource_name": "finance", "access_type": "read"}
+]
+
+
+def import_users(admin_client, users: list):
+    content = json.dumps({"users": users}).encode()
+    response = admin_client.post("/api/import/json", files={"file": ("users.json", content, "application/json")})
+    assert response.status_code == 200
+
+
+def test_import_stores_the_risk_analysis(admin_client, db):
+    import_users(admin_client, [{"user_email": EMAIL, "user_name": "Alice", "resources": RESOURCES}])
+    stored = asyncio.run(db.user_access.find_one({"user_email": EMAIL}, {"_id": 0}))
+    expected = server.analyze_user_access(server.UserAccess(**stored))
+
+    assert stored["risk_scored_at"] is not None
+    assert stored["overall_risk_score"] == expected.overall_risk_score > 0
+    assert stored["risk_level"] == expected.risk_level
+    assert stored["resource_count"] == 2
+    assert set(stored["provider_risk"]) == {"aws", "gcp"}
+
+
+def test_read_endpoints_serve_the_stored_analysis(admin_client, db, user_access_doc):
+    doc = user_access_doc(EMAIL, RESOURCES)
+    asyncio.run(db.user_access.insert_one({**doc, "overall_risk_score": 42.0}))
+    assert admin_client.get(f"/api/risk-analysis/{EMAIL}").json()["overall_risk_score"] == 42.0  # Not rescored
+
+    response = admin_client.post("/api/admin/rescore", params={"user_email": EMAIL})
+    assert response.status_code == 200
+    assert admin_client.get(f"/api/risk-analysis/{EMAIL}").json()["overall_risk_score"] == doc["overall_risk_score"]
+
+
+def test_unscored_documents_are_scored_on_read(admin_client, db, user_access_doc):
+    doc = user_access_doc(EMAIL, RESOURCES)
+    asyncio.run(db.user_access.insert_one({**doc, "overall_risk_score": 0.0, "risk_scored_at": None}))
+    analysis = admin_client.get(f"/api/risk-analysis/{EMAIL}").json()
+    assert analysis["overall_risk_score"] == doc["overall_risk_score"]
+    assert analysis["risk_scored_at"] is not None
@@ -0,0 +1,62 @@
+"""
+Vectorized risk scan (scan_user_risk).
+
+Batches of the cursor are scored separately; the totals must not depend on the batch
+size, and each user's score must match analyze_user_access.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import server
+
+
+def grants(i: int) -> list:
+    stale = datetime.utcnow() - timedelta(days=120)
+    resources = [
+        {"provider": "aws", "service": "IAM", "resource_type": "role", "resource_name": f"admin-{i}",
+         "access_type": "admin" if i % 2 else "read", "account_id": f"acct-{i % 3}", "last_used": stale},
+        {"provider": "aws", "service": "S3", "resource_type": "bucket", "resource_name": "prod-customer-data",
+         "access_type": "write", "account_id": "acct-9"},
+        {"provider": "gcp", "service": "BigQuery", "resource_type": "dataset", "resource_name": "finance",
+         "access_type": "read"}
+    ]
+    if i % 3 == 0:
+        resources.append({"provider": "azure", "service": "Key Vault", "resource_type": "vault",
+                          "resource_name": "secrets", "access_type": "admin"})
+    return resources[:1 + i % 4]
+
+
+async def seed(db, user_access_doc, users: int = 11) -> list:
+    docs = [user_access_doc(f"user{i:02d}@company.com", grants(i)) for i in range(users)]
+    await db.user_access.insert_many([dict(doc) for doc in docs])
+    return docs
+
+
+@pytest.mark.parametrize("provider", [None, "aws"])
+def test_scan_does_not_depend_on_batch_size(db, user_access_doc, monkeypatch, provider):
+    async def run():
+        await seed(db, user_access_doc)
+        monkeypatch.setattr(server, "RISK_SCAN_BATCH_SIZE", 10_000)
+        single = await server.scan_user_risk(provider)
+        monkeypatch.setattr(server, "RISK_SCAN_BATCH_SIZE", 3)
+        batched = await server.scan_user_risk(provider)
+        return single, batched
+    single, batched = asyncio.run(run())
+
+    assert batched.pop("average_risk_score") == pytest.approx(single.pop("average_risk_score"))
+    batched.pop("scored_at"), single.pop("scored_at")
+    assert batched == single
+    assert single["total_users"] == 11  # Every user has an aws grant
+
+
+def test_scan_matches_analyze_user_access(db, user_access_doc, monkeypatch):
+    monkeypatch.setattr(server, "RISK_SCAN_BATCH_SIZE", 4)
+    docs = asyncio.run(seed(db, user_access_doc))
+    scan = asyncio.run(server.scan_user_risk())
+
+    expected = sorted(docs, key=lambda doc: -doc["overall_risk_score"])[:server.RISK_SCAN_TOP_USERS]
+    assert [risk["risk_score"] for risk in scan["top_risks"]] == pytest.approx([doc["overall_risk_score"] for doc in expected])
+    assert scan["average_risk_score"] == pytest.approx(sum(doc["overall_risk_score"] for doc in docs) / len(docs))
+    assert scan["stale_scores"] == 0
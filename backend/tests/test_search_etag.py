@@ -0,0 +1,35 @@
+"""
+/api/search/{email} revalidation through the full middleware stack (compression included).
+
+The 200 and the 304 carry the same weak ETag whether or not the body was compressed.
+"""
+import asyncio
+
+import pytest
+
+EMAIL = "alice@company.com"
+
+
+@pytest.fixture(autouse=True)
+def seed(db, user_access_doc):
+    asyncio.run(db.user_access.insert_one(user_access_doc(EMAIL, [
+        {"provider": "aws", "service": "S3", "resource_type": "bucket", "resource_name": f"bucket-{i}", "access_type": "read"}
+        for i in range(20)
+    ])))
+
+
+@pytest.mark.parametrize("accept_encoding", ["br", "gzip", "identity"])
+def test_not_modified_carries_the_same_weak_etag(admin_client, accept_encoding):
+    response = admin_client.get(f"/api/search/{EMAIL}", headers={"Accept-Encoding": accept_encoding})
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+    assert response.headers.get("content-encoding") == (None if accept_encoding == "identity" else accept_encoding)
+
+    revalidated = admin_client.get(f"/api/search/{EMAIL}", headers={"Accept-Encoding": accept_encoding, "If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+
+    # A strong form of the same tag still matches (weak comparison)
+    strong = admin_client.get(f"/api/search/{EMAIL}", headers={"If-None-Match": etag.removeprefix("W/")})
+    assert strong.status_code == 304
@@ -0,0 +1,50 @@
+"""
+Compiled sensitive-resource matcher (match_sensitive_resource).
+
+It must agree with a linear walk over SENSITIVE_RESOURCES: case-insensitive service and
+substring pattern matches, with the first matching rule in table order winning.
+"""
+import pytest
+
+import server
+
+
+def linear_match(provider, service: str, resource_name: str) -> tuple:
+    for sensitive in server.SENSITIVE_RESOURCES.get(provider, []):
+        if sensitive.service.lower() == service.lower():
+            for pattern in sensitive.resource_patterns:
+                if pattern.lower() in resource_name.lower():
+                    return True, sensitive.sensitivity_level, sensitive.description
+    return False, "low", "Standard resource"
+
+
+def rule_cases():
+    for provider, rules in server.SENSITIVE_RESOURCES.items():
+        for sensitive in rules:
+            for pattern in sensitive.resource_patterns:
+                yield provider, sensitive.service, f"team-{pattern}-01"
+                yield provider, sensitive.service.upper(), f"TEAM-{pattern.upper()}"
+            yield provider, sensitive.service, "plain-resource"
+        yield provider, "Unlisted Service", "prod-admin-secrets"
+
+
+@pytest.mark.parametrize("provider, service, resource_name", list(rule_cases()))
+def test_matcher_agrees_with_the_rule_table(provider, service, resource_name):
+    assert server.match_sensitive_resource(provider, service, resource_name) == linear_match(provider, service, resource_name)
+
+
+def test_rebuild_picks_up_rule_changes(monkeypatch):
+    provider = next(iter(server.SENSITIVE_RESOURCES))
+    rules = server.SENSITIVE_RESOURCES[provider]
+    extra = server.SensitiveResource(
+        provider=provider, service="Ledger", resource_patterns=["general-ledger"],
+        sensitivity_level="critical", description="Accounting ledger"
+    )
+    monkeypatch.setitem(server.SENSITIVE_RESOURCES, provider, rules + [extra])
+    server.rebuild_sensitive_resource_matcher()
+    try:
+        assert server.match_sensitive_resource(provider, "ledger", "General-Ledger-2026")[1:] == ("critical", "Accounting ledger")
+    finally:
+        monkeypatch.undo()
+        server.rebuild_sensitive_resource_matcher()
+    assert not server.match_sensitive_resource(provider, "ledger", "General-Ledger-2026")[0]
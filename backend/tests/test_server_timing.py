@@ -0,0 +1,72 @@
+"""
+Server-Timing on /api/analytics and /api/users/paginated.
+
+Each timed phase is reported once with the request total; debug_timing adds the same
+phases to the body and times the request even when SERVER_TIMING is off.
+"""
+import asyncio
+import time
+
+import server
+
+
+def timing_phases(header: str) -> dict:
+    """Server-Timing entries as name -> milliseconds"""
+    phases = {}
+    for entry in header.split(", "):
+        name, duration = entry.split(";dur=")
+        assert name not in phases
+        phases[name] = float(duration)
+    return phases
+
+
+def seed(db, user_access_doc):
+    asyncio.run(db.user_access.insert_many([user_access_doc(f"user{i}@company.com") for i in range(3)]))
+
+
+def test_analytics_reports_its_phases(admin_client, db, user_access_doc):
+    seed(db, user_access_doc)
+    asyncio.run(server.rebuild_analytics_summary())
+
+    response = admin_client.get("/api/analytics")
+    assert response.status_code == 200
+    assert set(timing_phases(response.headers["server-timing"])) == {"mongo", "validate", "serialize", "total"}
+    assert response.headers["timing-allow-origin"] == server.SERVER_TIMING_ALLOW_ORIGIN
+    assert "debug" not in response.json()
+
+    debug = admin_client.get("/api/analytics", params={"debug_timing": True}).json()["debug"]["timing"]
+    assert set(debug["phases_ms"]) == {"mongo", "validate"}
+    assert debug["total_ms"] >= sum(debug["phases_ms"].values())
+
+
+def test_paginated_users_report_their_phases(admin_client, db, user_access_doc):
+    seed(db, user_access_doc)
+    response = admin_client.get("/api/users/paginated", params={"debug_timing": True})
+    assert response.status_code == 200
+    assert {"mongo", "rows", "count", "serialize", "total"} <= set(timing_phases(response.headers["server-timing"]))
+    assert {"mongo", "rows", "count"} <= set(response.json()["debug"]["timing"]["phases_ms"])
+
+
+def test_timing_can_be_turned_off_except_for_debug_requests(admin_client, db, user_access_doc, monkeypatch):
+    monkeypatch.setattr(server, "SERVER_TIMING", False)
+    seed(db, user_access_doc)
+
+    response = admin_client.get("/api/users/paginated")
+    assert "server-timing" not in response.headers
+    assert "debug" not in response.json()
+
+    response = admin_client.get("/api/users/paginated", params={"debug_timing": True})
+    assert "total" in timing_phases(response.headers["server-timing"])
+    assert response.json()["debug"]["timing"]["total_ms"] > 0
+
+
+def test_nested_phases_are_exclusive():
+    timer = server.PhaseTimer()
+    with timer.phase("rows"):
+        time.sleep(0.01)
+        with timer.phase("validate"):
+            time.sleep(0.05)
+
+    assert timer.phases["validate"] >= 0.05
+    assert 0.01 <= timer.phases["rows"] < 0.05
+    assert sum(timer.phases.values()) <= timer.elapsed_ms() / 1000
@@ -0,0 +1,66 @@
+"""
+Startup backfills and rebuilds (run_startup_maintenance).
+
+Only the worker holding the startup_maintenance lock backfills, so analytics deltas for
+backfilled users are applied once.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import server
+
+
+def legacy_doc(i: int) -> dict:
+    """A user_access document stored before the analyzed fields were persisted"""
+    doc = server.UserAccess(
+        user_email=f"user{i}@company.com",
+        user_name=f"User {i}",
+        resources=[
+            {"provider": "aws", "service": "IAM", "resource_type": "role", "resource_name": f"admin-role-{i}", "access_type": "admin"},
+            {"provider": "gcp", "service": "BigQuery", "resource_type": "dataset", "resource_name": "analytics", "access_type": "read"}
+        ]
+    ).model_dump()
+    doc.pop("resource_count", None)
+    return doc
+
+
+async def seed(db, users: int = 3):
+    await db.user_access.insert_many([legacy_doc(i) for i in range(users)])
+    await server.rebuild_analytics_summary()
+
+
+def test_maintenance_skipped_while_another_worker_holds_the_lock(db):
+    async def run():
+        await seed(db)
+        await db.maintenance_locks.insert_one({
+            "_id": "startup_maintenance", "holder": "other-host:1",
+            "locked_until": datetime.utcnow() + timedelta(minutes=5)
+        })
+        assert not await server.run_startup_maintenance()
+        assert await db.user_access.count_documents({"resource_count": {"$exists": False}}) == 3
+    asyncio.run(run())
+
+
+def test_backfill_keeps_analytics_summary_exact(db):
+    async def run():
+        await seed(db)
+        assert await server.run_startup_maintenance()
+        assert await server.run_startup_maintenance()  # Lock released, nothing left to backfill
+        assert await db.user_access.count_documents({"resource_count": {"$exists": False}}) == 0
+
+        stored = await db.analytics_summary.find_one({"id": server.ANALYTICS_SUMMARY_ID}, {"_id": 0})
+        assert server.compare_analytics_summaries(stored, await server.compute_analytics_summary()) == {}
+        assert await db.maintenance_locks.count_documents({}) == 0
+    asyncio.run(run())
+
+
+def test_search_field_backfilled_without_rescoring(db):
+    async def run():
+        doc = server.analyze_user_access(server.UserAccess(**legacy_doc(0))).model_dump()
+        doc.pop("user_email_lower")
+        await db.user_access.insert_one({**doc, "user_email": "User0@Company.com"})
+        assert await server.run_startup_maintenance()
+        stored = await db.user_access.find_one({}, {"_id": 0})
+        assert stored["user_email_lower"] == "user0@company.com"
+        assert abs(stored["risk_scored_at"] - doc["risk_scored_at"]) < timedelta(milliseconds=1)  # Not rescored
+    asyncio.run(run())
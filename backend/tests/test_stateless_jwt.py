@@ -0,0 +1,85 @@
+"""
+Stateless JWT mode (JWT_STATELESS_AUTH).
+
+Tokens carry the user id, role and token version, so get_current_user authorizes them
+without reading users; revoked token versions are refused once the worker's revocation
+mirror knows about them.
+"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+import server
+
+
+@pytest.fixture(autouse=True)
+def stateless_auth(db, monkeypatch):
+    monkeypatch.setattr(server, "JWT_STATELESS_AUTH", True)
+
+
+async def issue_token(db, user: server.User) -> HTTPAuthorizationCredentials:
+    """Store the user as it is now and issue it a token"""
+    await db.users.replace_one({"id": user.id}, user.model_dump(), upsert=True)
+    token = server.create_access_token(data=server.build_token_claims(user))
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def test_token_claims_authorize_without_a_lookup(db):
+    async def run():
+        user = server.User(email="alice@company.com", hashed_password="", role=server.UserRole.ADMIN)
+        credentials = await issue_token(db, user)
+        await db.users.delete_many({})  # Nothing left to look up
+
+        principal = await server.get_current_user(credentials)
+        assert (principal.id, principal.email, principal.role, principal.token_version) == (user.id, user.email, user.role, 0)
+    asyncio.run(run())
+
+
+def test_revoked_tokens_are_refused(db):
+    async def run():
+        user = server.User(email="alice@company.com", hashed_password="")
+        old_credentials = await issue_token(db, user)
+        await server.revoke_user_tokens(user.id)
+        with pytest.raises(HTTPException) as error:
+            await server.get_current_user(old_credentials)
+        assert error.value.status_code == 401
+
+        user.token_version = (await db.users.find_one({"id": user.id}))["token_version"]
+        new_credentials = await issue_token(db, user)
+        assert (await server.get_current_user(new_credentials)).id == user.id
+    asyncio.run(run())
+
+
+def test_revocations_from_other_workers_apply_after_a_refresh(db):
+    async def run():
+        user = server.User(email="alice@company.com", hashed_password="")
+        credentials = await issue_token(db, user)
+        await db.token_revocations.insert_one({"user_id": user.id, "min_token_version": 1})
+        assert (await server.get_current_user(credentials)).id == user.id  # Mirror not refreshed yet
+
+        await server.refresh_token_revocations()
+        with pytest.raises(HTTPException):
+            await server.get_current_user(credentials)
+    asyncio.run(run())
+
+
+def test_tokens_without_claims_fall_back_to_the_lookup(db, monkeypatch):
+    async def run():
+        user = server.User(email="alice@company.com", hashed_password="", is_active=False)
+        monkeypatch.setattr(server, "JWT_STATELESS_AUTH", False)
+        credentials = await issue_token(db, user)  # Issued before stateless mode was enabled
+        monkeypatch.setattr(server, "JWT_STATELESS_AUTH", True)
+        with pytest.raises(HTTPException) as error:
+            await server.get_current_user(credentials)
+        assert error.value.detail == "Inactive user"
+    asyncio.run(run())
+
+
+def test_auth_me_reads_the_stored_user(client, db):
+    user = server.User(email="alice@company.com", full_name="Alice", hashed_password="")
+    credentials = asyncio.run(issue_token(db, user))
+    response = client.get("/api/auth/me", headers={"Authorization": f"Bearer {credentials.credentials}"})
+    assert response.status_code == 200
+    assert response.json()["full_name"] == "Alice"
@@ -0,0 +1,53 @@
+"""
+Streaming imports (process_streaming_import).
+
+A malformed or truncated upload must end the job as failed instead of leaving it running.
+"""
+import asyncio
+import json
+import tempfile
+
+import server
+
+USERS = [
+    {
+        "user_email": f"user{i}@company.com",
+        "user_name": f"User {i}",
+        "resources": [
+            {"provider": "aws", "service": "S3", "resource_type": "bucket", "resource_name": f"bucket-{i}", "access_type": "read"}
+        ]
+    }
+    for i in range(5)
+]
+VALID_IMPORT = json.dumps({"metadata": {"source": "test"}, "users": USERS}).encode()
+
+
+def run_import(db, content: bytes) -> dict:
+    """Run one streaming import of content to the end and return its job document"""
+    async def run():
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as spool_file:
+            spool_file.write(content)
+        await db.import_jobs.insert_one({"id": "job", "status": "pending"})
+        await asyncio.wait_for(server.process_streaming_import("job", spool_file.name, batch_size=2), timeout=30)
+        return await db.import_jobs.find_one({"id": "job"})
+    return asyncio.run(run())
+
+
+def test_valid_import_completes(db):
+    job = run_import(db, VALID_IMPORT)
+    assert job["status"] == "completed"
+    assert job["imported_users"] == len(USERS)
+    assert job["metadata"] == {"source": "test"}
+
+
+def test_truncated_import_fails(db):
+    job = run_import(db, VALID_IMPORT[:len(VALID_IMPORT) // 2])
+    assert job["status"] == "failed"
+    assert job["errors"]
+    assert job["finished_at"] is not None
+
+
+def test_malformed_import_fails(db):
+    job = run_import(db, VALID_IMPORT.replace(b'"user_name"', b'user_name', 1))
+    assert job["status"] == "failed"
+    assert job["errors"]
@@ -0,0 +1,50 @@
+"""
+Trusted reads of stored documents.
+
+/users encodes stored user_access documents without re-validating them, and
+/users/paginated builds its rows from the documents; both must match what the validated
+models produce.
+"""
+import asyncio
+import json
+from datetime import datetime
+
+import server
+
+RESOURCES = [
+    {"provider": "aws", "service": "IAM", "resource_type": "role", "resource_name": "admin-role",
+     "access_type": "admin", "last_used": datetime(2025, 1, 2, 3, 4, 5, 678000), "account_id": "111"},
+    {"provider": "okta", "service": "Okta", "resource_type": "application", "resource_name": "hr",
+     "access_type": "user", "permission_details": {"groups": ["hr"]}}
+]
+
+
+def seed(db, user_access_doc) -> list:
+    docs = [
+        user_access_doc("alice@company.com", RESOURCES, department="Finance"),
+        user_access_doc("svc-deploy@company.com", RESOURCES[:1], is_service_account=True)
+    ]
+    asyncio.run(db.user_access.insert_many([dict(doc) for doc in docs]))
+    return asyncio.run(db.user_access.find({}, {"_id": 0}).to_list(None))
+
+
+def test_users_match_the_validated_encoding(admin_client, db, user_access_doc):
+    stored = seed(db, user_access_doc)
+    validated = [json.loads(server.UserAccess(**doc).model_dump_json()) for doc in stored]
+    assert admin_client.get("/api/users").json() == validated
+
+
+def test_paginated_rows_match_the_validated_rows(db, user_access_doc):
+    stored = seed(db, user_access_doc)
+    for doc in stored:
+        user_access = server.UserAccess(**doc)
+        row = server.paginated_user_row(doc)
+        assert row["user_email"] == user_access.user_email
+        assert row["risk_score"] == user_access.overall_risk_score
+        assert row["risk_level"] == user_access.risk_level
+        assert row["top_risk_factors"] == [rf["factor_type"] for rf in user_access.risk_factors[:3]]
+        assert row["total_resources"] == len(user_access.resources)
+        assert row["admin_access_count"] == sum(1 for r in user_access.resources if r.access_type == server.AccessType.ADMIN)
+        assert sorted(row["providers"]) == sorted({r.provider for r in user_access.resources})
+        assert sorted(row["services"]) == sorted({f"{r.provider.value}-{r.service}" for r in user_access.resources})
+        assert row["last_updated"] == user_access.last_updated
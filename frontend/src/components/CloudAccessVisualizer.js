@@ -393,8 +393,14 @@ const CloudAccessVisualizer = () => {
       if (selectedProvider !== "all") params.append('provider', selectedProvider);
       if (selectedAccessType !== "all") params.append('access_type', selectedAccessType);
       
-      const url = `${API}/export/${format}?${params.toString()}`;
-      window.open(url, '_blank');
+      // Exports require the Authorization header, which a plain link or window.open would not send
+      const response = await axios.get(`${API}/export/${format}?${params.toString()}`, { responseType: 'blob' });
+      const url = window.URL.createObjectURL(response.data);
+      const link = document.createElement('a');
+      link.download = `cloud_access_export_${Date.now()}.${format}`;
+      link.href = url;
+      link.click();
+      window.URL.revokeObjectURL(url);
     } catch (error) {
       console.error("Error exporting data:", error);
       alert("Error exporting data");
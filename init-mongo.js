@@ -4,6 +4,12 @@ db = db.getSiblingDB('cloud_access');
 // Create collections
 db.createCollection('users');
 db.createCollection('user_access');
+db.createCollection('resource_index');
+db.createCollection('import_jobs');
+db.createCollection('analytics_summary');
+db.createCollection('token_revocations');
+db.createCollection('audit_logs');
+db.createCollection('graph_versions');
 
 // Create indexes for better performance
 db.users.createIndex({ "email": 1 }, { unique: true });
@@ -11,4 +17,45 @@ db.user_access.createIndex({ "user_email": 1 }, { unique: true });
 db.user_access.createIndex({ "data_source": 1 });
 db.user_access.createIndex({ "overall_risk_score": -1 });
 
+// Denormalized fields used by /api/users/paginated (user_email is the keyset tiebreaker)
+db.user_access.createIndex({ "overall_risk_score": -1, "user_email": -1 });
+db.user_access.createIndex({ "risk_level": 1, "overall_risk_score": -1, "user_email": -1 });
+db.user_access.createIndex({ "resource_count": -1, "user_email": -1 });
+db.user_access.createIndex({ "last_updated": -1, "user_email": -1 });
+db.user_access.createIndex({ "providers": 1, "user_email": 1 });
+// Email prefix search matches the lowercased copy with an anchored regex
+db.user_access.createIndex({ "user_email_lower": 1 });
+// Subtree selection for /api/graph/organization
+db.user_access.createIndex({ "resources.provider": 1, "resources.service": 1 });
+// Provider-filtered pages: equality on providers, then the provider-scoped sort. Not sparse,
+// since MongoDB does not sort with a sparse index unless the query asks for $exists
+['aws', 'gcp', 'azure', 'okta'].forEach(function(provider) {
+    ['risk_score', 'resource_count'].forEach(function(field) {
+        var providerSort = { "providers": 1 };
+        providerSort["provider_risk." + provider + "." + field] = -1;
+        providerSort["user_email"] = -1;
+        db.user_access.createIndex(providerSort);
+    });
+});
+db.resource_index.createIndex({ "resource_key": 1 }, { unique: true });
+db.resource_index.createIndex({ "holders.user_email": 1 });
+db.import_jobs.createIndex({ "id": 1 }, { unique: true });
+db.analytics_summary.createIndex({ "id": 1 }, { unique: true });
+// Unique ids make replaying spilled audit events idempotent
+db.audit_logs.createIndex({ "id": 1 }, { unique: true });
+// Audit log listing walks (filter, timestamp, id) keysets newest first
+db.audit_logs.createIndex({ "timestamp": -1, "id": -1 });
+db.audit_logs.createIndex({ "event_type": 1, "timestamp": -1, "id": -1 });
+db.audit_logs.createIndex({ "target_user": 1, "timestamp": -1, "id": -1 });
+db.graph_versions.createIndex({ "user_email": 1, "version": 1 }, { unique: true });
+// Clients holding a graph older than a week get the full graph instead of a delta
+db.graph_versions.createIndex({ "created_at": 1 }, { expireAfterSeconds: 604800 });
+db.token_revocations.createIndex({ "user_id": 1 }, { unique: true });
+// Revocations only need to outlive the tokens they revoke (ACCESS_TOKEN_EXPIRE_MINUTES)
+db.token_revocations.createIndex({ "revoked_at": 1 }, { expireAfterSeconds: 86400 });
+db.worker_metrics.createIndex({ "worker": 1 }, { unique: true });
+// Workers that stopped publishing drop out of aggregated /api/metrics (METRICS_WORKER_TTL_SECONDS);
+// this only cleans up their snapshots
+db.worker_metrics.createIndex({ "updated_at": 1 }, { expireAfterSeconds: 3600 });
+
 print("Database initialized successfully");
\ No newline at end of file